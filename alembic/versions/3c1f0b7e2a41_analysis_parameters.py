@@ -0,0 +1,32 @@
+"""Store analyzer parameters on volume analysis rows
+
+Revision ID: 3c1f0b7e2a41
+Revises: 88f471526532
+Create Date: 2026-10-18 09:12:44.518203
+
+"""
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0b7e2a41'
+down_revision: Union[str, None] = '88f471526532'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows were produced by the endpoint defaults (14, 7)
+    op.add_column('volume_analysis', sa.Column('lookback_period', sa.Integer(), server_default='14', nullable=False))
+    op.add_column('volume_analysis', sa.Column('min_periods', sa.Integer(), server_default='7', nullable=False))
+    op.create_index('idx_analysis_params_date', 'volume_analysis', ['lookback_period', 'min_periods', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_analysis_params_date', table_name='volume_analysis')
+    op.drop_column('volume_analysis', 'min_periods')
+    op.drop_column('volume_analysis', 'lookback_period')
@@ -0,0 +1,51 @@
+"""Keep open/high/low on bars and add btc_candles rollups
+
+Revision ID: 5e2b8d9f1a67
+Revises: 9d4e6a2c5b13
+Create Date: 2026-10-18 15:41:09.372518
+
+"""
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8d9f1a67'
+down_revision: Union[str, None] = '9d4e6a2c5b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing bars keep null open/high/low; rollups use their close instead
+    op.add_column('btc_data', sa.Column('open_price', sa.Float(), nullable=True))
+    op.add_column('btc_data', sa.Column('high_price', sa.Float(), nullable=True))
+    op.add_column('btc_data', sa.Column('low_price', sa.Float(), nullable=True))
+    # Fill with `python -m api.services.candles` after upgrading
+    op.create_table(
+        'btc_candles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('interval', sa.String(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('open_price', sa.Float(), nullable=False),
+        sa.Column('high_price', sa.Float(), nullable=False),
+        sa.Column('low_price', sa.Float(), nullable=False),
+        sa.Column('close_price', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Float(), nullable=False),
+        sa.Column('bar_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('interval', 'date', name='uq_candle_interval_date')
+    )
+    op.create_index(op.f('ix_btc_candles_id'), 'btc_candles', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_btc_candles_id'), table_name='btc_candles')
+    op.drop_table('btc_candles')
+    op.drop_column('btc_data', 'low_price')
+    op.drop_column('btc_data', 'high_price')
+    op.drop_column('btc_data', 'open_price')
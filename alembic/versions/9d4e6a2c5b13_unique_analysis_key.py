@@ -0,0 +1,37 @@
+"""Unique analysis key for bulk upserts
+
+Revision ID: 9d4e6a2c5b13
+Revises: 3c1f0b7e2a41
+Create Date: 2026-10-18 11:03:27.904615
+
+"""
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e6a2c5b13'
+down_revision: Union[str, None] = '3c1f0b7e2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the newest row of any duplicated key before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM volume_analysis
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM volume_analysis
+            GROUP BY date, lookback_period, min_periods
+        )
+        """
+    )
+    with op.batch_alter_table('volume_analysis') as batch_op:
+        batch_op.create_unique_constraint('uq_analysis_date_params', ['date', 'lookback_period', 'min_periods'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('volume_analysis') as batch_op:
+        batch_op.drop_constraint('uq_analysis_date_params', type_='unique')
@@ -0,0 +1,23 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, TypeVar
+
+from .config import get_settings
+
+T = TypeVar("T")
+
+
+@lru_cache
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Bounded pool for CPU-bound request work (pandas/numpy analysis, parsing)"""
+    return ThreadPoolExecutor(
+        max_workers=get_settings().cpu_executor_workers, thread_name_prefix="quant-cpu"
+    )
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run func in the CPU executor so the event loop keeps serving requests"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), partial(func, *args, **kwargs))
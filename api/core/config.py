@@ -1,7 +1,10 @@
 from functools import lru_cache
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from api.services.candles import CANDLE_INTERVALS
+
 
 class Settings(BaseSettings):
     """
@@ -20,14 +23,79 @@ class Settings(BaseSettings):
     postgres_user: str
     postgres_password: str
 
+    # Async routes derive their URL from database_url unless this is set
+    async_database_url: str | None = None
+
+    # Connection pool, applied to the sync and the async engine separately
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 10.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    db_connect_timeout: int = 10  # seconds, PostgreSQL only
+
     # API keys - NO DEFAULTS for security
     alpha_vantage_api_key: str
 
+    # Alpha Vantage client: shared keep-alive pool, client-side quota and retries
+    alpha_vantage_timeout: float = 30.0
+    alpha_vantage_max_connections: int = 4
+    alpha_vantage_requests_per_minute: float = 5.0
+    alpha_vantage_burst: int = 1
+    alpha_vantage_max_retries: int = 3
+    alpha_vantage_backoff_base: float = 2.0  # seconds; doubled per retry, with full jitter
+    alpha_vantage_backoff_max: float = 60.0
+    # Seconds a fetched series is reused instead of calling upstream again
+    alpha_vantage_fresh_seconds: float = 60.0
+
     # Optional application settings with safe defaults
     app_name: str = "Quant API - Bitcoin Analysis Platform"
     app_version: str = "1.0.0"
     debug: bool = False
 
+    # Upper bound on worker processes a single analysis request may use
+    analysis_max_workers: int = 4
+    # Threads running CPU-bound work off the event loop
+    cpu_executor_workers: int = 2
+
+    # Background jobs: unfinished jobs accepted, CPU-heavy jobs run at once, finished jobs kept
+    job_queue_size: int = 16
+    job_max_cpu_concurrency: int = 1
+    job_history_size: int = 200
+
+    # Read endpoint responses: "memory" (per process), "redis" (shared) or "none" (ETags only)
+    response_cache_backend: str = "memory"
+    response_cache_ttl: float = 60.0
+    response_cache_max_entries: int = 1024
+    redis_url: str = "redis://localhost:6379/0"
+
+    # Rows fetched per server-side cursor round trip by /btc/export
+    export_chunk_size: int = 1000
+
+    # OHLCV rollups kept up to date on ingest and served by /btc/candles: 1h, 1d, 1w, 1M
+    candle_intervals: list[str] = ["1w", "1M"]
+
+    @field_validator("candle_intervals")
+    @classmethod
+    def _check_candle_intervals(cls, intervals: list[str]) -> list[str]:
+        # Rejected at startup rather than on every ingest that refreshes candles
+        unsupported = [interval for interval in intervals if interval not in CANDLE_INTERVALS]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported candle intervals: {', '.join(unsupported)} "
+                f"(expected any of: {', '.join(CANDLE_INTERVALS)})"
+            )
+        return intervals
+
+    # Scheduled ingestion: seconds between runs plus up to jitter seconds; gaps beyond
+    # full_fetch_gap_days (or an empty table) reconcile the full history
+    scheduler_enabled: bool = False
+    scheduler_interval_seconds: float = 3600.0
+    scheduler_jitter_seconds: float = 60.0
+    scheduler_full_fetch_gap_days: int = 100
+    scheduler_lookback_period: int = 14
+    scheduler_min_periods: int = 7
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,16 +1,55 @@
 from collections.abc import Iterator
+from functools import lru_cache
+from typing import Any
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .config import get_settings
+from .pool import engine_options
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, settings))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Annotated so mypy can resolve model bases when config -> candles -> models forms an import cycle
+Base: Any = declarative_base()
+
+# Async driver used for each synchronous backend
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a synchronous database URL to the matching async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Async engine, created on first use"""
+    url = settings.async_database_url or async_database_url(settings.database_url)
+    return create_async_engine(url, **engine_options(url, settings, is_async=True))
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session factory bound to the async engine"""
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
 
 
 def get_db() -> Iterator[Session]:
@@ -20,3 +59,8 @@ def get_db() -> Iterator[Session]:
         yield db
     finally:
         db.close()
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency for routes that open sessions themselves, e.g. for background jobs"""
+    return get_async_sessionmaker()
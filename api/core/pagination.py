@@ -0,0 +1,56 @@
+"""
+Keyset (date cursor) pagination for newest-first listings.
+
+A cursor encodes the (date, id) of the last row on a page; the next page
+continues strictly after it, so pages never overlap or skip rows when new
+bars arrive between requests, and each page is an index range scan instead
+of an OFFSET.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+class Page(NamedTuple):
+    items: list[Any]
+    next_cursor: str | None
+
+    def headers(self, request: Request) -> dict[str, str]:
+        """X-Next-Cursor and an RFC 8288 next link, when there is a next page"""
+        if self.next_cursor is None:
+            return {}
+        next_url = request.url.include_query_params(cursor=self.next_cursor)
+        return {"X-Next-Cursor": self.next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{date.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """(date, id) of a cursor; raises 400 for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date, row_id = raw.split("|")
+        return datetime.fromisoformat(date), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def paginate_desc(query: Query[Any], model: Any, limit: int, cursor: str | None) -> Page:
+    """One page of query ordered by (date, id) descending, starting after cursor"""
+    if cursor is not None:
+        date, row_id = decode_cursor(cursor)
+        query = query.filter(or_(model.date < date, and_(model.date == date, model.id < row_id)))
+
+    # One extra row tells whether another page follows
+    rows = query.order_by(model.date.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return Page(rows, None)
+    last = rows[limit - 1]
+    return Page(rows[:limit], encode_cursor(last.date, last.id))
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    Pool,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+from .config import Settings
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters for one connection pool"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+
+    def record(self, wait: float, checked_out: int, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "peak_checked_out": self.peak_checked_out
+            }
+
+
+class _CheckoutTimingMixin:
+    """Times every checkout, including waits for a free connection and pre-ping"""
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, 0, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, self.checkedout(), timed_out=False)  # type: ignore[attr-defined]
+        return connection  # type: ignore[no-any-return]
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, settings: Settings, is_async: bool = False) -> dict[str, Any]:
+    """create_engine/create_async_engine keyword arguments for the configured pool"""
+    parsed = make_url(url)
+    # In-memory SQLite lives in a single connection; pooling options do not apply
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if parsed.get_backend_name() == "postgresql":
+        # psycopg2 and asyncpg name the connect timeout differently
+        options["connect_args"] = (
+            {"timeout": settings.db_connect_timeout} if is_async
+            else {"connect_timeout": settings.db_connect_timeout}
+        )
+    return options
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """Current occupancy and checkout metrics of an engine's pool"""
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    status: dict[str, Any] = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # Negative until the pool has opened pool_size connections
+        "overflow": pool.overflow(),
+        "timeout_seconds": pool.timeout()
+    }
+    if isinstance(pool, _CheckoutTimingMixin):
+        status.update(pool.metrics.snapshot())
+    return status
@@ -0,0 +1,62 @@
+"""
+JSON body serializers for cached read endpoints.
+
+model_serializer validates content against a response model (ORM objects
+via from_attributes) before encoding. rows_serializer is the fast path for
+list endpoints: rows selected as plain column tuples, in the response
+model's field order, are encoded directly without ORM hydration or per-row
+validation. Both produce the same JSON for the same data.
+"""
+import json
+from collections.abc import Callable, Iterable, Sequence
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+
+_orjson_dumps: Callable[[Any], bytes] | None
+try:
+    import orjson
+
+    _orjson_dumps = orjson.dumps
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    _orjson_dumps = None
+
+Serializer = Callable[[Any], bytes]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(content: Any) -> bytes:
+    """Compact JSON bytes; orjson when installed"""
+    if _orjson_dumps is not None:
+        return _orjson_dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+@lru_cache(maxsize=64)
+def model_serializer(response_type: Any) -> Serializer:
+    """Validate content as response_type, then encode it"""
+    adapter: TypeAdapter[Any] = TypeAdapter(response_type)
+    return lambda content: adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def response_columns(model: Any, schema: type[BaseModel]) -> list[Any]:
+    """Model columns to select for rows_serializer(schema), in field order"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+@lru_cache(maxsize=64)
+def rows_serializer(schema: type[BaseModel]) -> Serializer:
+    """Encode rows selected with response_columns(model, schema) as a JSON array of schema objects"""
+    names = tuple(schema.model_fields)
+
+    def serialize(rows: Iterable[Sequence[Any]]) -> bytes:
+        return json_dumps([dict(zip(names, row, strict=True)) for row in rows])
+
+    return serialize
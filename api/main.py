@@ -1,21 +1,48 @@
 import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
-from api.core.database import Base, engine
-from api.routers import analysis, btc
+from api.core.config import get_settings
+from api.core.database import Base, engine, get_async_engine
+from api.core.pool import pool_status
+from api.routers import analysis, btc, jobs
+from api.services.alpha_vantage import get_alpha_vantage_service
+from api.services.jobs import get_job_manager
+from api.services.scheduler import get_ingestion_scheduler
 
 # Only create database tables if not in testing mode
 if not os.getenv("TESTING", False):
     Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    alpha_vantage = get_alpha_vantage_service()
+    alpha_vantage.open()
+    scheduler = get_ingestion_scheduler()
+    if get_settings().scheduler_enabled:
+        scheduler.start()
+    yield
+    # Stop the scheduler and background jobs before the event loop goes away
+    await scheduler.stop()
+    await get_job_manager().shutdown()
+    await alpha_vantage.aclose()
+
+
 app = FastAPI(
     title="Quant API - Bitcoin Analysis Platform",
     description="A comprehensive API for Bitcoin data analysis with advanced quantitative algorithms",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -25,11 +52,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Response headers browser clients need for revalidation and paging
+    expose_headers=["ETag", "Link", "X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(btc.router, prefix="/btc", tags=["Bitcoin Data"])
 app.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
 
 @app.get("/", summary="Root endpoint")
@@ -46,3 +76,44 @@ async def root() -> dict[str, str]:
 async def health_check() -> dict[str, str]:
     """Health check endpoint"""
     return {"status": "healthy", "service": "quant-api"}
+
+
+@app.get("/health/db", summary="Database health and connection pool metrics")
+def database_health(response: Response) -> dict[str, Any]:
+    """Ping the database and report occupancy and checkout waits of both engine pools"""
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        reachable = True
+    except SQLAlchemyError:
+        reachable = False
+        response.status_code = 503
+
+    return {
+        "status": "healthy" if reachable else "unhealthy",
+        "database": "reachable" if reachable else "unreachable",
+        "ping_ms": round((time.perf_counter() - started) * 1000, 3),
+        "pools": {
+            "sync": pool_status(engine.pool),
+            "async": pool_status(get_async_engine().sync_engine.pool)
+        }
+    }
+
+
+@app.get("/health/upstream", summary="Alpha Vantage client metrics")
+def upstream_health() -> dict[str, Any]:
+    """Calls, retries, throttling, rate-limit waits and call timings of the shared Alpha Vantage client"""
+    service = get_alpha_vantage_service()
+    return {
+        "requests_per_minute": service.settings.alpha_vantage_requests_per_minute,
+        "burst": service.settings.alpha_vantage_burst,
+        "max_retries": service.settings.alpha_vantage_max_retries,
+        "metrics": service.metrics.snapshot()
+    }
+
+
+@app.get("/health/scheduler", summary="Scheduled ingestion status")
+def scheduler_health() -> dict[str, Any]:
+    """Whether scheduled ingestion is running, its next run and the outcome of the last run"""
+    return {"enabled": get_settings().scheduler_enabled, **get_ingestion_scheduler().status()}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, Index, Integer, String
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, UniqueConstraint
 from sqlalchemy.sql import func
 
 from api.core.database import Base
@@ -11,6 +11,10 @@ class BTCData(Base):
     date = Column(DateTime, unique=True, index=True, nullable=False)
     close_price = Column(Float, nullable=False)
     volume = Column(Float, nullable=False)
+    # Null for bars stored before open/high/low were kept
+    open_price = Column(Float, nullable=True)
+    high_price = Column(Float, nullable=True)
+    low_price = Column(Float, nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
@@ -19,6 +23,27 @@ class BTCData(Base):
     )
 
 
+class BTCCandle(Base):
+    """OHLCV rollup of btc_data per interval bucket, refreshed for the buckets ingests touch"""
+    __tablename__ = "btc_candles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    interval = Column(String, nullable=False)  # "1h", "1d", "1w", "1M"
+    date = Column(DateTime, nullable=False)  # bucket start
+    open_price = Column(Float, nullable=False)
+    high_price = Column(Float, nullable=False)
+    low_price = Column(Float, nullable=False)
+    close_price = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+    bar_count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Also serves /btc/candles lookups by interval, newest bucket first
+        UniqueConstraint('interval', 'date', name='uq_candle_interval_date'),
+    )
+
+
 class VolumeAnalysis(Base):
     __tablename__ = "volume_analysis"
 
@@ -29,8 +54,13 @@ class VolumeAnalysis(Base):
     volume_follows_price = Column(String, nullable=False)  # "positive", "negative", "divergent"
     strength_score = Column(Float, nullable=False)  # 0-1 score
     trend_direction = Column(String, nullable=False)  # "up", "down", "sideways"
+    # Analyzer parameters the row was computed with; together they key the watermark
+    lookback_period = Column(Integer, nullable=False, default=14, server_default="14")
+    min_periods = Column(Integer, nullable=False, default=7, server_default="7")
     created_at = Column(DateTime, default=func.now())
 
     __table_args__ = (
         Index('idx_analysis_date_desc', 'date', postgresql_using='btree'),
+        Index('idx_analysis_params_date', 'lookback_period', 'min_periods', 'date'),
+        UniqueConstraint('date', 'lookback_period', 'min_periods', name='uq_analysis_date_params'),
     )
@@ -8,6 +8,9 @@ class BTCDataBase(BaseModel):
     date: datetime
     close_price: float
     volume: float
+    open_price: float | None = None
+    high_price: float | None = None
+    low_price: float | None = None
 
 
 class BTCDataCreate(BTCDataBase):
@@ -22,6 +25,19 @@ class BTCDataResponse(BTCDataBase):
     updated_at: datetime
 
 
+class CandleResponse(BaseModel):
+    """One interval bucket; date is the bucket start"""
+    model_config = ConfigDict(from_attributes=True)
+
+    date: datetime
+    open_price: float
+    high_price: float
+    low_price: float
+    close_price: float
+    volume: float
+    bar_count: int
+
+
 class VolumeAnalysisBase(BaseModel):
     date: datetime
     price_change_pct: float
@@ -1,136 +1,229 @@
 from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
-from api.core.database import get_db
+from api.core.database import get_async_session_factory, get_db
+from api.core.pagination import Page, paginate_desc
+from api.core.serialization import (
+    json_dumps,
+    model_serializer,
+    response_columns,
+    rows_serializer,
+)
 from api.models.btc_models import BTCData, VolumeAnalysis
 from api.models.schemas import AnalysisResult, VolumeAnalysisResponse
-from calculation.volume_analyzer import get_volume_analyzer
+from api.routers.jobs import submit_job
+from api.services.cache import ANALYSIS_DATA, ResponseCache, get_response_cache
+from api.services.jobs import JobManager, get_job_manager
+from api.services.pipelines import (
+    InsufficientDataError,
+    StageCallback,
+    StorageError,
+    run_volume_analysis_pipeline,
+)
+from calculation.volume_analyzer import (
+    RELATIONSHIP_LABELS,
+    TREND_LABELS,
+    VolumeAnalysisColumns,
+    sweep_volume_analysis,
+)
 
 router = APIRouter()
 
 
 @router.post("/run-volume-analysis", summary="Run volume-price correlation analysis")
 async def run_volume_analysis(
+    response: Response,
     lookback_period: int = Query(14, ge=7, le=50, description="Analysis lookback period"),
     min_periods: int = Query(7, ge=3, le=20, description="Minimum periods for analysis"),
+    workers: int = Query(1, ge=1, le=32, description="Worker processes for long series"),
+    full: bool = Query(False, description="Delete stored results for this parameter set and rebuild from the full history"),
+    background: bool = Query(False, description="Run as a background job and return its id"),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+    jobs: JobManager = Depends(get_job_manager)
+) -> dict[str, Any]:
+    """
+    Run volume-price correlation analysis and store results.
+
+    Only bars newer than the last stored result for this parameter set are
+    analyzed unless full=true. With background=true the run is queued and
+    its progress is available from /jobs/{job_id}.
+    """
+    params = {"lookback_period": lookback_period, "min_periods": min_periods, "workers": workers, "full": full}
+
+    async def work(on_stage: StageCallback) -> dict[str, Any]:
+        async with session_factory() as db:
+            return await run_volume_analysis_pipeline(
+                db, lookback_period=lookback_period, min_periods=min_periods, workers=workers, full=full,
+                on_stage=on_stage
+            )
+
+    if background:
+        return submit_job(response, jobs, "volume_analysis", params, work, cpu_heavy=True)
+
+    try:
+        return await work(lambda _stage: None)
+    except InsufficientDataError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except StorageError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/sweep", summary="Run volume analysis over a parameter grid")
+def run_parameter_sweep(
+    lookback_min: int = Query(7, ge=7, le=50, description="Smallest lookback period"),
+    lookback_max: int = Query(50, ge=7, le=50, description="Largest lookback period"),
+    min_periods_min: int = Query(3, ge=3, le=20, description="Smallest minimum periods"),
+    min_periods_max: int = Query(20, ge=3, le=20, description="Largest minimum periods"),
     db: Session = Depends(get_db)
-) -> dict[str, str | int]:
-    """Run comprehensive volume-price correlation analysis and store results"""
+) -> dict[str, Any]:
+    """Analyze every (lookback_period, min_periods) pair in one batched pass without storing results"""
+    if lookback_min > lookback_max or min_periods_min > min_periods_max:
+        raise HTTPException(status_code=400, detail="Range minimum must not exceed maximum")
 
-    # Fetch historical data
-    btc_data = db.query(BTCData).order_by(BTCData.date.asc()).all()
+    rows = db.query(BTCData.date, BTCData.close_price, BTCData.volume).order_by(BTCData.date.asc()).all()
 
-    if len(btc_data) < min_periods:
+    if len(rows) < min_periods_min:
         raise HTTPException(
             status_code=400,
-            detail=f"Insufficient data. Need at least {min_periods} records"
+            detail=f"Insufficient data. Need at least {min_periods_min} records"
         )
 
-    # Convert to analysis format
     data_for_analysis = [
-        {
-            "date": record.date,
-            "close_price": record.close_price,
-            "volume": record.volume
-        }
-        for record in btc_data
+        {"date": date, "close_price": close_price, "volume": volume}
+        for date, close_price, volume in rows
     ]
+    sweep = sweep_volume_analysis(
+        data_for_analysis,
+        range(lookback_min, lookback_max + 1),
+        range(min_periods_min, min_periods_max + 1)
+    )
+
+    return {
+        "total_records": len(rows),
+        "parameter_sets": len(sweep),
+        "results": [
+            _summarize_sweep_columns(lookback_period, min_periods, columns)
+            for (lookback_period, min_periods), columns in sweep.items()
+        ]
+    }
 
-    # Run analysis
-    analyzer = get_volume_analyzer(lookback_period, min_periods)
-    analysis_results = analyzer.analyze_volume_price_correlation(data_for_analysis)
-
-    if not analysis_results:
-        raise HTTPException(status_code=400, detail="No analysis results generated")
-
-    # Store results in database
-    records_added = 0
-    for i, result in enumerate(analysis_results):
-        # Get corresponding date from original data
-        data_index = min_periods + i
-        if data_index < len(btc_data):
-            analysis_date = btc_data[data_index].date
-
-            # Check if analysis already exists for this date
-            existing = db.query(VolumeAnalysis).filter(
-                VolumeAnalysis.date == analysis_date
-            ).first()
-
-            if not existing:
-                volume_analysis = VolumeAnalysis(
-                    date=analysis_date,
-                    price_change_pct=result.price_change_pct,
-                    volume_change_pct=result.volume_change_pct,
-                    volume_follows_price=result.volume_follows_price,
-                    strength_score=result.strength_score,
-                    trend_direction=result.trend_direction
-                )
-                db.add(volume_analysis)
-                records_added += 1
 
-    try:
-        db.commit()
+def _summarize_sweep_columns(
+    lookback_period: int, min_periods: int, columns: VolumeAnalysisColumns
+) -> dict[str, Any]:
+    """Aggregate one parameter set's columnar results"""
+    records = len(columns)
+
+    def distribution(codes: Any, labels: tuple[str, ...]) -> dict[str, float]:
+        counts = np.bincount(codes, minlength=len(labels)) if records else np.zeros(len(labels))
         return {
-            "message": "Volume analysis completed successfully",
-            "records_analyzed": len(analysis_results),
-            "records_added": records_added
+            f"{label}_pct": round(float(count) / records * 100, 2) if records else 0.0
+            for label, count in zip(labels, counts, strict=True)
         }
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to store analysis: {str(e)}") from e
+
+    def average(values: Any) -> float | None:
+        # Windows with a zero-volume bar have NaN strength scores
+        finite = values[np.isfinite(values)]
+        return round(float(finite.mean()), 3) if len(finite) else None
+
+    return {
+        "lookback_period": lookback_period,
+        "min_periods": min_periods,
+        "records_analyzed": records,
+        "average_correlation": average(columns.correlation),
+        "average_strength_score": average(columns.strength_score),
+        "average_confidence_level": average(columns.confidence_level),
+        "volume_relationship_distribution": distribution(columns.volume_follows_price, RELATIONSHIP_LABELS),
+        "trend_distribution": distribution(columns.trend_direction, TREND_LABELS)
+    }
 
 
 @router.get("/volume-price-correlation", response_model=list[VolumeAnalysisResponse])
 def get_volume_analysis(
+    request: Request,
     limit: int = Query(30, ge=1, le=100, description="Number of records to return"),
     days_back: int = Query(30, ge=1, le=365, description="Days to look back"),
-    db: Session = Depends(get_db)
-) -> list[VolumeAnalysis]:
-    """Get volume-price correlation analysis results"""
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    lookback_period: int = Query(14, ge=7, le=50, description="Analysis parameter set to read"),
+    min_periods: int = Query(7, ge=3, le=20, description="Analysis parameter set to read"),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
+    """Get volume-price correlation analysis results, newest first, with X-Next-Cursor paging"""
+    return cache.respond(
+        request, (ANALYSIS_DATA,),
+        lambda: _load_volume_analysis(db, limit, days_back, cursor, lookback_period, min_periods),
+        rows_serializer(VolumeAnalysisResponse)
+    )
+
+
+def _load_volume_analysis(
+    db: Session, limit: int, days_back: int, cursor: str | None, lookback_period: int, min_periods: int
+) -> Page:
     cutoff_date = datetime.now() - timedelta(days=days_back)
 
-    analyses = db.query(VolumeAnalysis).filter(
-        VolumeAnalysis.date >= cutoff_date
-    ).order_by(VolumeAnalysis.date.desc()).limit(limit).all()
+    # Plain column tuples: no ORM hydration or per-row validation
+    page = paginate_desc(
+        db.query(*response_columns(VolumeAnalysis, VolumeAnalysisResponse)).filter(
+            VolumeAnalysis.date >= cutoff_date,
+            _parameter_set(lookback_period, min_periods)
+        ),
+        VolumeAnalysis, limit, cursor
+    )
 
-    if not analyses:
+    if not page.items and cursor is None:
         raise HTTPException(status_code=404, detail="No analysis data found")
 
-    return analyses
+    return page
 
 
 @router.get("/summary", response_model=AnalysisResult)
 def get_analysis_summary(
+    request: Request,
     days_back: int = Query(30, ge=1, le=365, description="Days to look back"),
-    db: Session = Depends(get_db)
-) -> AnalysisResult:
+    lookback_period: int = Query(14, ge=7, le=50, description="Analysis parameter set to read"),
+    min_periods: int = Query(7, ge=3, le=20, description="Analysis parameter set to read"),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
     """Get comprehensive analysis summary with insights and recommendations"""
-    cutoff_date = datetime.now() - timedelta(days=days_back)
+    return cache.respond(
+        request, (ANALYSIS_DATA,), lambda: _load_analysis_summary(db, days_back, lookback_period, min_periods),
+        model_serializer(AnalysisResult)
+    )
 
-    analyses = db.query(VolumeAnalysis).filter(
-        VolumeAnalysis.date >= cutoff_date
-    ).order_by(VolumeAnalysis.date.desc()).all()
 
-    if not analyses:
+def _load_analysis_summary(db: Session, days_back: int, lookback_period: int, min_periods: int) -> AnalysisResult:
+    cutoff_date = datetime.now() - timedelta(days=days_back)
+
+    # Window aggregates span every row in range; LIMIT 1 keeps only the latest row
+    row = db.query(
+        VolumeAnalysis,
+        func.count().over(),
+        *(_count_over(VolumeAnalysis.volume_follows_price, label) for label in RELATIONSHIP_LABELS),
+        *(_count_over(VolumeAnalysis.trend_direction, label) for label in TREND_LABELS),
+        func.avg(VolumeAnalysis.strength_score).over()
+    ).filter(
+        VolumeAnalysis.date >= cutoff_date,
+        _parameter_set(lookback_period, min_periods)
+    ).order_by(VolumeAnalysis.date.desc()).limit(1).first()
+
+    if row is None:
         raise HTTPException(status_code=404, detail="No analysis data found")
 
     # Calculate summary statistics
-    total_records = len(analyses)
-    latest_analysis = analyses[0] if analyses else None
-
-    # Generate insights
-    positive_correlations = len([a for a in analyses if a.volume_follows_price == "positive"])
-    negative_correlations = len([a for a in analyses if a.volume_follows_price == "negative"])
-    divergent_cases = len([a for a in analyses if a.volume_follows_price == "divergent"])
-
-    avg_strength = sum(a.strength_score for a in analyses) / total_records
-
-    up_trends = len([a for a in analyses if a.trend_direction == "up"])
-    down_trends = len([a for a in analyses if a.trend_direction == "down"])
-    sideways_trends = len([a for a in analyses if a.trend_direction == "sideways"])
+    (
+        latest_analysis, total_records,
+        positive_correlations, negative_correlations, divergent_cases,
+        up_trends, down_trends, sideways_trends,
+        avg_strength
+    ) = row
 
     summary = {
         "total_records": total_records,
@@ -148,7 +241,8 @@ def get_analysis_summary(
     # Generate recommendations
     recommendations = _generate_recommendations(
         positive_correlations, negative_correlations, divergent_cases,
-        total_records, float(avg_strength), latest_analysis
+        total_records, float(avg_strength),
+        latest_analysis.trend_direction, latest_analysis.volume_follows_price
     )
 
     return AnalysisResult(
@@ -159,9 +253,20 @@ def get_analysis_summary(
     )
 
 
+def _parameter_set(lookback_period: int, min_periods: int) -> Any:
+    """Filter on the results stored for one (lookback_period, min_periods) run"""
+    return and_(VolumeAnalysis.lookback_period == lookback_period, VolumeAnalysis.min_periods == min_periods)
+
+
+def _count_over(column: Any, label: str) -> Any:
+    """Window count of rows in the query whose column equals label"""
+    return func.sum(case((column == label, 1), else_=0)).over()
+
+
 def _generate_recommendations(
     positive: int, _negative: int, divergent: int,
-    total: int, avg_strength: float, latest: VolumeAnalysis | None
+    total: int, avg_strength: float,
+    latest_trend: str | None = None, latest_relationship: str | None = None
 ) -> list[str]:
     """Generate trading recommendations based on analysis"""
     recommendations = []
@@ -182,12 +287,12 @@ def _generate_recommendations(
         recommendations.append("Low confidence in volume patterns. Use additional confirmation signals.")
 
     # Current trend recommendations
-    if latest:
-        if latest.trend_direction == "up" and latest.volume_follows_price == "positive":
+    if latest_relationship:
+        if latest_trend == "up" and latest_relationship == "positive":
             recommendations.append("Bullish trend with volume confirmation. Consider long positions.")
-        elif latest.trend_direction == "down" and latest.volume_follows_price == "positive":
+        elif latest_trend == "down" and latest_relationship == "positive":
             recommendations.append("Bearish trend with volume confirmation. Exercise caution on long positions.")
-        elif latest.volume_follows_price == "divergent":
+        elif latest_relationship == "divergent":
             recommendations.append("Volume divergence detected. Monitor for potential trend reversal.")
 
     if not recommendations:
@@ -198,37 +303,76 @@ def _generate_recommendations(
 
 @router.get("/trends", summary="Get trend analysis")
 def get_trend_analysis(
+    request: Request,
     days_back: int = Query(30, ge=1, le=365, description="Days to look back"),
-    db: Session = Depends(get_db)
-) -> dict[str, Any]:
-    """Get detailed trend analysis with volume patterns"""
-    cutoff_date = datetime.now() - timedelta(days=days_back)
+    limit: int = Query(10, ge=1, le=1000, description="Maximum trend changes to return"),
+    since: datetime | None = Query(None, description="Return the changes after this date, oldest first"),
+    lookback_period: int = Query(14, ge=7, le=50, description="Analysis parameter set to read"),
+    min_periods: int = Query(7, ge=3, le=20, description="Analysis parameter set to read"),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
+    """
+    Get detailed trend analysis with volume patterns.
+
+    Trend changes are detected in SQL with LAG() over date. Without since the
+    latest changes are returned; with since the changes after it are returned
+    oldest first, and next_since continues from the last one.
+    """
+    return cache.respond(
+        request, (ANALYSIS_DATA,),
+        lambda: _load_trend_analysis(db, days_back, limit, since, lookback_period, min_periods), json_dumps
+    )
 
-    analyses = db.query(VolumeAnalysis).filter(
-        VolumeAnalysis.date >= cutoff_date
-    ).order_by(VolumeAnalysis.date.asc()).all()
 
-    if not analyses:
+def _load_trend_analysis(
+    db: Session, days_back: int, limit: int, since: datetime | None, lookback_period: int, min_periods: int
+) -> dict[str, Any]:
+    cutoff_date = datetime.now() - timedelta(days=days_back)
+    # LAG() runs over the filtered rows, so only one parameter set's results are compared
+    in_range = and_(VolumeAnalysis.date >= cutoff_date, _parameter_set(lookback_period, min_periods))
+
+    ranked = db.query(
+        VolumeAnalysis.date,
+        VolumeAnalysis.trend_direction,
+        VolumeAnalysis.volume_follows_price,
+        VolumeAnalysis.strength_score,
+        func.lag(VolumeAnalysis.trend_direction).over(
+            order_by=(VolumeAnalysis.date, VolumeAnalysis.id)
+        ).label("previous_trend")
+    ).filter(in_range).subquery()
+    changes = select(ranked).where(ranked.c.previous_trend != ranked.c.trend_direction).subquery()
+
+    latest = db.query(
+        VolumeAnalysis.trend_direction,
+        VolumeAnalysis.volume_follows_price,
+        select(func.count()).select_from(changes).scalar_subquery()
+    ).filter(in_range).order_by(VolumeAnalysis.date.desc(), VolumeAnalysis.id.desc()).limit(1).first()
+
+    if latest is None:
         raise HTTPException(status_code=404, detail="No analysis data found")
+    current_trend, current_volume_relationship, total_trend_changes = latest
 
-    # Calculate trend statistics
-    trend_changes = []
-    for i in range(1, len(analyses)):
-        prev_trend = analyses[i-1].trend_direction
-        curr_trend = analyses[i].trend_direction
-        if prev_trend != curr_trend:
-            trend_changes.append({
-                "date": analyses[i].date.isoformat(),
-                "from": prev_trend,
-                "to": curr_trend,
-                "volume_relationship": analyses[i].volume_follows_price,
-                "strength": analyses[i].strength_score
-            })
+    page = select(changes, func.count().over().label("remaining"))
+    if since is None:
+        rows = db.execute(page.order_by(changes.c.date.desc()).limit(limit)).all()[::-1]
+    else:
+        rows = db.execute(page.where(changes.c.date > since).order_by(changes.c.date.asc()).limit(limit)).all()
 
     return {
         "period_days": days_back,
-        "total_trend_changes": len(trend_changes),
-        "trend_changes": trend_changes[-10:],  # Last 10 changes
-        "current_trend": analyses[-1].trend_direction if analyses else "unknown",
-        "current_volume_relationship": analyses[-1].volume_follows_price if analyses else "unknown"
+        "total_trend_changes": total_trend_changes,
+        "trend_changes": [
+            {
+                "date": row.date.isoformat(),
+                "from": row.previous_trend,
+                "to": row.trend_direction,
+                "volume_relationship": row.volume_follows_price,
+                "strength": row.strength_score
+            }
+            for row in rows
+        ],
+        "current_trend": current_trend,
+        "current_volume_relationship": current_volume_relationship,
+        "next_since": rows[-1].date.isoformat() if since is not None and rows and rows[0].remaining > limit else None
     }
@@ -1,90 +1,184 @@
 from datetime import datetime, timedelta
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
-from api.core.database import get_db
-from api.models.btc_models import BTCData
-from api.models.schemas import BTCDataResponse
-from api.services.alpha_vantage import get_alpha_vantage_service
+from api.core.config import get_settings
+from api.core.database import get_async_session_factory, get_db
+from api.core.pagination import Page, paginate_desc
+from api.core.serialization import (
+    json_dumps,
+    model_serializer,
+    response_columns,
+    rows_serializer,
+)
+from api.models.btc_models import BTCCandle, BTCData
+from api.models.schemas import BTCDataResponse, CandleResponse
+from api.routers.jobs import submit_job
+from api.services import export, stats
+from api.services.cache import BTC_DATA, ResponseCache, get_response_cache
+from api.services.candles import bucket_start
+from api.services.jobs import JobManager, get_job_manager
+from api.services.pipelines import StageCallback, fetch_btc_data_pipeline
 
 router = APIRouter()
 
 
 @router.post("/fetch-data", response_model=dict, summary="Fetch latest BTC data")
-async def fetch_btc_data(db: Session = Depends(get_db)) -> dict[str, str | int]:
+async def fetch_btc_data(
+    response: Response,
+    update_existing: bool = Query(False, description="Update stored bars whose close or volume changed"),
+    background: bool = Query(False, description="Run as a background job and return its id"),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+    jobs: JobManager = Depends(get_job_manager)
+) -> dict[str, Any]:
     """Fetch latest Bitcoin data from Alpha Vantage and store in database"""
-    try:
-        service = get_alpha_vantage_service()
-        raw_data = await service.fetch_btc_daily_data()
-        parsed_data = service.parse_btc_data(raw_data)
-
-        records_added = 0
-        for data_point in parsed_data:
-            # Check if record already exists
-            existing = db.query(BTCData).filter(BTCData.date == data_point["date"]).first()
-            if not existing:
-                btc_record = BTCData(**data_point)
-                db.add(btc_record)
-                records_added += 1
-
-        db.commit()
-        return {
-            "message": "Data fetched successfully",
-            "records_added": records_added,
-            "total_records": len(parsed_data)
-        }
+    params = {"update_existing": update_existing}
+
+    async def work(on_stage: StageCallback) -> dict[str, Any]:
+        async with session_factory() as db:
+            return await fetch_btc_data_pipeline(db, **params, on_stage=on_stage)
+
+    if background:
+        return submit_job(response, jobs, "fetch_btc_data", params, work)
 
+    try:
+        return await work(lambda _stage: None)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to fetch data: {str(e)}") from e
 
 
 @router.get("/history", response_model=list[BTCDataResponse], summary="Get historical BTC data")
 def get_btc_history(
+    request: Request,
     limit: int = 30,
     days_back: int = 30,
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
+    """
+    Get historical Bitcoin data from the database, newest first.
+
+    When more rows are in range the response carries X-Next-Cursor and a
+    Link rel="next" header for the following page.
+    """
+    def load() -> Page:
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+
+        # Plain column tuples: no ORM hydration or per-row validation
+        page = paginate_desc(
+            db.query(*response_columns(BTCData, BTCDataResponse)).filter(BTCData.date >= cutoff_date),
+            BTCData, limit, cursor
+        )
+
+        if not page.items and cursor is None:
+            raise HTTPException(status_code=404, detail="No data found")
+
+        return page
+
+    return cache.respond(request, (BTC_DATA,), load, rows_serializer(BTCDataResponse))
+
+
+@router.get("/candles", response_model=list[CandleResponse], summary="Get OHLCV candles per interval")
+def get_btc_candles(
+    request: Request,
+    interval: str = Query(..., description="Bucket size: one of CANDLE_INTERVALS (default 1w, 1M)"),
+    limit: int = Query(500, ge=1, le=5000),
+    start: datetime | None = Query(None, description="Include the bucket containing this date and later ones"),
+    end: datetime | None = Query(None, description="Include buckets starting on or before this date"),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
+    """
+    Get pre-aggregated candles, newest bucket first.
+
+    Candles are maintained on ingest, so a response reads one row per
+    bucket instead of every bar in the range.
+    """
+    intervals = get_settings().candle_intervals
+    if interval not in intervals:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported interval: {interval} (available: {', '.join(intervals)})"
+        )
+
+    def load() -> list[Any]:
+        query = db.query(*response_columns(BTCCandle, CandleResponse)).filter(BTCCandle.interval == interval)
+        if start is not None:
+            query = query.filter(BTCCandle.date >= bucket_start(interval, start))
+        if end is not None:
+            query = query.filter(BTCCandle.date <= end)
+        candles: list[Any] = query.order_by(BTCCandle.date.desc()).limit(limit).all()
+
+        if not candles:
+            raise HTTPException(status_code=404, detail="No candles found")
+
+        return candles
+
+    return cache.respond(request, (BTC_DATA,), load, rows_serializer(CandleResponse))
+
+
+@router.get("/export", summary="Stream BTC history as NDJSON, CSV, Arrow or Parquet")
+def export_btc_history(
+    fmt: Literal["ndjson", "csv", "arrow", "parquet"] = Query(
+        "ndjson", alias="format", description="ndjson, csv, arrow (IPC stream) or parquet"
+    ),
+    start: datetime | None = Query(None, description="First date to include"),
+    end: datetime | None = Query(None, description="Last date to include"),
+    with_analysis: bool = Query(False, description="Join each bar with its stored analysis result"),
+    lookback_period: int = Query(14, ge=7, le=50, description="Analysis parameter set to join"),
+    min_periods: int = Query(7, ge=3, le=20, description="Analysis parameter set to join"),
     db: Session = Depends(get_db)
-) -> list[BTCData]:
-    """Get historical Bitcoin data from the database"""
-    cutoff_date = datetime.now() - timedelta(days=days_back)
-
-    data = db.query(BTCData).filter(
-        BTCData.date >= cutoff_date
-    ).order_by(BTCData.date.desc()).limit(limit).all()
-
-    if not data:
-        raise HTTPException(status_code=404, detail="No data found")
+) -> StreamingResponse:
+    """
+    Export stored bars oldest first, streamed in chunks from a server-side cursor.
+
+    With with_analysis=true the analysis columns of the given parameter set
+    are added; bars without a stored result have nulls there.
+    """
+    analysis_params = (lookback_period, min_periods) if with_analysis else None
+    try:
+        body = export.stream_btc_history(
+            db, fmt, start, end, get_settings().export_chunk_size, analysis_params=analysis_params
+        )
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e)) from e
 
-    return data
+    # The session stays open until the streamed response has been sent
+    return StreamingResponse(
+        body,
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="btc_history.{export.FILE_EXTENSIONS[fmt]}"'}
+    )
 
 
 @router.get("/latest", response_model=BTCDataResponse, summary="Get latest BTC data")
-def get_latest_btc_data(db: Session = Depends(get_db)) -> BTCData:
+def get_latest_btc_data(
+    request: Request,
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
     """Get the most recent Bitcoin data point"""
-    latest = db.query(BTCData).order_by(BTCData.date.desc()).first()
+    def load() -> BTCData:
+        latest = db.query(BTCData).order_by(BTCData.date.desc()).first()
+
+        if not latest:
+            raise HTTPException(status_code=404, detail="No data found")
 
-    if not latest:
-        raise HTTPException(status_code=404, detail="No data found")
+        return latest
 
-    return latest
+    return cache.respond(request, (BTC_DATA,), load, model_serializer(BTCDataResponse))
 
 
 @router.get("/stats", summary="Get BTC data statistics")
-def get_btc_stats(db: Session = Depends(get_db)) -> dict[str, str | int | float | None]:
+def get_btc_stats(
+    request: Request,
+    approximate_count: bool = Query(False, description="Use the planner's row estimate (PostgreSQL) instead of counting"),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+) -> Response:
     """Get basic statistics about stored Bitcoin data"""
-    total_records = db.query(BTCData).count()
-
-    if total_records == 0:
-        return {"message": "No data available", "total_records": 0}
-
-    latest = db.query(BTCData).order_by(BTCData.date.desc()).first()
-    oldest = db.query(BTCData).order_by(BTCData.date.asc()).first()
-
-    return {
-        "total_records": total_records,
-        "latest_date": latest.date.isoformat() if latest else None,
-        "oldest_date": oldest.date.isoformat() if oldest else None,
-        "latest_price": float(latest.close_price) if latest else None,
-        "date_range_days": (latest.date - oldest.date).days if latest and oldest else 0
-    }
+    return cache.respond(request, (BTC_DATA,), lambda: stats.compute_btc_stats(db, approximate_count), json_dumps)
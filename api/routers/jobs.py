@@ -0,0 +1,40 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from api.services.jobs import JobManager, JobQueueFullError, JobWork, get_job_manager
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", summary="Get background job status")
+def get_job(job_id: str, manager: JobManager = Depends(get_job_manager)) -> dict[str, Any]:
+    """Progress, stage timings and, once finished, the result or error of a job"""
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def submit_job(
+    response: Response,
+    manager: JobManager,
+    kind: str,
+    params: dict[str, Any],
+    work: JobWork,
+    cpu_heavy: bool = False
+) -> dict[str, Any]:
+    """Submit work as a background job and describe it with a 202 response"""
+    try:
+        job, created = manager.submit(kind, params, work, cpu_heavy=cpu_heavy)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    response.status_code = 202
+    return {
+        "message": "Job submitted" if created else "Identical job already in progress",
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": not created,
+        "status_url": f"/jobs/{job.id}"
+    }
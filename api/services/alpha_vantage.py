@@ -1,18 +1,182 @@
-from datetime import datetime
+import asyncio
+import math
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date as Date
 from functools import lru_cache
-from typing import Any
+from typing import Any, NamedTuple
 
 import httpx
+import numpy as np
+from numpy.typing import NDArray
 
-from api.core.config import get_settings
+from api.core.concurrency import run_cpu_bound
+from api.core.config import Settings, get_settings
+from api.core.ratelimit import TokenBucket
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    from json import loads as json_loads
+
+TIME_SERIES_KEY = "Time Series (Digital Currency Daily)"
+# BTCColumns field for each value of a daily entry
+PRICE_FIELDS = {
+    "close_price": "4. close",
+    "volume": "5. volume",
+    "open_price": "1. open",
+    "high_price": "2. high",
+    "low_price": "3. low",
+}
+# Fields a daily entry may omit; missing values parse as NaN and are stored as NULL
+OPTIONAL_PRICE_FIELDS = frozenset({"open_price", "high_price", "low_price"})
+
+
+class BTCColumns(NamedTuple):
+    """Parsed daily bars as date-sorted column arrays"""
+    date: NDArray[np.datetime64]
+    close_price: NDArray[np.float64]
+    volume: NDArray[np.float64]
+    open_price: NDArray[np.float64]
+    high_price: NDArray[np.float64]
+    low_price: NDArray[np.float64]
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        """Row dicts (datetime dates) in BTCData column format; NaN open/high/low become None"""
+        return [
+            {
+                "date": day, "close_price": close_price, "volume": volume,
+                "open_price": open_price, "high_price": high_price, "low_price": low_price
+            }
+            for day, close_price, volume, open_price, high_price, low_price in zip(
+                self.date.astype('datetime64[us]').tolist(),
+                self.close_price.tolist(),
+                self.volume.tolist(),
+                _nullable(self.open_price),
+                _nullable(self.high_price),
+                _nullable(self.low_price),
+                strict=True
+            )
+        ]
+
+    def since(self, day: Date | None) -> "BTCColumns":
+        """Bars dated after day (views, no copy); all bars when day is None"""
+        if day is None:
+            return self
+        start = int(np.searchsorted(self.date, np.datetime64(day.strftime("%Y-%m-%d"), 'D') + 1, side="left"))
+        return BTCColumns._make(column[start:] for column in self)
+
+
+def _nullable(column: NDArray[np.float64]) -> list[float | None]:
+    return [None if math.isnan(value) else value for value in column.tolist()]
+
+
+class AlphaVantageError(RuntimeError):
+    """Alpha Vantage kept throttling the request after all retries"""
+
+
+@dataclass
+class UpstreamMetrics:
+    """
+    Counters and timings of Alpha Vantage calls; updated on the event loop only.
+
+    fetch_requests counts fetch_btc_columns calls, of which coalesced joined an
+    in-flight fetch and fresh_hits reused the last result; calls and attempts
+    count upstream calls and the HTTP requests they made.
+    """
+    fetch_requests: int = 0
+    coalesced: int = 0
+    fresh_hits: int = 0
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    transport_errors: int = 0
+    rate_limit_wait_seconds: float = 0.0
+    total_call_seconds: float = 0.0
+    max_call_seconds: float = 0.0
+    last_call_seconds: float | None = None
+
+    def record_call(self, seconds: float) -> None:
+        self.total_call_seconds += seconds
+        self.max_call_seconds = max(self.max_call_seconds, seconds)
+        self.last_call_seconds = seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        snapshot = asdict(self)
+        snapshot["avg_call_seconds"] = self.total_call_seconds / self.calls if self.calls else 0.0
+        return snapshot
+
+
+def _throttle_note(payload: Any) -> str | None:
+    """
+    The message of a throttled response, or None.
+
+    Alpha Vantage answers over-quota calls with HTTP 200 and a Note or
+    Information message in place of the time series.
+    """
+    if not isinstance(payload, dict) or TIME_SERIES_KEY in payload:
+        return None
+    for key in ("Note", "Information"):
+        message = payload.get(key)
+        if isinstance(message, str) and any(
+            phrase in message.lower() for phrase in ("call frequency", "rate limit", "requests per")
+        ):
+            return message
+    return None
 
 
 class AlphaVantageService:
-    """Service to fetch data from Alpha Vantage API"""
+    """
+    Service to fetch data from Alpha Vantage API.
+
+    Calls share one keep-alive AsyncClient (opened and closed by the app
+    lifespan, or created on first use), wait for a token from a client-side
+    rate limiter, and are retried with jittered exponential backoff on
+    transport errors, 429/5xx responses and throttle notes.
 
-    def __init__(self) -> None:
-        self.settings = get_settings()
+    fetch_btc_columns adds single-flight coalescing and a freshness window on
+    top, so bursts of fetches cost one upstream call and one parse.
+    """
+
+    def __init__(self, settings: Settings | None = None, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.settings = settings or get_settings()
         self.base_url = "https://www.alphavantage.co/query"
+        self.metrics = UpstreamMetrics()
+        self.rate_limiter = TokenBucket(
+            self.settings.alpha_vantage_requests_per_minute / 60, self.settings.alpha_vantage_burst
+        )
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._in_flight: asyncio.Future[BTCColumns] | None = None
+        # (expiry on the monotonic clock, result) of the last successful fetch
+        self._fresh: tuple[float, BTCColumns] | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.settings.alpha_vantage_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.settings.alpha_vantage_max_connections,
+                    max_keepalive_connections=self.settings.alpha_vantage_max_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    def open(self) -> None:
+        """Create the shared client ahead of the first call"""
+        self.client  # noqa: B018
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def fetch_btc_daily_data(self) -> dict[str, Any]:
         """Fetch daily BTC data from Alpha Vantage"""
@@ -22,29 +186,132 @@ class AlphaVantageService:
             "market": "USD",
             "apikey": self.settings.alpha_vantage_api_key
         }
+        return await self._get_json(params)
+
+    async def fetch_btc_columns(self) -> BTCColumns:
+        """
+        Fetched and parsed daily series, shared between callers.
+
+        A call made while another is in flight awaits the same upstream call
+        and parse; for alpha_vantage_fresh_seconds after a successful fetch
+        the last result is returned without calling upstream. Callers must
+        treat the shared arrays as read-only.
+        """
+        self.metrics.fetch_requests += 1
+        if self._fresh is not None and self._fresh[0] > time.monotonic():
+            self.metrics.fresh_hits += 1
+            return self._fresh[1]
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()  # type: ignore[no-any-return]
+        if self._in_flight is None:
+            self._in_flight = asyncio.ensure_future(self._fetch_and_parse())
+        else:
+            self.metrics.coalesced += 1
+        # A cancelled caller must not cancel the fetch the others are waiting for
+        return await asyncio.shield(self._in_flight)
 
-    def parse_btc_data(self, raw_data: dict[str, Any]) -> list[dict[str, Any]]:
-        """Parse raw Alpha Vantage response into structured data"""
-        if "Time Series (Digital Currency Daily)" not in raw_data:
+    async def _fetch_and_parse(self) -> BTCColumns:
+        try:
+            raw_data = await self.fetch_btc_daily_data()
+            columns = await run_cpu_bound(self.parse_btc_columns, raw_data)
+            if self.settings.alpha_vantage_fresh_seconds > 0:
+                self._fresh = (time.monotonic() + self.settings.alpha_vantage_fresh_seconds, columns)
+            return columns
+        finally:
+            self._in_flight = None
+
+    async def _get_json(self, params: dict[str, str]) -> dict[str, Any]:
+        started = time.perf_counter()
+        self.metrics.calls += 1
+        try:
+            attempt = 0
+            while True:
+                outcome = await self._attempt(params)
+                if not isinstance(outcome, Exception):
+                    return outcome
+                if attempt >= self.settings.alpha_vantage_max_retries:
+                    raise outcome
+                self.metrics.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+        except Exception:
+            self.metrics.failures += 1
+            raise
+        finally:
+            self.metrics.record_call(time.perf_counter() - started)
+
+    async def _attempt(self, params: dict[str, str]) -> dict[str, Any] | Exception:
+        """One rate-limited request: the payload, or the retryable error it ended with"""
+        self.metrics.rate_limit_wait_seconds += await self.rate_limiter.acquire()
+        self.metrics.attempts += 1
+        try:
+            response = await self.client.get(self.base_url, params=params)
+        except httpx.TransportError as e:
+            self.metrics.transport_errors += 1
+            return e
+
+        if response.status_code == 429 or response.is_server_error:
+            if response.status_code == 429:
+                self.metrics.throttled += 1
+            else:
+                self.metrics.server_errors += 1
+            return httpx.HTTPStatusError(
+                f"Alpha Vantage returned HTTP {response.status_code}", request=response.request, response=response
+            )
+        # Other client errors (bad request, auth) are not retried
+        response.raise_for_status()
+
+        payload: dict[str, Any] = json_loads(response.content)
+        note = _throttle_note(payload)
+        if note is not None:
+            self.metrics.throttled += 1
+            return AlphaVantageError(f"Alpha Vantage throttled the request: {note}")
+        return payload
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        ceiling = min(self.settings.alpha_vantage_backoff_max, self.settings.alpha_vantage_backoff_base * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def parse_btc_data(
+        self, raw_data: dict[str, Any], since: Date | None = None
+    ) -> list[dict[str, Any]]:
+        """Parse raw Alpha Vantage response into structured data sorted by date"""
+        return self.parse_btc_columns(raw_data, since).to_rows()
+
+    def parse_btc_columns(
+        self, raw_data: dict[str, Any], since: Date | None = None
+    ) -> BTCColumns:
+        """
+        Parse raw Alpha Vantage response into date-sorted column arrays.
+        Days on or before ``since`` are dropped before any value is converted.
+        """
+        if TIME_SERIES_KEY not in raw_data:
             raise ValueError("Invalid API response format")
 
-        time_series = raw_data["Time Series (Digital Currency Daily)"]
-        parsed_data = []
+        time_series = raw_data[TIME_SERIES_KEY]
+        days = list(time_series)
+        if since is not None:
+            # ISO dates order lexicographically, so the keys filter without parsing
+            cutoff = since.strftime("%Y-%m-%d")
+            days = [day for day in days if day > cutoff]
 
-        for date_str, data in time_series.items():
-            parsed_data.append({
-                "date": datetime.strptime(date_str, "%Y-%m-%d"),
-                "close_price": float(data["4. close"]),
-                "volume": float(data["5. volume"])
-            })
+        dates = np.array(days, dtype='datetime64[D]').astype('datetime64[ns]')
+        entries = [time_series[day] for day in days]
+        values = {
+            field: np.array(
+                [entry.get(key, "nan") for entry in entries]
+                if field in OPTIONAL_PRICE_FIELDS
+                else [entry[key] for entry in entries]
+            ).astype(np.float64)
+            for field, key in PRICE_FIELDS.items()
+        }
 
-        # Sort by date ascending for calculations
-        return sorted(parsed_data, key=lambda x: x["date"])
+        # Alpha Vantage lists days newest first; reversing avoids a sort in the common case
+        if len(dates) > 1 and np.all(dates[1:] < dates[:-1]):
+            order: slice | NDArray[np.intp] = slice(None, None, -1)
+        else:
+            order = np.argsort(dates, kind='stable')
+        return BTCColumns(dates[order], **{field: column[order] for field, column in values.items()})
 
 
 @lru_cache
@@ -0,0 +1,420 @@
+"""
+Offline bulk backfill of btc_data from CSV or Parquet OHLCV files.
+
+Files are read in chunks of chunk_size rows and each chunk is loaded and
+committed on its own. On PostgreSQL a chunk is streamed with COPY FROM STDIN
+into a temporary staging table and merged into btc_data with one
+INSERT ... SELECT ... ON CONFLICT; on SQLite it is written with one batched
+executemany. Date, close and volume columns are required; open, high and
+low are stored when present. Candles of the CANDLE_INTERVALS buckets a chunk
+touches are refreshed in the same transaction.
+
+After every committed chunk the file offset (a byte offset for CSV, a row
+offset for Parquet) is written to a checkpoint file, so an interrupted load
+continues where it stopped with --resume. The checkpoint is removed when
+the file has been loaded completely.
+
+Usage:
+    python -m api.services.backfill bars.csv
+    python -m api.services.backfill bars.parquet --chunk-size 100000 --resume --analyze
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import math
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from sqlalchemy import create_engine, func, or_, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from api.core.config import get_settings
+from api.core.database import async_database_url
+from api.models.btc_models import BTCData
+from api.services.cache import BTC_DATA, get_response_cache
+from api.services.persistence import BAR_VALUES, refresh_candles
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Accepted header names (case-insensitive) for each stored column, in Bar order
+COLUMN_ALIASES = {
+    "date": ("date", "timestamp", "time", "datetime"),
+    "close_price": ("close_price", "close", "4. close"),
+    "volume": ("volume", "5. volume"),
+    "open_price": ("open_price", "open", "1. open"),
+    "high_price": ("high_price", "high", "2. high"),
+    "low_price": ("low_price", "low", "3. low"),
+}
+REQUIRED_COLUMNS = ("date", "close_price", "volume")
+FORMATS = ("csv", "parquet")
+
+# (date, close_price, volume, open_price, high_price, low_price); open/high/low may be None
+Bar = tuple[datetime, float, float, float | None, float | None, float | None]
+
+
+class Chunk(NamedTuple):
+    """Parsed bars of one chunk, rows that could not be parsed and the offset after the chunk"""
+
+    rows: list[Bar]
+    invalid: int
+    offset: int
+
+
+@dataclass
+class BackfillStats:
+    """Running totals of a backfill; offset is where the next chunk starts"""
+
+    offset: int = 0
+    size: int = 0  # file bytes (CSV) or rows (Parquet); offset / size is the progress
+    chunks: int = 0
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+
+    @property
+    def unchanged(self) -> int:
+        """Rows already stored (including repeated dates) that were left as they were"""
+        return self.rows_read - self.invalid - self.inserted - self.updated
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "unchanged": self.unchanged,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1)
+        }
+
+
+def _parse_date(value: Any) -> datetime:
+    """ISO 8601 string, epoch seconds, date or datetime, as a naive UTC datetime"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime(value.year, value.month, value.day)
+    elif isinstance(value, int | float) or (isinstance(value, str) and value.strip().isdigit() and len(value.strip()) > 8):
+        # Digit strings longer than a compact ISO date (YYYYMMDD) are epoch seconds
+        parsed = datetime.fromtimestamp(float(value), UTC)
+    elif isinstance(value, str):
+        parsed = datetime.fromisoformat(value.strip())
+    else:
+        # None from a Parquet null or a short CSV row
+        raise ValueError(f"Unsupported date value: {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+    return parsed
+
+
+def _column_indexes(names: list[str]) -> list[int | None]:
+    """Positions of the Bar columns in a header; None for missing optional columns"""
+    normalized = [name.strip().lower() for name in names]
+    indexes: list[int | None] = []
+    for column, aliases in COLUMN_ALIASES.items():
+        matches = [normalized.index(alias) for alias in aliases if alias in normalized]
+        if not matches and column in REQUIRED_COLUMNS:
+            raise ValueError(f"No {column} column found (expected one of: {', '.join(aliases)})")
+        indexes.append(matches[0] if matches else None)
+    return indexes
+
+
+def _optional_float(value: Any) -> float | None:
+    return None if value is None or value == "" else float(value)
+
+
+def _parse_rows(records: Iterable[Sequence[Any]]) -> tuple[list[Bar], int]:
+    """Bars that parse with finite values, and the number of rows that do not"""
+    rows = []
+    invalid = 0
+    for raw_date, close_price, volume, open_price, high_price, low_price in records:
+        try:
+            bar: Bar = (
+                _parse_date(raw_date), float(close_price), float(volume),
+                _optional_float(open_price), _optional_float(high_price), _optional_float(low_price)
+            )
+        except (TypeError, ValueError, OverflowError, OSError):
+            invalid += 1
+            continue
+        if all(value is None or math.isfinite(value) for value in bar[1:]):
+            rows.append(bar)
+        else:
+            invalid += 1
+    return rows, invalid
+
+
+def read_csv_chunks(path: Path, chunk_size: int, offset: int = 0) -> Iterator[Chunk]:
+    """CSV chunks starting at byte offset (0 or an offset from a previous chunk)"""
+    with path.open("rb") as file:
+        header = next(csv.reader([file.readline().decode("utf-8-sig")]))
+        indexes = _column_indexes(header)
+        if offset:
+            file.seek(offset)
+        while True:
+            lines = [line.decode() for line in (file.readline() for _ in range(chunk_size)) if line]
+            if not lines:
+                return
+            records = (
+                [fields[i] if i is not None and i < len(fields) else None for i in indexes]
+                for fields in csv.reader(lines) if fields
+            )
+            rows, invalid = _parse_rows(records)
+            yield Chunk(rows, invalid, file.tell())
+
+
+def read_parquet_chunks(path: Path, chunk_size: int, offset: int = 0) -> Iterator[Chunk]:
+    """Parquet chunks starting at row offset; row groups before the offset are not read"""
+    parquet = _parquet_file(path)
+    names = parquet.schema_arrow.names
+    columns = [None if i is None else names[i] for i in _column_indexes(names)]
+
+    first_group = 0
+    skip = offset
+    while first_group < parquet.num_row_groups and skip >= parquet.metadata.row_group(first_group).num_rows:
+        skip -= parquet.metadata.row_group(first_group).num_rows
+        first_group += 1
+
+    position = offset - skip
+    batches = parquet.iter_batches(
+        batch_size=chunk_size, columns=[name for name in columns if name is not None], row_groups=range(first_group, parquet.num_row_groups)
+    )
+    for batch in batches:
+        position += batch.num_rows
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        batch = batch.slice(skip)
+        skip = 0
+        values = [[None] * batch.num_rows if name is None else batch.column(name).to_pylist() for name in columns]
+        rows, invalid = _parse_rows(zip(*values, strict=True))
+        yield Chunk(rows, invalid, position)
+
+
+def _parquet_file(path: Path) -> Any:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is required to load Parquet files") from e
+    return pq.ParquetFile(path)
+
+
+def _file_size(path: Path, fmt: str) -> int:
+    if fmt == "parquet":
+        return int(_parquet_file(path).metadata.num_rows)
+    return path.stat().st_size
+
+
+def _copy_merge(db: Session, rows: list[Bar], update_existing: bool) -> tuple[int, int]:
+    """PostgreSQL: COPY the chunk into a staging table, then merge it into btc_data"""
+    columns = ", ".join(("date", *BAR_VALUES))
+    db.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS btc_data_staging (date timestamp NOT NULL, "
+        "close_price double precision NOT NULL, volume double precision NOT NULL, "
+        "open_price double precision, high_price double precision, low_price double precision) "
+        "ON COMMIT DELETE ROWS"
+    ))
+    buffer = io.StringIO()
+    # Unquoted empty fields are NULL in COPY's CSV format
+    csv.writer(buffer, lineterminator="\n").writerows(
+        (row[0].isoformat(sep=" "), *("" if value is None else repr(value) for value in row[1:])) for row in rows
+    )
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY btc_data_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    if update_existing:
+        stored = ", ".join(f"btc_data.{name}" for name in BAR_VALUES)
+        excluded = ", ".join(f"EXCLUDED.{name}" for name in BAR_VALUES)
+        conflict = (
+            f"DO UPDATE SET ({', '.join(BAR_VALUES)}, updated_at) = ({excluded}, now()) "
+            f"WHERE ({stored}) IS DISTINCT FROM ({excluded})"
+        )
+    else:
+        conflict = "DO NOTHING"
+    # xmax is 0 for freshly inserted row versions and set for updated ones
+    inserted_flags = db.execute(text(
+        f"INSERT INTO btc_data ({columns}, created_at, updated_at) "
+        f"SELECT {columns}, now(), now() FROM btc_data_staging "
+        f"ON CONFLICT (date) {conflict} RETURNING (xmax = 0)"
+    )).scalars().all()
+    inserted = sum(inserted_flags)
+    return inserted, len(inserted_flags) - inserted
+
+
+def _executemany(db: Session, rows: list[Bar], update_existing: bool) -> tuple[int, int]:
+    """SQLite: one executemany INSERT ... ON CONFLICT for the chunk"""
+    statement = sqlite.insert(BTCData)
+    if update_existing:
+        statement = statement.on_conflict_do_update(
+            index_elements=["date"],
+            set_={**{name: statement.excluded[name] for name in BAR_VALUES}, "updated_at": datetime.now()},
+            where=or_(*(getattr(BTCData, name).is_distinct_from(statement.excluded[name]) for name in BAR_VALUES))
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=["date"])
+
+    last_id = db.scalar(select(func.max(BTCData.id))) or 0
+    # Core execute on the session's connection: a plain DBAPI executemany, not the ORM bulk path
+    written = db.connection().execute(
+        statement, [dict(zip(("date", *BAR_VALUES), row, strict=True)) for row in rows]
+    ).rowcount
+    inserted = db.scalar(select(func.count()).select_from(BTCData).where(BTCData.id > last_id)) or 0
+    return inserted, written - inserted
+
+
+_LOADERS: dict[str, Callable[[Session, list[Bar], bool], tuple[int, int]]] = {
+    "postgresql": _copy_merge,
+    "sqlite": _executemany,
+}
+
+
+def backfill(
+    db: Session,
+    path: Path,
+    fmt: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    offset: int = 0,
+    update_existing: bool = False,
+    checkpoint: Path | None = None,
+    on_progress: Callable[[BackfillStats], None] | None = None,
+    candle_intervals: Sequence[str] = (),
+) -> BackfillStats:
+    """
+    Load path into btc_data chunk by chunk, committing each chunk.
+
+    Dates already stored are left alone unless update_existing is set, in
+    which case bars whose values differ are overwritten. Candles of
+    candle_intervals are refreshed for the buckets of chunks that changed
+    anything.
+    """
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported file format: {fmt} (expected one of: {', '.join(FORMATS)})")
+    dialect = db.get_bind().dialect.name
+    if dialect not in _LOADERS:
+        raise ValueError(f"Bulk backfill is not supported for dialect: {dialect}")
+    load = _LOADERS[dialect]
+    read = read_parquet_chunks if fmt == "parquet" else read_csv_chunks
+
+    backfill_stats = BackfillStats(offset=offset, size=_file_size(path, fmt))
+    started = time.perf_counter()
+    for chunk in read(path, chunk_size, offset):
+        # Within a chunk the last row for a date wins
+        rows = list({row[0]: row for row in chunk.rows}.values())
+        try:
+            inserted, updated = load(db, rows, update_existing) if rows else (0, 0)
+            if inserted or updated:
+                refresh_candles(db, (row[0] for row in rows), candle_intervals)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        backfill_stats.chunks += 1
+        backfill_stats.rows_read += len(chunk.rows) + chunk.invalid
+        backfill_stats.invalid += chunk.invalid
+        backfill_stats.inserted += inserted
+        backfill_stats.updated += updated
+        backfill_stats.offset = chunk.offset
+        backfill_stats.seconds = time.perf_counter() - started
+        if checkpoint is not None:
+            checkpoint.write_text(json.dumps({"source": str(path.resolve()), "format": fmt, "offset": chunk.offset}))
+        if on_progress is not None:
+            on_progress(backfill_stats)
+
+    backfill_stats.seconds = time.perf_counter() - started
+    if checkpoint is not None:
+        checkpoint.unlink(missing_ok=True)
+    if backfill_stats.inserted or backfill_stats.updated:
+        get_response_cache().bump(BTC_DATA)
+    return backfill_stats
+
+
+def resume_offset(checkpoint: Path, path: Path) -> int:
+    """Offset recorded for path in checkpoint, or 0 when there is none"""
+    if not checkpoint.exists():
+        return 0
+    state = json.loads(checkpoint.read_text())
+    if state.get("source") != str(path.resolve()):
+        raise ValueError(f"Checkpoint {checkpoint} belongs to {state.get('source')}, not {path}")
+    return int(state["offset"])
+
+
+async def rebuild_analysis(database_url: str, lookback_period: int, min_periods: int) -> dict[str, Any]:
+    """Re-analyze the whole history after a backfill"""
+    from api.services.pipelines import run_volume_analysis_pipeline
+
+    engine = create_async_engine(async_database_url(database_url), poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine, autoflush=False, expire_on_commit=False)() as db:
+            return await run_volume_analysis_pipeline(db, lookback_period, min_periods, full=True)
+    finally:
+        await engine.dispose()
+
+
+def _print_progress(backfill_stats: BackfillStats) -> None:
+    percent = backfill_stats.offset / backfill_stats.size * 100 if backfill_stats.size else 100.0
+    print(
+        f"{percent:6.2f}%  rows {backfill_stats.rows_read:>12,}  inserted {backfill_stats.inserted:>12,}  "
+        f"updated {backfill_stats.updated:>10,}  invalid {backfill_stats.invalid:>8,}  "
+        f"{backfill_stats.rows_per_second:>12,.0f} rows/s",
+        file=sys.stderr,
+        flush=True
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="CSV or Parquet file with date, close and volume columns")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS, help="File format (default: from the extension)")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per loaded and committed chunk")
+    parser.add_argument("--update-existing", action="store_true", help="Overwrite stored bars whose values differ")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <path>.checkpoint)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the offset in the checkpoint file")
+    parser.add_argument("--offset", type=int, default=0, help="Start at this byte (CSV) or row (Parquet) offset")
+    parser.add_argument("--analyze", action="store_true", help="Rebuild volume analysis after loading")
+    parser.add_argument("--lookback-period", type=int, default=14)
+    parser.add_argument("--min-periods", type=int, default=7)
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or get_settings().database_url
+    checkpoint = args.checkpoint or args.path.with_name(args.path.name + ".checkpoint")
+    offset = resume_offset(checkpoint, args.path) if args.resume else args.offset
+
+    engine = create_engine(database_url)
+    try:
+        with Session(engine) as db:
+            result = backfill(
+                db, args.path, args.fmt, args.chunk_size, offset, args.update_existing,
+                checkpoint, None if args.quiet else _print_progress, get_settings().candle_intervals
+            )
+    finally:
+        engine.dispose()
+
+    summary: dict[str, Any] = result.summary()
+    if args.analyze:
+        summary["analysis"] = asyncio.run(rebuild_analysis(database_url, args.lookback_period, args.min_periods))
+    print(json.dumps(summary, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
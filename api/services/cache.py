@@ -0,0 +1,227 @@
+"""
+Response cache for the read endpoints.
+
+Serialized responses are stored in a pluggable backend (in-process LRU with
+TTL, or Redis) under keys that include the current data version of every
+table they were built from. Writes bump the version instead of deleting
+entries, so stale responses simply stop being addressed and age out.
+
+Responses carry a content-hash ETag; a matching If-None-Match is answered
+with 304 without touching the database while the entry is cached.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any, Protocol
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from api.core.config import get_settings
+from api.core.pagination import Page
+from api.core.serialization import Serializer
+
+logger = logging.getLogger(__name__)
+
+# Data versions: one counter per group of tables a response can depend on
+BTC_DATA = "btc"
+ANALYSIS_DATA = "analysis"
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    def versions(self, names: Iterable[str]) -> list[int]: ...
+
+    def bump(self, name: str) -> int: ...
+
+
+class MemoryCache:
+    """Thread-safe LRU with per-entry expiry; data versions are never evicted"""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, names: Iterable[str]) -> list[int]:
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, name: str) -> int:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Redis-backed cache shared by all API processes.
+
+    Redis errors are logged and treated as misses so that an unavailable
+    cache degrades to uncached responses instead of failing requests.
+    """
+
+    def __init__(self, client: Any, prefix: str = "quant-api:") -> None:
+        from redis.exceptions import RedisError
+
+        self.client = client
+        self.prefix = prefix
+        self._errors = RedisError
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            value = self.client.get(self.prefix + key)
+        except self._errors as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+        return bytes(value) if value is not None else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+        except self._errors as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    def versions(self, names: Iterable[str]) -> list[int]:
+        keys = [f"{self.prefix}version:{name}" for name in names]
+        try:
+            values = self.client.mget(keys)
+        except self._errors as e:
+            logger.warning("Response cache version read failed: %s", e)
+            raise
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, name: str) -> int:
+        try:
+            return int(self.client.incr(f"{self.prefix}version:{name}"))
+        except self._errors as e:
+            # Entries keyed by the old version stay reachable until their TTL expires
+            logger.warning("Response cache version bump failed: %s", e)
+            return -1
+
+
+class ResponseCache:
+    """Serves read endpoints from a CacheBackend with ETag revalidation"""
+
+    def __init__(self, backend: CacheBackend | None, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    def bump(self, *names: str) -> None:
+        """Invalidate every response built from the named data; call after commit"""
+        if self.backend is not None:
+            for name in names:
+                self.backend.bump(name)
+
+    def key(self, request: Request, depends_on: Iterable[str]) -> str | None:
+        """Cache key for a request, or None when versions cannot be read"""
+        if self.backend is None:
+            return None
+        names = sorted(depends_on)
+        try:
+            versions = self.backend.versions(names)
+        except Exception:
+            return None
+        query = urlencode(sorted(request.query_params.multi_items()))
+        tag = ",".join(f"{name}={version}" for name, version in zip(names, versions, strict=True))
+        return f"response:{request.url.path}?{query}|{tag}"
+
+    def respond(
+        self,
+        request: Request,
+        depends_on: Iterable[str],
+        load: Callable[[], Any],
+        serialize: Serializer,
+    ) -> Response:
+        """
+        Cached JSON response for the request.
+
+        load() runs only on a miss and its result is encoded with serialize
+        (see api.core.serialization). A Page result is served as its items
+        with next-page headers. Exceptions (e.g. HTTPException for 404)
+        propagate and are not cached.
+        """
+        key = self.key(request, depends_on)
+        entry = self.backend.get(key) if self.backend is not None and key is not None else None
+        if entry is not None:
+            etag, extra_headers, body = entry.split(b"\n", 2)
+            status = "HIT"
+        else:
+            content = load()
+            # Pagination headers are cached along with the page they describe
+            extra_headers = b"{}"
+            if isinstance(content, Page):
+                extra_headers = json.dumps(content.headers(request)).encode()
+                content = content.items
+            body = serialize(content)
+            etag = b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+            if key is not None:
+                self.backend.set(key, b"\n".join((etag, extra_headers, body)), self.ttl)  # type: ignore[union-attr]
+            status = "MISS"
+
+        headers = {
+            "ETag": etag.decode(), "Cache-Control": "no-cache", "X-Cache": status, **json.loads(extra_headers)
+        }
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    """Response cache configured by response_cache_backend ("memory", "redis" or "none")"""
+    settings = get_settings()
+    backend: CacheBackend | None
+    if settings.response_cache_backend == "memory":
+        backend = MemoryCache(settings.response_cache_max_entries)
+    elif settings.response_cache_backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("redis is required for response_cache_backend=redis") from e
+        backend = RedisCache(redis.Redis.from_url(settings.redis_url))
+    elif settings.response_cache_backend == "none":
+        backend = None
+    else:
+        raise ValueError(f"Unknown response cache backend: {settings.response_cache_backend}")
+    return ResponseCache(backend, settings.response_cache_ttl)
@@ -0,0 +1,122 @@
+"""
+Interval buckets and OHLCV aggregation for the btc_candles rollups.
+
+Bucket starts are naive UTC datetimes like btc_data dates: 1h and 1d
+truncate the bar timestamp, 1w buckets start on Monday (ISO weeks) and 1M
+buckets on the first of the month. Bars without open/high/low (stored
+before OHLC was kept) count with their close for those values.
+
+The rollups are written by persistence.refresh_candles whenever bars are
+ingested. Rebuild them for existing data (e.g. after adding an interval to
+CANDLE_INTERVALS) with:
+
+    python -m api.services.candles
+    python -m api.services.candles --interval 1d --interval 1w
+"""
+import argparse
+import json
+import sys
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+CANDLE_INTERVALS = ("1h", "1d", "1w", "1M")
+CANDLE_VALUES = ("open_price", "high_price", "low_price", "close_price", "volume", "bar_count")
+
+# (date, open_price, high_price, low_price, close_price, volume); open/high/low may be None
+OHLCVBar = Sequence[Any]
+
+
+def bucket_start(interval: str, moment: datetime) -> datetime:
+    """Start of the interval bucket containing moment"""
+    if interval == "1h":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "1d":
+        return day
+    if interval == "1w":
+        return day - timedelta(days=day.weekday())
+    if interval == "1M":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported candle interval: {interval} (expected one of: {', '.join(CANDLE_INTERVALS)})")
+
+
+def next_bucket(interval: str, start: datetime) -> datetime:
+    """Start of the bucket after the one starting at start"""
+    if interval == "1M":
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    steps = {"1h": timedelta(hours=1), "1d": timedelta(days=1), "1w": timedelta(weeks=1)}
+    if interval not in steps:
+        raise ValueError(f"Unsupported candle interval: {interval} (expected one of: {', '.join(CANDLE_INTERVALS)})")
+    return start + steps[interval]
+
+
+def bucket_ranges(interval: str, dates: Iterable[datetime]) -> list[tuple[datetime, datetime]]:
+    """[start, end) ranges covering the buckets of dates, adjacent buckets merged into one range"""
+    ranges: list[tuple[datetime, datetime]] = []
+    for start in sorted({bucket_start(interval, moment) for moment in dates}):
+        end = next_bucket(interval, start)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def aggregate_candles(interval: str, bars: Iterable[OHLCVBar]) -> list[dict[str, Any]]:
+    """One btc_candles row per bucket of date-sorted bars"""
+    candles: list[dict[str, Any]] = []
+    current: dict[str, Any] = {}
+    end = datetime.min
+    for date, open_price, high_price, low_price, close_price, volume in bars:
+        if date >= end:
+            start = bucket_start(interval, date)
+            end = next_bucket(interval, start)
+            current = {
+                "interval": interval,
+                "date": start,
+                "open_price": close_price if open_price is None else open_price,
+                "high_price": -float("inf"),
+                "low_price": float("inf"),
+                "volume": 0.0,
+                "bar_count": 0
+            }
+            candles.append(current)
+        current["high_price"] = max(current["high_price"], close_price if high_price is None else high_price)
+        current["low_price"] = min(current["low_price"], close_price if low_price is None else low_price)
+        current["close_price"] = close_price
+        current["volume"] += volume
+        current["bar_count"] += 1
+    return candles
+
+
+def main(argv: list[str] | None = None) -> int:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from api.core.config import get_settings
+    from api.services.cache import BTC_DATA, get_response_cache
+    from api.services.persistence import rebuild_candles
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--interval", action="append", choices=CANDLE_INTERVALS, help="Interval to rebuild (default: CANDLE_INTERVALS)"
+    )
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    engine = create_engine(args.database_url or settings.database_url)
+    try:
+        with Session(engine) as db:
+            written = rebuild_candles(db, args.interval or settings.candle_intervals)
+            db.commit()
+    finally:
+        engine.dispose()
+    get_response_cache().bump(BTC_DATA)
+    print(json.dumps(written, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Streaming export of stored BTC history, optionally joined with analysis results.
+
+Rows are read through a server-side cursor (yield_per) and encoded one chunk
+at a time, so memory use stays flat regardless of the range exported. Text
+formats (NDJSON, CSV) are written row by row; Arrow IPC stream and Parquet
+bodies are built from column arrays of each chunk, one record batch or row
+group per chunk, without ORM or Pydantic objects.
+"""
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+from typing import Any, Protocol
+
+from sqlalchemy import Select, and_, select
+from sqlalchemy.orm import Session
+
+from api.models.btc_models import BTCData, VolumeAnalysis
+from calculation.volume_analyzer import RELATIONSHIP_LABELS, TREND_LABELS
+
+PRICE_COLUMNS = (BTCData.date, BTCData.close_price, BTCData.volume)
+ANALYSIS_COLUMNS = (
+    VolumeAnalysis.price_change_pct,
+    VolumeAnalysis.volume_change_pct,
+    VolumeAnalysis.volume_follows_price,
+    VolumeAnalysis.strength_score,
+    VolumeAnalysis.trend_direction,
+)
+# Label columns are dictionary-encoded against these labels in columnar formats
+LABEL_COLUMNS = {
+    "volume_follows_price": RELATIONSHIP_LABELS,
+    "trend_direction": TREND_LABELS,
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+FILE_EXTENSIONS = {
+    "ndjson": "ndjson",
+    "csv": "csv",
+    "arrow": "arrows",
+    "parquet": "parquet",
+}
+
+
+class _Encoder(Protocol):
+    def header(self) -> bytes: ...
+
+    def chunk(self, rows: Sequence[Any]) -> bytes: ...
+
+    def footer(self) -> bytes: ...
+
+
+class _TextEncoder:
+    """NDJSON objects or CSV lines; dates as ISO 8601, missing analysis values as null/empty"""
+
+    def __init__(self, fmt: str, columns: list[str]) -> None:
+        self.fmt = fmt
+        self.columns = columns
+
+    def header(self) -> bytes:
+        return (",".join(self.columns) + "\n").encode() if self.fmt == "csv" else b""
+
+    def chunk(self, rows: Sequence[Any]) -> bytes:
+        values = ((row[0].isoformat(), *row[1:]) for row in rows)
+        if self.fmt == "ndjson":
+            return "".join(json.dumps(dict(zip(self.columns, row, strict=True))) + "\n" for row in values).encode()
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(values)
+        return buffer.getvalue().encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class _DrainableSink:
+    """
+    Write-only file object whose buffered bytes can be taken as they are written.
+
+    tell() keeps counting across drains, which Parquet needs for the column
+    chunk offsets in its footer.
+    """
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ColumnarEncoder:
+    """Arrow IPC stream (one record batch per chunk) or Parquet (one row group per chunk)"""
+
+    def __init__(self, fmt: str, columns: list[str]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Arrow and Parquet export") from e
+
+        self._pa = pa
+        self._pc = pc
+        self.columns = columns
+        self.schema = pa.schema([
+            pa.field(
+                name,
+                pa.timestamp("us") if name == "date"
+                else pa.dictionary(pa.int8(), pa.string()) if name in LABEL_COLUMNS
+                else pa.float64(),
+                nullable=name not in ("date", "close_price", "volume")
+            )
+            for name in columns
+        ])
+        self._sink = _DrainableSink()
+        self._writer: Any = (
+            pa.ipc.new_stream(self._sink, self.schema) if fmt == "arrow"
+            else pq.ParquetWriter(self._sink, self.schema)
+        )
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def chunk(self, rows: Sequence[Any]) -> bytes:
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(
+            [self._array(name, values) for name, values in zip(self.columns, zip(*rows, strict=True), strict=True)],
+            schema=self.schema
+        ))
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+    def _array(self, name: str, values: Sequence[Any]) -> Any:
+        pa = self._pa
+        field_type = self.schema.field(name).type
+        if name not in LABEL_COLUMNS:
+            return pa.array(values, field_type)
+        labels = pa.array(LABEL_COLUMNS[name], pa.string())
+        indices = self._pc.index_in(pa.array(values, pa.string()), value_set=labels).cast(pa.int8())
+        return pa.DictionaryArray.from_arrays(indices, labels)
+
+
+def export_statement(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    analysis_params: tuple[int, int] | None = None,
+) -> Select[Any]:
+    """
+    Bars between start and end (inclusive), oldest first. With
+    analysis_params=(lookback_period, min_periods) each bar is left-joined
+    with its stored analysis result for that parameter set.
+    """
+    # Select[Any]: the joined select has more columns than the plain one
+    statement: Select[Any] = select(*PRICE_COLUMNS)
+    if analysis_params is not None:
+        lookback_period, min_periods = analysis_params
+        statement = select(*PRICE_COLUMNS, *ANALYSIS_COLUMNS).outerjoin(VolumeAnalysis, and_(
+            VolumeAnalysis.date == BTCData.date,
+            VolumeAnalysis.lookback_period == lookback_period,
+            VolumeAnalysis.min_periods == min_periods
+        ))
+    if start is not None:
+        statement = statement.where(BTCData.date >= start)
+    if end is not None:
+        statement = statement.where(BTCData.date <= end)
+    return statement.order_by(BTCData.date.asc())
+
+
+def stream_btc_history(
+    db: Session,
+    fmt: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = 1000,
+    analysis_params: tuple[int, int] | None = None,
+) -> Iterator[bytes]:
+    """
+    Encoded export body as an iterator of chunks.
+
+    Raises ImportError right away (not while streaming) when a columnar
+    format is requested without pyarrow installed.
+    """
+    statement = export_statement(start, end, analysis_params)
+    columns = list(statement.selected_columns.keys())
+    encoder: _Encoder
+    if fmt in ("arrow", "parquet"):
+        encoder = _ColumnarEncoder(fmt, columns)
+    else:
+        encoder = _TextEncoder(fmt, columns)
+    return _stream(db, statement, encoder, chunk_size)
+
+
+def _stream(db: Session, statement: Select[Any], encoder: _Encoder, chunk_size: int) -> Iterator[bytes]:
+    header = encoder.header()
+    if header:
+        yield header
+    # yield_per streams from a server-side cursor on PostgreSQL instead of buffering the result
+    result = db.execute(statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield encoder.chunk(rows)
+    footer = encoder.footer()
+    if footer:
+        yield footer
@@ -0,0 +1,156 @@
+"""
+In-process background jobs for long-running analysis and ingestion.
+
+Jobs run as tasks on the application's event loop. Identical in-flight jobs
+(same kind and parameters) are deduplicated, the number of unfinished jobs is
+bounded, and CPU-heavy jobs additionally wait for one of a fixed number of
+slots before they start.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from api.core.config import get_settings
+
+JobWork = Callable[[Callable[[str], None]], Awaitable[Any]]
+JobKey = tuple[str, tuple[tuple[str, Any], ...]]
+
+
+class JobQueueFullError(RuntimeError):
+    """Too many unfinished jobs to accept another one"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: dict[str, Any]
+    cpu_heavy: bool = False
+    status: str = "queued"  # "queued", "running", "succeeded", "failed", "cancelled"
+    stage: str | None = None
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    result: Any = None
+    error: str | None = None
+    _stage_started: float = field(default=0.0, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def set_stage(self, stage: str | None) -> None:
+        """Close the timing of the current stage and start the next one"""
+        now = time.perf_counter()
+        if self.stage is not None:
+            self.timings[f"{self.stage}_seconds"] = round(now - self._stage_started, 6)
+        self.stage = stage
+        self._stage_started = now
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "stage": self.stage,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "timings": self.timings,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """Submits, deduplicates and tracks background jobs"""
+
+    def __init__(self, max_pending: int, max_cpu_jobs: int, history_size: int) -> None:
+        self.max_pending = max_pending
+        self.history_size = history_size
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._in_flight: dict[JobKey, Job] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._cpu_slots = asyncio.Semaphore(max_cpu_jobs)
+
+    def submit(
+        self, kind: str, params: dict[str, Any], work: JobWork, cpu_heavy: bool = False
+    ) -> tuple[Job, bool]:
+        """
+        Start work as a job; returns the job and whether it was newly created.
+        An identical unfinished job is returned instead of starting a duplicate.
+        """
+        key: JobKey = (kind, tuple(sorted(params.items())))
+        existing = self._in_flight.get(key)
+        if existing is not None:
+            return existing, False
+        if len(self._in_flight) >= self.max_pending:
+            raise JobQueueFullError(f"Job queue is full ({self.max_pending} unfinished jobs)")
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params, cpu_heavy=cpu_heavy)
+        self._jobs[job.id] = job
+        self._in_flight[key] = job
+        self._trim_history()
+
+        task = asyncio.create_task(self._run(job, key, work))
+        # The event loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def shutdown(self) -> None:
+        """Cancel unfinished jobs and wait for them to stop"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, key: JobKey, work: JobWork) -> None:
+        try:
+            if job.cpu_heavy:
+                async with self._cpu_slots:
+                    await self._execute(job, work)
+            else:
+                await self._execute(job, work)
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.set_stage(None)
+            job.finished_at = datetime.now()
+            self._in_flight.pop(key, None)
+
+    async def _execute(self, job: Job, work: JobWork) -> None:
+        job.status = "running"
+        job.started_at = datetime.now()
+        job.result = await work(job.set_stage)
+        job.status = "succeeded"
+
+    def _trim_history(self) -> None:
+        """Forget the oldest finished jobs beyond history_size"""
+        excess = len(self._jobs) - self.history_size
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+
+@lru_cache
+def get_job_manager() -> JobManager:
+    settings = get_settings()
+    return JobManager(
+        max_pending=settings.job_queue_size,
+        max_cpu_jobs=settings.job_max_cpu_concurrency,
+        history_size=settings.job_history_size
+    )
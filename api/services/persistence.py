@@ -0,0 +1,228 @@
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Insert, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from api.models.btc_models import BTCCandle, BTCData, VolumeAnalysis
+from api.services.candles import (
+    CANDLE_INTERVALS,
+    CANDLE_VALUES,
+    aggregate_candles,
+    bucket_ranges,
+    bucket_start,
+    next_bucket,
+)
+from calculation.volume_analyzer import VolumeAnalysisColumns
+
+# Rows per multi-row INSERT; 9 bound parameters per row stays well under SQLite's 32766 limit
+DEFAULT_BATCH_SIZE = 1000
+
+# Stored bar values compared to decide whether an ingested bar changed
+BAR_VALUES = ("close_price", "volume", "open_price", "high_price", "low_price")
+BAR_COLUMNS = tuple(getattr(BTCData, name) for name in BAR_VALUES)
+
+ANALYSIS_KEY = ("date", "lookback_period", "min_periods")
+ANALYSIS_VALUES = (
+    "price_change_pct",
+    "volume_change_pct",
+    "volume_follows_price",
+    "strength_score",
+    "trend_direction",
+)
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def analysis_rows(
+    columns: VolumeAnalysisColumns, lookback_period: int, min_periods: int
+) -> list[dict[str, Any]]:
+    """volume_analysis row values for every analyzed bar"""
+    return [
+        {
+            "date": record["date"],
+            "lookback_period": lookback_period,
+            "min_periods": min_periods,
+            **{name: record[name] for name in ANALYSIS_VALUES}
+        }
+        for record in columns.to_records()
+    ]
+
+
+def upsert_volume_analysis(
+    db: Session,
+    columns: VolumeAnalysisColumns,
+    lookback_period: int,
+    min_periods: int,
+    overwrite: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Write analysis results with multi-row INSERT ... ON CONFLICT statements.
+
+    Rows whose (date, lookback_period, min_periods) key already exists are
+    updated in place when overwrite is set and left untouched otherwise.
+    Returns the number of rows inserted or updated. The caller commits.
+    """
+    return upsert_analysis_rows(db, analysis_rows(columns, lookback_period, min_periods), overwrite, batch_size)
+
+
+def upsert_analysis_rows(
+    db: Session,
+    rows: list[dict[str, Any]],
+    overwrite: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """upsert_volume_analysis for rows already built with analysis_rows"""
+    dialect = db.get_bind().dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        raise ValueError(f"Bulk upsert is not supported for dialect: {dialect}")
+
+    written = 0
+    for batch in _batches(rows, batch_size):
+        statement = _upsert_statement(_DIALECT_INSERTS[dialect](VolumeAnalysis).values(batch), overwrite)
+        written += db.execute(statement).rowcount
+    return written
+
+
+def ingest_btc_data(
+    db: Session,
+    rows: list[dict[str, Any]],
+    update_changed: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    candle_intervals: Sequence[str] = (),
+) -> dict[str, int]:
+    """
+    Store parsed bars (date, close_price, volume and optionally open/high/low) in bulk.
+
+    Existing bars in the date range of ``rows`` are loaded with a single range
+    query; new bars are inserted with multi-row statements and, if
+    update_changed is set, bars whose values differ are updated by primary
+    key in one executemany. The candles of candle_intervals touched by
+    inserted or updated bars are then refreshed. Returns
+    inserted/updated/unchanged counts. The caller commits.
+    """
+    if not rows:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    dialect = db.get_bind().dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        raise ValueError(f"Bulk upsert is not supported for dialect: {dialect}")
+
+    dates = [row["date"] for row in rows]
+    existing = {
+        date: (record_id, tuple(values))
+        for record_id, date, *values in db.query(
+            BTCData.id, BTCData.date, *BAR_COLUMNS
+        ).filter(BTCData.date.between(min(dates), max(dates)))
+    }
+
+    new_rows = []
+    changed_rows = []
+    changed_dates = []
+    for row in rows:
+        stored = existing.get(row["date"])
+        values = tuple(row.get(name) for name in BAR_VALUES)
+        if stored is None:
+            new_rows.append(row)
+        elif stored[1] != values:
+            changed_rows.append({"id": stored[0], **dict(zip(BAR_VALUES, values, strict=True))})
+            changed_dates.append(row["date"])
+
+    inserted = 0
+    for batch in _batches(new_rows, batch_size):
+        # DO NOTHING guards against a concurrent ingest inserting the same dates
+        statement: Any = _DIALECT_INSERTS[dialect](BTCData).values(batch)
+        inserted += db.execute(statement.on_conflict_do_nothing(index_elements=["date"])).rowcount
+
+    updated = 0
+    if update_changed and changed_rows:
+        updated_at = datetime.now()
+        db.execute(update(BTCData), [{**row, "updated_at": updated_at} for row in changed_rows])
+        updated = len(changed_rows)
+
+    touched = [row["date"] for row in new_rows] + (changed_dates if update_changed else [])
+    refresh_candles(db, touched, candle_intervals, batch_size)
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": len(rows) - len(new_rows) - updated
+    }
+
+
+def refresh_candles(
+    db: Session,
+    dates: Iterable[datetime],
+    intervals: Sequence[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Recompute the candles of every bucket containing one of dates from the stored bars.
+
+    Only those buckets are read and rewritten, one range query per run of
+    adjacent buckets. Returns the number of candles written. The caller commits.
+    """
+    dates = list(dates)
+    if not dates:
+        return 0
+    return sum(
+        _write_candles(db, interval, start, end, batch_size)
+        for interval in intervals
+        for start, end in bucket_ranges(interval, dates)
+    )
+
+
+def rebuild_candles(
+    db: Session, intervals: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> dict[str, int]:
+    """Replace the candles of intervals with ones built from all stored bars. The caller commits."""
+    first, last = db.execute(select(func.min(BTCData.date), func.max(BTCData.date))).one()
+    written = {}
+    for interval in intervals:
+        if interval not in CANDLE_INTERVALS:
+            raise ValueError(f"Unsupported candle interval: {interval}")
+        db.execute(delete(BTCCandle).where(BTCCandle.interval == interval))
+        written[interval] = 0 if first is None else _write_candles(
+            db, interval, bucket_start(interval, first), next_bucket(interval, bucket_start(interval, last)), batch_size
+        )
+    return written
+
+
+def _write_candles(db: Session, interval: str, start: datetime, end: datetime, batch_size: int) -> int:
+    """Upsert the candles of the bars in [start, end), which must be bucket boundaries"""
+    bars = db.execute(
+        select(BTCData.date, BTCData.open_price, BTCData.high_price, BTCData.low_price, BTCData.close_price, BTCData.volume)
+        .where(BTCData.date >= start, BTCData.date < end)
+        .order_by(BTCData.date)
+    ).all()
+    insert = _DIALECT_INSERTS[db.get_bind().dialect.name]
+    updated_at = datetime.now()
+    written = 0
+    for batch in _batches(aggregate_candles(interval, bars), batch_size):
+        values: Any = insert(BTCCandle).values([{**candle, "updated_at": updated_at} for candle in batch])
+        statement = values.on_conflict_do_update(
+            index_elements=["interval", "date"],
+            set_={name: values.excluded[name] for name in (*CANDLE_VALUES, "updated_at")}
+        )
+        written += db.execute(statement).rowcount
+    return written
+
+
+def _upsert_statement(statement: Any, overwrite: bool) -> Insert:
+    if overwrite:
+        return statement.on_conflict_do_update(  # type: ignore[no-any-return]
+            index_elements=list(ANALYSIS_KEY),
+            set_={name: statement.excluded[name] for name in ANALYSIS_VALUES}
+        )
+    return statement.on_conflict_do_nothing(index_elements=list(ANALYSIS_KEY))  # type: ignore[no-any-return]
+
+
+def _batches(rows: list[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
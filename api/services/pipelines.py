@@ -0,0 +1,199 @@
+"""
+Analysis and ingestion runs shared by the HTTP routes and background jobs.
+
+Each pipeline takes an AsyncSession and an optional on_stage callback that is
+told when a run moves to its next stage (used for job progress and timings).
+"""
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.concurrency import run_cpu_bound
+from api.core.config import get_settings
+from api.models.btc_models import BTCData, VolumeAnalysis
+from api.services.alpha_vantage import get_alpha_vantage_service
+from api.services.cache import ANALYSIS_DATA, BTC_DATA, get_response_cache
+from api.services.persistence import (
+    analysis_rows,
+    ingest_btc_data,
+    upsert_analysis_rows,
+)
+from calculation.volume_analyzer import VolumeAnalysisColumns, get_volume_analyzer
+
+StageCallback = Callable[[str], None]
+
+
+class InsufficientDataError(ValueError):
+    """Not enough stored bars to produce analysis results"""
+
+
+class StorageError(RuntimeError):
+    """Results were computed but could not be written"""
+
+
+def _ignore_stage(_stage: str) -> None:
+    pass
+
+
+async def run_volume_analysis_pipeline(
+    db: AsyncSession,
+    lookback_period: int = 14,
+    min_periods: int = 7,
+    workers: int = 1,
+    full: bool = False,
+    on_stage: StageCallback = _ignore_stage,
+) -> dict[str, str | int | None]:
+    """
+    Run volume-price correlation analysis and store results.
+
+    Only bars newer than the last stored result for this parameter set (the
+    watermark) are analyzed, together with lookback_period bars of warm-up.
+    Bars inserted before the watermark are only picked up with full=true,
+    which deletes the parameter set's stored rows and rebuilds them from the
+    whole history in the same transaction.
+    """
+    on_stage("loading")
+    watermark = None if full else (await db.execute(
+        select(func.max(VolumeAnalysis.date)).where(
+            VolumeAnalysis.lookback_period == lookback_period,
+            VolumeAnalysis.min_periods == min_periods
+        )
+    )).scalar()
+
+    # Fetch historical data: everything, or warm-up plus bars past the watermark
+    bars = select(BTCData.date, BTCData.close_price, BTCData.volume)
+    if watermark is None:
+        btc_data = (await db.execute(bars.order_by(BTCData.date.asc()))).all()
+        bars_skipped = 0
+    else:
+        bars_skipped = (await db.execute(
+            select(func.count(BTCData.id)).where(BTCData.date <= watermark)
+        )).scalar_one()
+        btc_data = (await db.execute(
+            bars.where(BTCData.date > watermark).order_by(BTCData.date.asc())
+        )).all()
+        if not btc_data:
+            return {
+                "message": "Volume analysis is up to date",
+                "watermark": watermark.isoformat(),
+                "records_analyzed": 0,
+                "records_added": 0,
+                "bars_skipped": bars_skipped
+            }
+        warmup = (await db.execute(
+            bars.where(BTCData.date <= watermark).order_by(BTCData.date.desc()).limit(lookback_period)
+        )).all()
+        bars_skipped -= len(warmup)
+        btc_data = list(warmup[::-1]) + list(btc_data)
+
+    if watermark is None and len(btc_data) < min_periods:
+        raise InsufficientDataError(f"Insufficient data. Need at least {min_periods} records")
+
+    # Analysis and row building are CPU-bound; keep them off the event loop
+    on_stage("analyzing")
+    analysis_results, rows = await run_cpu_bound(
+        _analyze_new_bars, btc_data, lookback_period, min_periods,
+        min(workers, get_settings().analysis_max_workers), watermark
+    )
+    if watermark is None and not analysis_results:
+        raise InsufficientDataError("No analysis results generated")
+
+    on_stage("storing")
+    try:
+        if full:
+            # Rows for dates that no longer produce a result must not survive the rebuild
+            await db.execute(delete(VolumeAnalysis).where(
+                VolumeAnalysis.lookback_period == lookback_period,
+                VolumeAnalysis.min_periods == min_periods
+            ))
+        records_added = await db.run_sync(upsert_analysis_rows, rows)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise StorageError(f"Failed to store analysis: {str(e)}") from e
+    get_response_cache().bump(ANALYSIS_DATA)
+
+    return {
+        "message": "Volume analysis completed successfully",
+        "watermark": watermark.isoformat() if watermark else None,
+        "records_analyzed": len(analysis_results),
+        "records_added": records_added,
+        "bars_skipped": bars_skipped
+    }
+
+
+def _analyze_new_bars(
+    btc_data: list[Any], lookback_period: int, min_periods: int, workers: int, watermark: datetime | None
+) -> tuple[VolumeAnalysisColumns, list[dict[str, Any]]]:
+    """Analyze (date, close_price, volume) rows; results at or before watermark are dropped"""
+    # Convert to analysis format
+    data_for_analysis = [
+        {
+            "date": record.date,
+            "close_price": record.close_price,
+            "volume": record.volume
+        }
+        for record in btc_data
+    ]
+
+    # Run analysis
+    analyzer = get_volume_analyzer(lookback_period, min_periods)
+    analysis_results = analyzer.analyze_volume_price_correlation(data_for_analysis, workers=workers)
+    if watermark is not None:
+        # Warm-up bars only seed the windows; their results are already stored
+        analysis_results = analysis_results[
+            int(np.searchsorted(analysis_results.date, np.datetime64(watermark), side="right")):
+        ]
+    return analysis_results, analysis_rows(analysis_results, lookback_period, min_periods)
+
+
+async def fetch_btc_data_pipeline(
+    db: AsyncSession,
+    update_existing: bool = False,
+    on_stage: StageCallback = _ignore_stage,
+) -> dict[str, Any]:
+    """Fetch latest Bitcoin data from Alpha Vantage and store in database"""
+    service = get_alpha_vantage_service()
+    on_stage("fetching")
+    started = time.perf_counter()
+    # Shared with concurrent fetches and reused while fresh
+    columns = await service.fetch_btc_columns()
+    fetched = time.perf_counter()
+
+    on_stage("parsing")
+    # Without updates, days up to the newest stored bar are dropped before building rows
+    since = None if update_existing else (await db.execute(select(func.max(BTCData.date)))).scalar()
+    parsed_data = await run_cpu_bound(columns.since(since).to_rows)
+    parsed = time.perf_counter()
+
+    on_stage("storing")
+    try:
+        counts = await db.run_sync(
+            ingest_btc_data, parsed_data, update_changed=update_existing,
+            candle_intervals=get_settings().candle_intervals
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    get_response_cache().bump(BTC_DATA)
+    stored = time.perf_counter()
+
+    return {
+        "message": "Data fetched successfully",
+        "records_added": counts["inserted"],
+        "records_updated": counts["updated"],
+        "records_unchanged": counts["unchanged"],
+        "records_skipped": len(columns.date) - len(parsed_data),
+        "total_records": len(columns.date),
+        "timings": {
+            "fetch_seconds": round(fetched - started, 6),
+            "parse_seconds": round(parsed - fetched, 6),
+            "store_seconds": round(stored - parsed, 6)
+        }
+    }
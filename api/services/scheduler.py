@@ -0,0 +1,157 @@
+"""
+Periodic incremental ingestion, started from the app lifespan.
+
+Each run looks at the gap between today and the newest stored bar. Small
+gaps take the compact path (only days after the newest bar are converted
+and inserted); an empty table or a gap beyond scheduler_full_fetch_gap_days
+takes the full path, which reconciles the whole history (update_existing).
+When bars were added or corrected, incremental volume analysis runs next.
+
+Runs are spaced by the interval plus random jitter, and a run that would
+overlap one still in progress in this process is skipped.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import get_settings
+from api.core.database import get_async_sessionmaker
+from api.models.btc_models import BTCData
+from api.services.pipelines import (
+    InsufficientDataError,
+    fetch_btc_data_pipeline,
+    run_volume_analysis_pipeline,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionScheduler:
+    """Fetches new bars every interval and chains incremental analysis"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+        jitter: float,
+        full_fetch_gap_days: int,
+        analysis_params: tuple[int, int] = (14, 7),
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval = interval
+        self.jitter = jitter
+        self.full_fetch_gap_days = full_fetch_gap_days
+        self.analysis_params = analysis_params
+        self._sleep = sleep
+        self._run_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self.runs = 0
+        self.failures = 0
+        self.overlaps_skipped = 0
+        self.next_run_at: datetime | None = None
+        self.last_run: dict[str, Any] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Cancel the loop, including a run in progress"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.next_run_at = None
+
+    async def _loop(self) -> None:
+        # Jitter also spreads the first run of replicas started together
+        delay = random.uniform(0, self.jitter)
+        while True:
+            self.next_run_at = datetime.fromtimestamp(time.time() + delay)
+            await self._sleep(delay)
+            await self.run_once()
+            delay = self.interval + random.uniform(0, self.jitter)
+
+    async def run_once(self) -> dict[str, Any]:
+        """One fetch (and, when bars changed, analysis) run; skipped if one is in progress"""
+        if self._run_lock.locked():
+            self.overlaps_skipped += 1
+            return {"status": "skipped", "reason": "Previous run still in progress"}
+
+        async with self._run_lock:
+            started = time.perf_counter()
+            run: dict[str, Any] = {"status": "running", "started_at": datetime.now().isoformat()}
+            self.runs += 1
+            self.last_run = run
+            try:
+                run.update(await self._ingest())
+                run["status"] = "succeeded"
+            except Exception as e:
+                self.failures += 1
+                run.update(status="failed", error=str(e))
+                logger.exception("Scheduled ingestion failed")
+            run["finished_at"] = datetime.now().isoformat()
+            run["duration_seconds"] = round(time.perf_counter() - started, 6)
+            return run
+
+    async def _ingest(self) -> dict[str, Any]:
+        async with self.session_factory() as db:
+            newest = (await db.execute(select(func.max(BTCData.date)))).scalar()
+            gap_days = (datetime.now() - newest).days if newest is not None else None
+            full = gap_days is None or gap_days > self.full_fetch_gap_days
+            fetch = await fetch_btc_data_pipeline(db, update_existing=full)
+
+        result: dict[str, Any] = {
+            "mode": "full" if full else "compact",
+            "gap_days": gap_days,
+            "fetch": fetch,
+            "analysis": None
+        }
+        if fetch["records_added"] or fetch["records_updated"]:
+            lookback_period, min_periods = self.analysis_params
+            async with self.session_factory() as db:
+                try:
+                    result["analysis"] = await run_volume_analysis_pipeline(
+                        db, lookback_period, min_periods, full=bool(fetch["records_updated"])
+                    )
+                except InsufficientDataError as e:
+                    result["analysis"] = {"message": str(e)}
+        return result
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "full_fetch_gap_days": self.full_fetch_gap_days,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at and self.running else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "overlaps_skipped": self.overlaps_skipped,
+            "last_run": self.last_run
+        }
+
+
+@lru_cache
+def get_ingestion_scheduler() -> IngestionScheduler:
+    settings = get_settings()
+    return IngestionScheduler(
+        get_async_sessionmaker(),
+        interval=settings.scheduler_interval_seconds,
+        jitter=settings.scheduler_jitter_seconds,
+        full_fetch_gap_days=settings.scheduler_full_fetch_gap_days,
+        analysis_params=(settings.scheduler_lookback_period, settings.scheduler_min_periods)
+    )
@@ -0,0 +1,46 @@
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from api.models.btc_models import BTCData
+
+StatsResponse = dict[str, str | int | float | bool | None]
+
+
+def compute_btc_stats(db: Session, approximate_count: bool = False) -> StatsResponse:
+    """
+    Row count, date range and latest price in a single query.
+
+    With approximate_count on PostgreSQL the count comes from the planner's
+    reltuples estimate instead of a table scan; other databases, and tables
+    that have never been analyzed, fall back to an exact count.
+    """
+    approximate = approximate_count and db.get_bind().dialect.name == "postgresql"
+    count_column: Any = (
+        text("(SELECT reltuples::bigint FROM pg_class WHERE oid = 'btc_data'::regclass)")
+        if approximate else func.count(BTCData.id)
+    )
+    latest_price = select(BTCData.close_price).order_by(BTCData.date.desc()).limit(1).scalar_subquery()
+
+    total_records, oldest_date, latest_date, price = db.execute(
+        select(count_column, func.min(BTCData.date), func.max(BTCData.date), latest_price)
+    ).one()
+
+    if approximate and (total_records is None or total_records < 0):
+        total_records = db.query(func.count(BTCData.id)).scalar()
+        approximate = False
+
+    if latest_date is None:
+        return {"message": "No data available", "total_records": 0}
+
+    stats: StatsResponse = {
+        "total_records": int(total_records),
+        "latest_date": latest_date.isoformat(),
+        "oldest_date": oldest_date.isoformat(),
+        "latest_price": float(price),
+        "date_range_days": (latest_date - oldest_date).days
+    }
+    if approximate:
+        stats["approximate_count"] = True
+    return stats
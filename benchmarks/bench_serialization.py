@@ -0,0 +1,114 @@
+"""
+List endpoint serialization: ORM + response_model validation vs column tuples + orjson.
+
+Loads a synthetic BTC history into an in-memory SQLite database and times
+both ways of producing the /btc/history JSON body (query included), checking
+that they produce identical bytes.
+
+Usage:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --sizes 100 1000 10000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.core.database import Base
+from api.core.serialization import model_serializer, response_columns, rows_serializer
+from api.models.btc_models import BTCData
+from api.models.schemas import BTCDataResponse
+from benchmarks.synthetic import generate_series
+
+DEFAULT_SIZES = [100, 1_000, 10_000]
+
+
+def _best_of(repeat: int, func: Callable[[], Any]) -> tuple[float, Any]:
+    """Fastest wall time over ``repeat`` runs and the last return value"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _database(size: int) -> sessionmaker[Session]:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    series = generate_series("random_walk", size)
+    now = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    with Session(engine) as db:
+        db.execute(insert(BTCData), [
+            {
+                "date": date.to_pydatetime(), "close_price": float(close), "volume": float(volume),
+                "created_at": now + timedelta(microseconds=i), "updated_at": now
+            }
+            for i, (date, close, volume) in enumerate(series[["date", "close_price", "volume"]].itertuples(index=False))
+        ])
+        db.commit()
+    return sessionmaker(bind=engine)
+
+
+def run_case(size: int, repeat: int = 3) -> dict[str, Any]:
+    """Time both paths for a listing of size rows"""
+    SessionLocal = _database(size)
+    orm_serializer = model_serializer(list[BTCDataResponse])
+    fast_serializer = rows_serializer(BTCDataResponse)
+
+    def orm_path() -> bytes:
+        with SessionLocal() as db:
+            return orm_serializer(db.query(BTCData).order_by(BTCData.date.desc()).limit(size).all())
+
+    def fast_path() -> bytes:
+        with SessionLocal() as db:
+            rows = db.query(*response_columns(BTCData, BTCDataResponse)).order_by(
+                BTCData.date.desc()
+            ).limit(size).all()
+            return fast_serializer(rows)
+
+    orm_seconds, orm_body = _best_of(repeat, orm_path)
+    fast_seconds, fast_body = _best_of(repeat, fast_path)
+    return {
+        "size": size,
+        "orm_seconds": orm_seconds,
+        "fast_seconds": fast_seconds,
+        "speedup": orm_seconds / fast_seconds,
+        "identical": orm_body == fast_body,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--output", type=Path, help="Write raw results as JSON")
+    args = parser.parse_args(argv)
+
+    cases = []
+    for size in args.sizes:
+        case = run_case(size, args.repeat)
+        cases.append(case)
+        print(
+            f"n={size:<10} orm+pydantic {case['orm_seconds'] * 1000:>9.2f}ms  "
+            f"columns+orjson {case['fast_seconds'] * 1000:>9.2f}ms  "
+            f"x{case['speedup']:.1f}  {'identical' if case['identical'] else 'DIFFERENT OUTPUT'}",
+            flush=True
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+    return 0 if all(case["identical"] for case in cases) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Throughput, memory and per-stage benchmarks for VolumeAnalyzer.
+
+Runs the analyzer over deterministic synthetic series (see benchmarks/synthetic.py)
+and compares the results with a stored baseline so regressions fail loudly.
+
+Usage:
+    python -m benchmarks.bench_volume_analyzer                  # quick profile vs baseline
+    python -m benchmarks.bench_volume_analyzer --profile full   # 1k .. 10M bars
+    python -m benchmarks.bench_volume_analyzer --update-baseline
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from benchmarks.synthetic import SCENARIOS, generate_series
+from calculation.volume_analyzer import (
+    VolumeAnalyzer,
+    _classify_windows,
+    _frame_arrays,
+    _select_rows,
+    _valid_rows,
+    _window_inputs,
+    _window_statistics,
+)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+PROFILES = {
+    "quick": {"sizes": [1_000, 10_000, 100_000], "lookbacks": [7, 14, 50]},
+    "full": {"sizes": [1_000, 10_000, 100_000, 1_000_000, 10_000_000], "lookbacks": [7, 14, 50]},
+}
+
+
+def case_key(scenario: str, size: int, lookback: int) -> str:
+    return f"{scenario}/n={size}/lookback={lookback}"
+
+
+def _best_of(repeat: int, func: Callable[[], Any]) -> tuple[float, Any]:
+    """Fastest wall time over ``repeat`` runs and the last return value"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_case(scenario: str, size: int, lookback: int, min_periods: int = 7, repeat: int = 3) -> dict[str, Any]:
+    """Benchmark one (scenario, size, lookback) combination"""
+    source = generate_series(scenario, size)
+    analyzer = VolumeAnalyzer(lookback, min_periods)
+
+    # Per-stage timings mirror analyze_volume_price_correlation step by step
+    build_time, df = _best_of(repeat, lambda: analyzer._build_frame(source))
+    pct_time, df = _best_of(repeat, lambda: analyzer._add_pct_changes(df))
+    close_prices, price_changes, volume_changes = _frame_arrays(df)
+    windows_time, stats = _best_of(
+        repeat, lambda: _window_statistics(_window_inputs(price_changes, volume_changes), lookback)
+    )
+    dates = df["date"].to_numpy()
+
+    def classify() -> Any:
+        columns = _classify_windows(close_prices, price_changes, volume_changes, stats, lookback)
+        return _select_rows(dates, price_changes, volume_changes, columns, _valid_rows(columns, min_periods))
+
+    classification_time, _ = _best_of(repeat, classify)
+
+    total_time, results = _best_of(repeat, lambda: analyzer.analyze_volume_price_correlation(source))
+
+    tracemalloc.start()
+    analyzer.analyze_volume_price_correlation(source)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scenario": scenario,
+        "size": size,
+        "lookback": lookback,
+        "results": len(results),
+        "seconds": total_time,
+        "bars_per_second": size / total_time,
+        "peak_memory_mb": peak_bytes / 2**20,
+        "stages": {
+            "dataframe_build": build_time,
+            "pct_change": pct_time,
+            "windows": windows_time,
+            "classification": classification_time,
+        },
+    }
+
+
+def compare_to_baseline(
+    cases: dict[str, dict[str, Any]], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Describe every case whose throughput or peak memory regressed beyond tolerance"""
+    regressions = []
+    for key, case in cases.items():
+        reference = baseline.get("cases", {}).get(key)
+        if reference is None:
+            continue
+        if case["bars_per_second"] < reference["bars_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: throughput {case['bars_per_second']:,.0f} bars/s "
+                f"< baseline {reference['bars_per_second']:,.0f} bars/s"
+            )
+        if case["peak_memory_mb"] > reference["peak_memory_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: peak memory {case['peak_memory_mb']:.1f} MB "
+                f"> baseline {reference['peak_memory_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def _format_case(case: dict[str, Any]) -> str:
+    stages = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in case["stages"].items())
+    return (
+        f"{case_key(case['scenario'], case['size'], case['lookback']):<40} "
+        f"{case['bars_per_second']:>14,.0f} bars/s {case['peak_memory_mb']:>9.1f} MB  {stages}"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Override profile sizes")
+    parser.add_argument("--lookbacks", type=int, nargs="+", help="Override profile lookbacks")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Merge these results into the baseline")
+    parser.add_argument("--output", type=Path, help="Write raw results as JSON")
+    args = parser.parse_args(argv)
+    # The gaps scenario triggers pandas' pct_change fill_method deprecation on every run
+    warnings.filterwarnings("ignore", category=FutureWarning)
+
+    profile = PROFILES[args.profile]
+    cases: dict[str, dict[str, Any]] = {}
+    for scenario in args.scenarios:
+        for size in args.sizes or profile["sizes"]:
+            for lookback in args.lookbacks or profile["lookbacks"]:
+                case = run_case(scenario, size, lookback, repeat=args.repeat)
+                cases[case_key(scenario, size, lookback)] = case
+                print(_format_case(case), flush=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"cases": {}}
+    if args.update_baseline:
+        baseline["machine"] = {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+        }
+        baseline.setdefault("cases", {}).update({
+            key: {"bars_per_second": round(case["bars_per_second"]), "peak_memory_mb": round(case["peak_memory_mb"], 2)}
+            for key, case in cases.items()
+        })
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(cases, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
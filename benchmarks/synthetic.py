@@ -0,0 +1,57 @@
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+
+def random_walk(n: int, seed: int = 0) -> pd.DataFrame:
+    """Geometric random walk with log-normal volume"""
+    rng = np.random.default_rng(seed)
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    volume = rng.lognormal(3, 0.5, n)
+    return _frame(n, close, volume)
+
+
+def regime_switch(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random walk alternating between calm/trending and volatile regimes"""
+    rng = np.random.default_rng(seed)
+    regime = (np.arange(n) // 250) % 2
+    # Opposite drifts of equal duration keep long series within float range
+    drift = np.where(regime == 0, 0.001, -0.001)
+    volatility = np.where(regime == 0, 0.01, 0.05)
+    close = 30_000 * np.exp(np.cumsum(rng.normal(drift, volatility)))
+    # Volume scales with the regime volatility
+    volume = rng.lognormal(3, 0.3, n) * (1 + 20 * volatility)
+    return _frame(n, close, volume)
+
+
+def gaps(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random walk with missing closes/volumes and zero-volume bars"""
+    df = random_walk(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    close = df["close_price"].to_numpy()
+    volume = df["volume"].to_numpy()
+    close[rng.integers(1, n, max(n // 50, 1))] = np.nan
+    volume[rng.integers(1, n, max(n // 50, 1))] = np.nan
+    volume[rng.integers(1, n, max(n // 200, 1))] = 0.0
+    return df
+
+
+SCENARIOS: dict[str, Callable[[int, int], pd.DataFrame]] = {
+    "random_walk": random_walk,
+    "regime_switch": regime_switch,
+    "gaps": gaps,
+}
+
+
+def generate_series(scenario: str, n: int, seed: int = 0) -> pd.DataFrame:
+    """Deterministic synthetic bars for a named scenario"""
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    return SCENARIOS[scenario](n, seed)
+
+
+def _frame(n: int, close: np.ndarray, volume: np.ndarray) -> pd.DataFrame:
+    # Minute bars so 10M rows stay within the datetime64[ns] range
+    dates = pd.date_range("2010-01-01", periods=n, freq="min")
+    return pd.DataFrame({"date": dates, "close_price": close, "volume": volume})
@@ -0,0 +1,272 @@
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from calculation.volume_analyzer import (
+    _DEGENERATE_VARIANCE,
+    VolumeAnalysisResult,
+    VolumeAnalyzer,
+)
+
+STATE_VERSION = 1
+
+# State value as stored in JSON: NaN becomes None and infinities "inf"/"-inf"
+StateValue = float | str | None
+
+
+def _encode(value: float) -> StateValue:
+    if np.isnan(value):
+        return None
+    if np.isinf(value):
+        return "inf" if value > 0 else "-inf"
+    return float(value)
+
+
+def _decode(value: StateValue) -> float:
+    return np.nan if value is None else float(value)
+
+
+class IncrementalVolumeAnalyzer:
+    """
+    Streaming counterpart to VolumeAnalyzer that consumes one bar at a time.
+
+    Keeps O(lookback_period) state: ring buffers for the current window plus
+    running sums for covariance and variance, so each appended bar is analyzed
+    in O(1). Emits the same results as VolumeAnalyzer for a date-ordered series.
+    """
+
+    def __init__(self, lookback_period: int = 14, min_periods: int = 7):
+        self.lookback_period = lookback_period
+        self.min_periods = min_periods
+        self._analyzer = VolumeAnalyzer(lookback_period, min_periods)
+
+        self.bars_seen = 0
+        self.last_date: datetime | None = None
+        # Last forward-filled close/volume, mirroring pct_change(fill_method='pad')
+        self._last_close: float = np.nan
+        self._last_volume: float = np.nan
+
+        # Ring buffers for the current window, oldest bar at self._head
+        self._close = np.full(lookback_period, np.nan)
+        self._price_change = np.full(lookback_period, np.nan)
+        self._volume_change = np.full(lookback_period, np.nan)
+        self._head = 0
+        self._size = 0
+
+        self._reset_sums()
+
+    def append(self, date: datetime, close_price: float, volume: float) -> VolumeAnalysisResult | None:
+        """Add the next bar and return its analysis, or None while history is insufficient"""
+        date = pd.Timestamp(date).to_pydatetime()
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"Bars must be appended in date order: {date} <= {self.last_date}")
+
+        close = float(close_price)
+        vol = float(volume)
+        filled_close = self._last_close if np.isnan(close) else close
+        filled_volume = self._last_volume if np.isnan(vol) else vol
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = float(np.float64(filled_close) / self._last_close - 1)
+            volume_change = float(np.float64(filled_volume) / self._last_volume - 1)
+        self._last_close = filled_close
+        self._last_volume = filled_volume
+
+        self._push(close, price_change, volume_change)
+        index = self.bars_seen
+        self.bars_seen += 1
+        self.last_date = date
+
+        if index < self.min_periods or self._size < self.min_periods:
+            return None
+        if self._count < self.min_periods:
+            return None
+        if self._non_finite:
+            # Infinite changes make the running sums meaningless; evaluate the
+            # window directly like the per-window reference path
+            return self._analyzer.analyze_window(self._window_frame())
+
+        return self._current_result(price_change, volume_change)
+
+    def extend(self, bars: list[dict[str, Any]]) -> list[VolumeAnalysisResult]:
+        """Append bars in order and return the results that were emitted"""
+        results = []
+        for bar in bars:
+            result = self.append(bar["date"], bar["close_price"], bar["volume"])
+            if result:
+                results.append(result)
+        return results
+
+    def to_state(self) -> dict[str, Any]:
+        """Serialize the analyzer state to JSON-compatible primitives (see StateValue)"""
+        order = self._window_order()
+        return {
+            "version": STATE_VERSION,
+            "lookback_period": self.lookback_period,
+            "min_periods": self.min_periods,
+            "bars_seen": self.bars_seen,
+            "last_date": self.last_date.isoformat() if self.last_date else None,
+            "last_close": _encode(self._last_close),
+            "last_volume": _encode(self._last_volume),
+            "close": [_encode(value) for value in self._close[order]],
+            "price_change": [_encode(value) for value in self._price_change[order]],
+            "volume_change": [_encode(value) for value in self._volume_change[order]],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "IncrementalVolumeAnalyzer":
+        """Restore an analyzer from to_state() output without replaying history"""
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported analyzer state version: {state.get('version')}")
+
+        analyzer = cls(state["lookback_period"], state["min_periods"])
+        analyzer.bars_seen = state["bars_seen"]
+        analyzer.last_date = datetime.fromisoformat(state["last_date"]) if state["last_date"] else None
+        analyzer._last_close = _decode(state["last_close"])
+        analyzer._last_volume = _decode(state["last_volume"])
+
+        size = len(state["close"])
+        if size > analyzer.lookback_period:
+            raise ValueError("Window state is longer than lookback_period")
+        analyzer._close[:size] = [_decode(value) for value in state["close"]]
+        analyzer._price_change[:size] = [_decode(value) for value in state["price_change"]]
+        analyzer._volume_change[:size] = [_decode(value) for value in state["volume_change"]]
+        analyzer._size = size
+        analyzer._head = 0
+        analyzer._resync_sums()
+        return analyzer
+
+    def _push(self, close: float, price_change: float, volume_change: float) -> None:
+        """Append to the ring buffer, evicting the oldest bar once full"""
+        if self._size == self.lookback_period:
+            self._update_sums(self._price_change[self._head], self._volume_change[self._head], -1)
+            slot = self._head
+            self._head = (self._head + 1) % self.lookback_period
+        else:
+            slot = (self._head + self._size) % self.lookback_period
+            self._size += 1
+
+        self._close[slot] = close
+        self._price_change[slot] = price_change
+        self._volume_change[slot] = volume_change
+        self._update_sums(price_change, volume_change, 1)
+
+        # Re-derive the sums once per window length so add/subtract rounding
+        # error cannot accumulate; amortized O(1)
+        self._appends_since_resync += 1
+        if self._appends_since_resync >= self.lookback_period:
+            self._resync_sums()
+
+    def _reset_sums(self) -> None:
+        self._count = 0
+        self._non_finite = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_yy = 0.0
+        self._sum_xy = 0.0
+        self._appends_since_resync = 0
+
+    def _update_sums(self, x: float, y: float, sign: int) -> None:
+        if np.isnan(x) or np.isnan(y):
+            return
+        self._count += sign
+        if not (np.isfinite(x) and np.isfinite(y)):
+            self._non_finite += sign
+            return
+        self._sum_x += sign * x
+        self._sum_y += sign * y
+        self._sum_xx += sign * x * x
+        self._sum_yy += sign * y * y
+        self._sum_xy += sign * x * y
+
+    def _resync_sums(self) -> None:
+        self._reset_sums()
+        for slot in self._window_order():
+            self._update_sums(self._price_change[slot], self._volume_change[slot], 1)
+
+    def _window_order(self) -> list[int]:
+        return [(self._head + k) % self.lookback_period for k in range(self._size)]
+
+    def _window_frame(self) -> pd.DataFrame:
+        order = self._window_order()
+        return pd.DataFrame({
+            "close_price": self._close[order],
+            "price_change_pct": self._price_change[order],
+            "volume_change_pct": self._volume_change[order],
+        })
+
+    def _current_result(self, price_change: float, volume_change: float) -> VolumeAnalysisResult:
+        """Build the result for the newest bar from the running sums"""
+        count = self._count
+        var_x, var_y, cov_xy = self._centered_sums()
+        if min(var_x, var_y) <= _DEGENERATE_VARIANCE * count and self._appends_since_resync:
+            # After a flat stretch the add/subtract residue in the sums shrinks
+            # with them and passes the relative test below; re-derive them first
+            self._resync_sums()
+            var_x, var_y, cov_xy = self._centered_sums()
+
+        # Correlation (NaN for constant windows maps to 0.0, as with np.corrcoef)
+        if (
+            count < 2
+            or var_x <= _DEGENERATE_VARIANCE * self._sum_xx
+            or var_y <= _DEGENERATE_VARIANCE * self._sum_yy
+        ):
+            correlation = 0.0
+        elif count == 2:
+            correlation = float(np.sign(cov_xy))
+        else:
+            correlation = min(max(cov_xy / np.sqrt(var_x) / np.sqrt(var_y), -1.0), 1.0)
+
+        volume_follows_price = self._analyzer._determine_volume_relationship(
+            correlation, price_change, volume_change
+        )
+
+        # Strength score from population std of the clean window samples
+        price_volatility = np.sqrt(var_x / count) if count > 1 else 1.0
+        volume_volatility = np.sqrt(var_y / count) if count > 1 else 1.0
+        volatility_adjustment = 1.0 / (1.0 + (price_volatility + volume_volatility) / 2)
+        volatility_adjustment = 0.5 + 0.5 * volatility_adjustment
+        strength_score = float(min(abs(correlation), 1.0) * volatility_adjustment)
+
+        size_confidence = min(count / (self.lookback_period * 2), 1.0)
+        confidence_level = (size_confidence + abs(correlation)) / 2
+
+        return VolumeAnalysisResult(
+            correlation=float(correlation),
+            volume_follows_price=volume_follows_price,
+            strength_score=strength_score,
+            trend_direction=self._trend_direction(),
+            price_change_pct=price_change,
+            volume_change_pct=volume_change,
+            confidence_level=float(confidence_level)
+        )
+
+    def _centered_sums(self) -> tuple[float, float, float]:
+        """Sums of squared deviations of x and y and of their cross products"""
+        count = self._count
+        var_x = max(self._sum_xx - self._sum_x * self._sum_x / count, 0.0)
+        var_y = max(self._sum_yy - self._sum_y * self._sum_y / count, 0.0)
+        cov_xy = self._sum_xy - self._sum_x * self._sum_y / count
+        return var_x, var_y, cov_xy
+
+    def _trend_direction(self) -> str:
+        """Compare the mean of the first and last three closes in the window"""
+        if self._size < 3:
+            return "sideways"
+
+        def close_at(k: int) -> np.float64:
+            return np.float64(self._close[(self._head + k) % self.lookback_period])
+
+        recent_avg = (close_at(self._size - 3) + close_at(self._size - 2) + close_at(self._size - 1)) / 3
+        earlier_avg = (close_at(0) + close_at(1) + close_at(2)) / 3
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = (recent_avg - earlier_avg) / earlier_avg
+
+        if change_pct > 0.02:  # 2% threshold
+            return "up"
+        elif change_pct < -0.02:
+            return "down"
+        else:
+            return "sideways"
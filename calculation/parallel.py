@@ -0,0 +1,161 @@
+"""
+Chunk-parallel execution of the vectorized volume analysis engine.
+
+A long series is split into chunks whose boundaries are multiples of
+lookback_period. Each chunk is analyzed in a worker process together with
+lookback_period bars of warm-up. Windowed sums are computed over blocks aligned
+to lookback_period, so every window sees exactly the same float operations as
+in the serial run and the stitched output is bit-for-bit identical.
+
+Inputs and outputs live in shared memory; workers only receive a small
+picklable chunk spec.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+
+from calculation.volume_analyzer import (
+    VolumeAnalysisColumns,
+    _frame_arrays,
+    _select_rows,
+    _valid_rows,
+    _window_columns,
+    _window_inputs,
+)
+
+if TYPE_CHECKING:
+    from calculation.volume_analyzer import VolumeAnalyzer
+
+# Chunks smaller than this cost more in process start-up than they save
+DEFAULT_MIN_CHUNK_SIZE = 65_536
+
+# The pool is started from threads of the API process (see run_cpu_bound); forking
+# a threaded process can leave children blocked on locks held at fork time
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Output layout: three float64 rows followed by three int8 rows
+_FLOAT_OUTPUTS = 3  # correlation, strength_score, confidence_level
+_CODE_OUTPUTS = 3  # volume_follows_price, trend_direction, valid
+
+
+class _ChunkSpec(NamedTuple):
+    input_name: str
+    output_name: str
+    length: int
+    start: int
+    stop: int
+    lookback_period: int
+    min_periods: int
+
+
+def chunk_bounds(
+    length: int, lookback_period: int, workers: int, chunk_size: int | None = None
+) -> list[tuple[int, int]]:
+    """Split [0, length) into chunks whose starts are multiples of lookback_period"""
+    size = chunk_size or max(-(-length // max(workers, 1)), DEFAULT_MIN_CHUNK_SIZE)
+    size = -(-size // lookback_period) * lookback_period
+    return [(start, min(start + size, length)) for start in range(0, length, size)]
+
+
+def analyze_chunked(
+    analyzer: "VolumeAnalyzer", df: pd.DataFrame, workers: int, chunk_size: int | None = None
+) -> VolumeAnalysisColumns:
+    """Analyze a prepared frame (see VolumeAnalyzer._prepare_frame) across a process pool"""
+    close_prices, price_changes, volume_changes = _frame_arrays(df)
+    dates = df['date'].to_numpy()
+    length = len(close_prices)
+    bounds = chunk_bounds(length, analyzer.lookback_period, workers, chunk_size)
+
+    if workers <= 1 or len(bounds) <= 1:
+        valid, columns = analyzer._compute_window_columns(df)
+        return _select_rows(dates, price_changes, volume_changes, columns, valid)
+
+    input_shm = shared_memory.SharedMemory(create=True, size=3 * length * 8)
+    output_shm = shared_memory.SharedMemory(
+        create=True, size=length * (_FLOAT_OUTPUTS * 8 + _CODE_OUTPUTS)
+    )
+    try:
+        inputs: NDArray[np.float64] = np.ndarray((3, length), dtype=np.float64, buffer=input_shm.buf)
+        inputs[0] = close_prices
+        inputs[1] = price_changes
+        inputs[2] = volume_changes
+        del inputs
+
+        specs = [
+            _ChunkSpec(
+                input_shm.name, output_shm.name, length, start, stop,
+                analyzer.lookback_period, analyzer.min_periods
+            )
+            for start, stop in bounds
+        ]
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(specs)), mp_context=multiprocessing.get_context(_START_METHOD)
+        ) as pool:
+            list(pool.map(_analyze_chunk, specs))
+
+        floats, codes = _output_views(output_shm, length)
+        rows = np.flatnonzero(codes[2])
+        # Fancy indexing copies out of shared memory before it is released
+        result = VolumeAnalysisColumns(
+            date=dates[rows],
+            correlation=floats[0][rows],
+            volume_follows_price=codes[0][rows],
+            strength_score=floats[1][rows],
+            trend_direction=codes[1][rows],
+            price_change_pct=price_changes[rows],
+            volume_change_pct=volume_changes[rows],
+            confidence_level=floats[2][rows]
+        )
+        del floats, codes
+        return result
+    finally:
+        input_shm.close()
+        input_shm.unlink()
+        output_shm.close()
+        output_shm.unlink()
+
+
+def _output_views(
+    shm: shared_memory.SharedMemory, length: int
+) -> tuple[NDArray[np.float64], NDArray[np.int8]]:
+    floats: NDArray[np.float64] = np.ndarray((_FLOAT_OUTPUTS, length), dtype=np.float64, buffer=shm.buf)
+    codes: NDArray[np.int8] = np.ndarray(
+        (_CODE_OUTPUTS, length), dtype=np.int8, buffer=shm.buf, offset=_FLOAT_OUTPUTS * length * 8
+    )
+    return floats, codes
+
+
+def _analyze_chunk(spec: _ChunkSpec) -> None:
+    """Worker: analyze rows [start, stop) with lookback_period bars of warm-up"""
+    input_shm = shared_memory.SharedMemory(name=spec.input_name)
+    output_shm = shared_memory.SharedMemory(name=spec.output_name)
+    try:
+        inputs: NDArray[np.float64] = np.ndarray((3, spec.length), dtype=np.float64, buffer=input_shm.buf)
+        warmup = max(spec.start - spec.lookback_period, 0)
+        close_prices, price_changes, volume_changes = (
+            inputs[k, warmup:spec.stop] for k in range(3)
+        )
+        columns = _window_columns(
+            close_prices, price_changes, volume_changes,
+            _window_inputs(price_changes, volume_changes), spec.lookback_period
+        )
+        valid = _valid_rows(columns, spec.min_periods, offset=warmup)
+
+        keep = slice(spec.start - warmup, None)
+        target = slice(spec.start, spec.stop)
+        floats, codes = _output_views(output_shm, spec.length)
+        floats[0, target] = columns.correlation[keep]
+        floats[1, target] = columns.strength_score[keep]
+        floats[2, target] = columns.confidence_level[keep]
+        codes[0, target] = columns.volume_follows_price[keep]
+        codes[1, target] = columns.trend_direction[keep]
+        codes[2, target] = valid[keep]
+        del inputs, close_prices, price_changes, volume_changes, floats, codes
+    finally:
+        input_shm.close()
+        output_shm.close()
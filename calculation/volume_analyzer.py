@@ -1,11 +1,15 @@
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, fields
 from functools import lru_cache
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeAlias, overload
 
 import numpy as np
 import pandas as pd
 from numpy.typing import NDArray
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 @dataclass(frozen=True)
 class VolumeAnalysisResult:
@@ -19,6 +23,393 @@ class VolumeAnalysisResult:
     confidence_level: float
 
 
+# Rows of {"date", "close_price", "volume"} records, or a DataFrame with those columns
+AnalysisInput: TypeAlias = list[dict[str, Any]] | pd.DataFrame
+
+# Category labels indexed by the small-int codes produced by the vectorized engine
+RELATIONSHIP_LABELS = ("positive", "negative", "divergent")
+TREND_LABELS = ("up", "down", "sideways")
+
+_POSITIVE, _NEGATIVE, _DIVERGENT = 0, 1, 2
+_UP, _DOWN, _SIDEWAYS = 0, 1, 2
+
+
+@dataclass(frozen=True, eq=False)
+class VolumeAnalysisColumns:
+    """
+    Columnar (struct-of-arrays) volume analysis results indexed by date.
+
+    Float fields are float64 arrays; volume_follows_price and trend_direction
+    hold int8 codes into RELATIONSHIP_LABELS and TREND_LABELS. Indexing with an
+    int returns a VolumeAnalysisResult, slicing returns a view-backed
+    VolumeAnalysisColumns, and iteration yields VolumeAnalysisResult rows.
+    """
+    date: NDArray[np.datetime64]
+    correlation: NDArray[np.float64]
+    volume_follows_price: NDArray[np.int8]
+    strength_score: NDArray[np.float64]
+    trend_direction: NDArray[np.int8]
+    price_change_pct: NDArray[np.float64]
+    volume_change_pct: NDArray[np.float64]
+    confidence_level: NDArray[np.float64]
+
+    @classmethod
+    def empty(cls) -> "VolumeAnalysisColumns":
+        return cls(
+            date=np.zeros(0, dtype='datetime64[ns]'),
+            correlation=np.zeros(0, dtype=np.float64),
+            volume_follows_price=np.zeros(0, dtype=np.int8),
+            strength_score=np.zeros(0, dtype=np.float64),
+            trend_direction=np.zeros(0, dtype=np.int8),
+            price_change_pct=np.zeros(0, dtype=np.float64),
+            volume_change_pct=np.zeros(0, dtype=np.float64),
+            confidence_level=np.zeros(0, dtype=np.float64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @overload
+    def __getitem__(self, key: int) -> VolumeAnalysisResult: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> "VolumeAnalysisColumns": ...
+
+    def __getitem__(self, key: int | slice) -> "VolumeAnalysisResult | VolumeAnalysisColumns":
+        if isinstance(key, slice):
+            return VolumeAnalysisColumns(**{field.name: getattr(self, field.name)[key] for field in fields(self)})
+
+        return VolumeAnalysisResult(
+            correlation=float(self.correlation[key]),
+            volume_follows_price=RELATIONSHIP_LABELS[self.volume_follows_price[key]],
+            strength_score=float(self.strength_score[key]),
+            trend_direction=TREND_LABELS[self.trend_direction[key]],
+            price_change_pct=float(self.price_change_pct[key]),
+            volume_change_pct=float(self.volume_change_pct[key]),
+            confidence_level=float(self.confidence_level[key])
+        )
+
+    def __iter__(self) -> Iterator[VolumeAnalysisResult]:
+        # Unbox each column once instead of indexing arrays per row
+        for row in zip(
+            self.correlation.tolist(),
+            [RELATIONSHIP_LABELS[code] for code in self.volume_follows_price.tolist()],
+            self.strength_score.tolist(),
+            [TREND_LABELS[code] for code in self.trend_direction.tolist()],
+            self.price_change_pct.tolist(),
+            self.volume_change_pct.tolist(),
+            self.confidence_level.tolist(),
+            strict=True
+        ):
+            yield VolumeAnalysisResult(*row)
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Plain-Python row dicts (datetime dates, string labels) for bulk inserts"""
+        labels = np.asarray(RELATIONSHIP_LABELS, dtype=object)[self.volume_follows_price].tolist()
+        trends = np.asarray(TREND_LABELS, dtype=object)[self.trend_direction].tolist()
+        return [
+            {
+                "date": date,
+                "correlation": correlation,
+                "volume_follows_price": label,
+                "strength_score": strength,
+                "trend_direction": trend,
+                "price_change_pct": price_change,
+                "volume_change_pct": volume_change,
+                "confidence_level": confidence
+            }
+            for date, correlation, label, strength, trend, price_change, volume_change, confidence in zip(
+                self.date.astype('datetime64[us]').tolist(),
+                self.correlation.tolist(),
+                labels,
+                self.strength_score.tolist(),
+                trends,
+                self.price_change_pct.tolist(),
+                self.volume_change_pct.tolist(),
+                self.confidence_level.tolist(),
+                strict=True
+            )
+        ]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame indexed by date; numeric columns and category codes are not copied"""
+        return pd.DataFrame(
+            {
+                "correlation": self.correlation,
+                "volume_follows_price": pd.Categorical.from_codes(self.volume_follows_price, RELATIONSHIP_LABELS),
+                "strength_score": self.strength_score,
+                "trend_direction": pd.Categorical.from_codes(self.trend_direction, TREND_LABELS),
+                "price_change_pct": self.price_change_pct,
+                "volume_change_pct": self.volume_change_pct,
+                "confidence_level": self.confidence_level,
+            },
+            index=pd.DatetimeIndex(self.date, name="date"),
+            copy=False
+        )
+
+    def to_arrow(self) -> "pa.Table":
+        """Arrow table with dictionary-encoded categories; numeric buffers are not copied"""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Arrow conversion") from e
+
+        return pa.table({
+            "date": pa.array(self.date),
+            "correlation": pa.array(self.correlation),
+            "volume_follows_price": pa.DictionaryArray.from_arrays(
+                pa.array(self.volume_follows_price), list(RELATIONSHIP_LABELS)
+            ),
+            "strength_score": pa.array(self.strength_score),
+            "trend_direction": pa.DictionaryArray.from_arrays(
+                pa.array(self.trend_direction), list(TREND_LABELS)
+            ),
+            "price_change_pct": pa.array(self.price_change_pct),
+            "volume_change_pct": pa.array(self.volume_change_pct),
+            "confidence_level": pa.array(self.confidence_level),
+        })
+
+
+# Relative variance below which a window is treated as constant. np.corrcoef
+# returns NaN (mapped to 0.0) for constant inputs, while rolling sums leave a
+# rounding residue of a few ulps instead of an exact zero.
+_DEGENERATE_VARIANCE = 1e-12
+
+
+class _WindowStatistics(NamedTuple):
+    """Rolling moments of the clean change samples for one lookback length"""
+    window_start: NDArray[np.int64]
+    window_length: NDArray[np.int64]
+    sample_count: NDArray[np.float64]
+    non_finite: NDArray[np.bool_]
+    correlation: NDArray[np.float64]
+    price_volatility: NDArray[np.float64]
+    volume_volatility: NDArray[np.float64]
+
+
+class _WindowColumns(NamedTuple):
+    """Per-row analysis columns for one lookback length, before min_periods masking"""
+    sample_count: NDArray[np.float64]
+    window_length: NDArray[np.int64]
+    correlation: NDArray[np.float64]
+    volume_follows_price: NDArray[np.int8]
+    strength_score: NDArray[np.float64]
+    trend_direction: NDArray[np.int8]
+    confidence_level: NDArray[np.float64]
+
+
+def _windowed_sum(values: NDArray[np.float64], window: int) -> NDArray[np.float64]:
+    """
+    Sum of values[max(0, i - window + 1):i + 1] for every i in O(n).
+
+    Uses block prefix/suffix scans (van Herk / Gil-Werman) over blocks of
+    ``window`` elements instead of one long cumulative sum, so each result only
+    depends on the values inside its own window and rounding error never
+    accumulates along the series.
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    n_blocks = -(-n // window)
+    blocks = np.zeros(n_blocks * window, dtype=np.float64)
+    blocks[:n] = values
+    blocks = blocks.reshape(n_blocks, window)
+
+    prefix = np.cumsum(blocks, axis=1).ravel()[:n]
+    suffix = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+
+    idx = np.arange(n)
+    start = idx - window + 1
+    # Windows that start inside a block and end in the next one
+    crossing = (start > 0) & (idx % window != window - 1)
+
+    sums = prefix.copy()
+    sums[crossing] = suffix[start[crossing]] + prefix[idx[crossing]]
+    return sums
+
+
+class _WindowInputs(NamedTuple):
+    """Elementwise window inputs shared by every lookback length"""
+    clean: NDArray[np.float64]
+    non_finite: NDArray[np.float64]
+    x: NDArray[np.float64]
+    y: NDArray[np.float64]
+    xx: NDArray[np.float64]
+    yy: NDArray[np.float64]
+    xy: NDArray[np.float64]
+
+
+def _frame_arrays(df: pd.DataFrame) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Close prices and percentage changes of a prepared frame as float arrays"""
+    return (
+        df['close_price'].to_numpy(dtype=np.float64),
+        df['price_change_pct'].to_numpy(dtype=np.float64),
+        df['volume_change_pct'].to_numpy(dtype=np.float64),
+    )
+
+
+def _window_inputs(price_changes: NDArray[np.float64], volume_changes: NDArray[np.float64]) -> _WindowInputs:
+    """Masked changes and their products; independent of the lookback length"""
+    # Samples that survive dropna() in the per-window path
+    clean = ~np.isnan(price_changes) & ~np.isnan(volume_changes)
+    finite = clean & np.isfinite(price_changes) & np.isfinite(volume_changes)
+    x = np.where(finite, price_changes, 0.0)
+    y = np.where(finite, volume_changes, 0.0)
+    return _WindowInputs(
+        clean=clean.astype(np.float64),
+        non_finite=(clean & ~finite).astype(np.float64),
+        x=x,
+        y=y,
+        xx=x * x,
+        yy=y * y,
+        xy=x * y
+    )
+
+
+def _window_statistics(inputs: _WindowInputs, lookback: int) -> _WindowStatistics:
+    """Correlation and population std of every rolling window from windowed sums"""
+    n = len(inputs.clean)
+    idx = np.arange(n)
+    window_start = np.maximum(idx - lookback + 1, 0)
+
+    count = _windowed_sum(inputs.clean, lookback)
+    non_finite = _windowed_sum(inputs.non_finite, lookback) > 0
+    sum_x = _windowed_sum(inputs.x, lookback)
+    sum_y = _windowed_sum(inputs.y, lookback)
+    sum_xx = _windowed_sum(inputs.xx, lookback)
+    sum_yy = _windowed_sum(inputs.yy, lookback)
+    sum_xy = _windowed_sum(inputs.xy, lookback)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        safe_count = np.maximum(count, 1.0)
+        var_x = np.maximum(sum_xx - sum_x * sum_x / safe_count, 0.0)
+        var_y = np.maximum(sum_yy - sum_y * sum_y / safe_count, 0.0)
+        cov_xy = sum_xy - sum_x * sum_y / safe_count
+
+        # Correlation (NaN for constant windows maps to 0.0)
+        degenerate = (var_x <= _DEGENERATE_VARIANCE * sum_xx) | \
+            (var_y <= _DEGENERATE_VARIANCE * sum_yy) | (count < 2)
+        correlation = np.clip(cov_xy / np.sqrt(var_x) / np.sqrt(var_y), -1.0, 1.0)
+        # Two samples are always perfectly (anti-)correlated
+        correlation = np.where(count == 2, np.sign(cov_xy), correlation)
+        correlation = np.where(degenerate | non_finite, 0.0, correlation)
+
+        # Population std (np.std, ddof=0); the per-window path uses 1.0 below two samples
+        price_volatility = np.where(count > 1, np.sqrt(var_x / safe_count), 1.0)
+        volume_volatility = np.where(count > 1, np.sqrt(var_y / safe_count), 1.0)
+        # +/-inf changes (zero price or volume) turn np.corrcoef and np.std into
+        # NaN, so such windows get zero correlation and a NaN volatility
+        price_volatility = np.where(non_finite & (count > 1), np.nan, price_volatility)
+        volume_volatility = np.where(non_finite & (count > 1), np.nan, volume_volatility)
+
+    return _WindowStatistics(
+        window_start=window_start,
+        window_length=idx - window_start + 1,
+        sample_count=count,
+        non_finite=non_finite,
+        correlation=correlation,
+        price_volatility=price_volatility,
+        volume_volatility=volume_volatility
+    )
+
+
+def _classify_windows(
+    close_prices: NDArray[np.float64],
+    price_changes: NDArray[np.float64],
+    volume_changes: NDArray[np.float64],
+    stats: _WindowStatistics,
+    lookback: int
+) -> _WindowColumns:
+    """Derive relationship, strength, trend and confidence columns from window statistics"""
+    n = len(close_prices)
+    correlation = stats.correlation
+    abs_correlation = np.abs(correlation)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Determine volume-price relationship from the current period changes
+        same_direction = ((price_changes > 0) & (volume_changes > 0)) | \
+            ((price_changes < 0) & (volume_changes < 0))
+        volume_follows_price = np.where(
+            abs_correlation < 0.1, _DIVERGENT,
+            np.where((correlation > 0.3) & same_direction, _POSITIVE,
+                     np.where((correlation < -0.3) & ~same_direction, _NEGATIVE, _DIVERGENT))
+        ).astype(np.int8)
+
+        # Strength score from correlation and volatility
+        volatility_adjustment = 1.0 / (1.0 + (stats.price_volatility + stats.volume_volatility) / 2)
+        volatility_adjustment = 0.5 + 0.5 * volatility_adjustment
+        strength_score = np.minimum(abs_correlation, 1.0) * volatility_adjustment
+
+        # Trend direction from the mean of the first and last three closes
+        sum3 = np.full(n, np.nan)
+        if n >= 3:
+            sum3[2:] = close_prices[:-2] + close_prices[1:-1] + close_prices[2:]
+        has_trend = stats.window_length >= 3
+        recent_avg = sum3 / 3
+        earlier_avg = np.full(n, np.nan)
+        earlier_avg[has_trend] = sum3[stats.window_start[has_trend] + 2] / 3
+        change_pct = (recent_avg - earlier_avg) / earlier_avg
+        trend_direction = np.where(
+            has_trend & (change_pct > 0.02), _UP,
+            np.where(has_trend & (change_pct < -0.02), _DOWN, _SIDEWAYS)
+        ).astype(np.int8)
+
+        # Confidence level from sample size and correlation strength
+        size_confidence = np.minimum(stats.sample_count / (lookback * 2), 1.0)
+        confidence_level = (size_confidence + abs_correlation) / 2
+
+    return _WindowColumns(
+        sample_count=stats.sample_count,
+        window_length=stats.window_length,
+        correlation=correlation,
+        volume_follows_price=volume_follows_price,
+        strength_score=strength_score,
+        trend_direction=trend_direction,
+        confidence_level=confidence_level
+    )
+
+
+def _window_columns(
+    close_prices: NDArray[np.float64],
+    price_changes: NDArray[np.float64],
+    volume_changes: NDArray[np.float64],
+    inputs: _WindowInputs,
+    lookback: int
+) -> _WindowColumns:
+    """Evaluate every rolling window of length ``lookback`` at once"""
+    return _classify_windows(
+        close_prices, price_changes, volume_changes, _window_statistics(inputs, lookback), lookback
+    )
+
+
+def _select_rows(
+    dates: NDArray[np.datetime64],
+    price_changes: NDArray[np.float64],
+    volume_changes: NDArray[np.float64],
+    columns: _WindowColumns,
+    mask: NDArray[np.bool_]
+) -> VolumeAnalysisColumns:
+    rows = np.flatnonzero(mask)
+    return VolumeAnalysisColumns(
+        date=dates[rows],
+        correlation=columns.correlation[rows],
+        volume_follows_price=columns.volume_follows_price[rows],
+        strength_score=columns.strength_score[rows],
+        trend_direction=columns.trend_direction[rows],
+        price_change_pct=price_changes[rows],
+        volume_change_pct=volume_changes[rows],
+        confidence_level=columns.confidence_level[rows]
+    )
+
+
+def _valid_rows(columns: _WindowColumns, min_periods: int, offset: int = 0) -> NDArray[np.bool_]:
+    """Rows for which the per-window path emits a result; ``offset`` is the series index of row 0"""
+    idx = np.arange(offset, offset + len(columns.sample_count))
+    return (idx >= min_periods) & (columns.window_length >= min_periods) & \
+        (columns.sample_count >= min_periods)
+
+
 class VolumeAnalyzer:
     """Advanced quantitative analyzer for volume-price relationships"""
 
@@ -26,21 +417,43 @@ class VolumeAnalyzer:
         self.lookback_period = lookback_period
         self.min_periods = min_periods
 
-    def analyze_volume_price_correlation(self, data: list[dict[str, Any]]) -> list[VolumeAnalysisResult]:
+    def analyze_volume_price_correlation(
+        self, data: AnalysisInput, workers: int = 1, chunk_size: int | None = None
+    ) -> VolumeAnalysisColumns:
         """
         Analyze volume-price correlation using rolling windows and statistical measures.
         Returns analysis for each data point where sufficient history exists.
+
+        Computes every window in one vectorized O(n) pass; rows match
+        analyze_volume_price_correlation_reference. With workers > 1, long series
+        are split into chunks analyzed in a process pool (see calculation.parallel);
+        the output is identical to the serial run.
         """
         if len(data) < self.min_periods:
-            return []
+            return VolumeAnalysisColumns.empty()
 
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date').reset_index(drop=True)
+        df = self._prepare_frame(data)
+        if workers > 1:
+            # Imported here because calculation.parallel builds on this module
+            from calculation.parallel import analyze_chunked
+            return analyze_chunked(self, df, workers, chunk_size)
 
-        # Calculate percentage changes
-        df['price_change_pct'] = df['close_price'].pct_change()
-        df['volume_change_pct'] = df['volume'].pct_change()
+        _, price_changes, volume_changes = _frame_arrays(df)
+        valid, columns = self._compute_window_columns(df)
+
+        return _select_rows(df['date'].to_numpy(), price_changes, volume_changes, columns, valid)
+
+    def analyze_volume_price_correlation_reference(
+        self, data: AnalysisInput
+    ) -> list[VolumeAnalysisResult]:
+        """
+        Reference implementation that re-slices and re-evaluates every window.
+        O(n * lookback_period); kept to validate the vectorized engine.
+        """
+        if len(data) < self.min_periods:
+            return []
+
+        df = self._prepare_frame(data)
 
         results = []
 
@@ -51,14 +464,44 @@ class VolumeAnalyzer:
             if len(window_data) < self.min_periods:
                 continue
 
-            result = self._calculate_single_analysis(window_data, i)
+            result = self.analyze_window(window_data)
             if result:
                 results.append(result)
 
         return results
 
-    def _calculate_single_analysis(self, window_data: pd.DataFrame, _current_idx: int) -> VolumeAnalysisResult | None:
-        """Calculate analysis for a single time point"""
+    def _prepare_frame(self, data: AnalysisInput) -> pd.DataFrame:
+        """Build the date-sorted frame with price and volume percentage changes"""
+        return self._add_pct_changes(self._build_frame(data))
+
+    def _build_frame(self, data: AnalysisInput) -> pd.DataFrame:
+        """Frame of date, close_price and volume sorted by date"""
+        if isinstance(data, pd.DataFrame):
+            # Column selection copies, so the caller's frame is never modified
+            df = data.loc[:, ['date', 'close_price', 'volume']]
+        else:
+            df = pd.DataFrame(data)
+        df['date'] = pd.to_datetime(df['date'])
+        return df.sort_values('date').reset_index(drop=True)
+
+    def _add_pct_changes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add price and volume percentage changes in place"""
+        # Calculate percentage changes
+        df['price_change_pct'] = df['close_price'].pct_change()
+        df['volume_change_pct'] = df['volume'].pct_change()
+        return df
+
+    def _compute_window_columns(self, df: pd.DataFrame) -> tuple[NDArray[np.bool_], _WindowColumns]:
+        """Evaluate all windows of a prepared frame; returns the result-row mask and columns"""
+        close_prices, price_changes, volume_changes = _frame_arrays(df)
+        columns = _window_columns(
+            close_prices, price_changes, volume_changes,
+            _window_inputs(price_changes, volume_changes), self.lookback_period
+        )
+        return _valid_rows(columns, self.min_periods), columns
+
+    def analyze_window(self, window_data: pd.DataFrame) -> VolumeAnalysisResult | None:
+        """Calculate the analysis for the last bar of a window with price/volume change columns"""
         # Remove NaN values for correlation calculation
         clean_data = window_data.dropna(subset=['price_change_pct', 'volume_change_pct'])
 
@@ -176,3 +619,40 @@ class VolumeAnalyzer:
 def get_volume_analyzer(lookback_period: int = 14, min_periods: int = 7) -> VolumeAnalyzer:
     """Get cached volume analyzer instance"""
     return VolumeAnalyzer(lookback_period, min_periods)
+
+
+def sweep_volume_analysis(
+    data: AnalysisInput,
+    lookback_periods: Iterable[int],
+    min_periods_values: Iterable[int]
+) -> dict[tuple[int, int], VolumeAnalysisColumns]:
+    """
+    Analyze a whole grid of (lookback_period, min_periods) pairs in one batched pass.
+
+    The frame, percentage changes and elementwise window inputs are built once;
+    rolling statistics are computed once per lookback length and only the
+    result-row mask differs between min_periods values. Returns columnar
+    results per parameter pair, identical to the matching
+    VolumeAnalyzer(lookback_period, min_periods) run.
+    """
+    lookbacks = sorted(set(lookback_periods))
+    minimums = sorted(set(min_periods_values))
+    if len(data) == 0:
+        return {
+            (lookback, min_periods): VolumeAnalysisColumns.empty()
+            for lookback in lookbacks for min_periods in minimums
+        }
+
+    df = VolumeAnalyzer()._prepare_frame(data)
+    dates = df['date'].to_numpy()
+    close_prices, price_changes, volume_changes = _frame_arrays(df)
+    inputs = _window_inputs(price_changes, volume_changes)
+
+    results: dict[tuple[int, int], VolumeAnalysisColumns] = {}
+    for lookback in lookbacks:
+        columns = _window_columns(close_prices, price_changes, volume_changes, inputs, lookback)
+        for min_periods in minimums:
+            mask = _valid_rows(columns, min_periods)
+            results[(lookback, min_periods)] = _select_rows(dates, price_changes, volume_changes, columns, mask)
+
+    return results
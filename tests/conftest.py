@@ -1,16 +1,20 @@
+import asyncio
 import os
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 # Set testing environment before importing app
 os.environ["TESTING"] = "True"
 
 # Import after setting environment
-from api.core.database import Base, get_db  # noqa: E402
+from api.core.database import Base, get_async_session_factory, get_db  # noqa: E402
 from api.main import app  # noqa: E402
+from api.services.cache import get_response_cache  # noqa: E402
 
 
 class TestConfig:
@@ -48,9 +52,70 @@ class TestConfig:
 @pytest.fixture
 def client():
     """Pytest fixture for test client"""
+    get_response_cache.cache_clear()
     return TestConfig.get_test_client()
 
 
+@pytest.fixture
+def db_session_factory(tmp_path):
+    """Isolated database shared by the test client (sync and async routes) and the test body"""
+    database_path = tmp_path / "test.db"
+    engine = create_engine(
+        f"sqlite:///{database_path}", connect_args={"check_same_thread": False}
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # TestClient may run each request on a new event loop, so async connections are not pooled
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_session_factory] = lambda: AsyncTestingSessionLocal
+    # In-process caches must not leak results between isolated databases
+    get_response_cache.cache_clear()
+    yield TestingSessionLocal
+    app.dependency_overrides.clear()
+    get_response_cache.cache_clear()
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def api_client(db_session_factory):  # noqa: ARG001 - installs the database overrides
+    """Test client bound to the isolated per-test database file"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def seed_btc_history(db_session_factory):
+    """Insert a deterministic daily BTC history and return its rows; only rows[start:stop] are inserted"""
+    from api.models.btc_models import BTCData
+    from tests.helpers import make_series
+
+    def seed(n=120, seed=0, start=0, stop=None):
+        rows = make_series(n, seed=seed)
+        with db_session_factory() as db:
+            db.add_all(
+                BTCData(
+                    date=row["date"].to_pydatetime(),
+                    close_price=float(row["close_price"]),
+                    volume=float(row["volume"])
+                )
+                for row in rows[start:stop]
+            )
+            db.commit()
+        return rows
+
+    return seed
+
+
 @pytest.fixture
 def sample_btc_data():
     """Sample BTC data for testing"""
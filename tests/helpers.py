@@ -0,0 +1,43 @@
+"""
+Shared test data builders and assertions.
+
+Kept out of the test modules so fixtures and tests in other modules can use
+them without importing a test module.
+"""
+import numpy as np
+import pandas as pd
+
+from calculation.volume_analyzer import VolumeAnalysisResult
+
+FLOAT_FIELDS = ("correlation", "strength_score", "price_change_pct", "volume_change_pct", "confidence_level")
+LABEL_FIELDS = ("volume_follows_price", "trend_direction")
+
+
+def make_series(n, seed=0, nan_gaps=False, zero_volume=False, flat_prices=False):
+    """Deterministic random-walk price/volume series in analyzer input format"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    volume = rng.lognormal(3, 0.5, n)
+    if flat_prices:
+        close[n // 3:n // 2] = close[n // 3]
+    if nan_gaps:
+        close[rng.integers(1, n, n // 20)] = np.nan
+        volume[rng.integers(1, n, n // 20)] = np.nan
+    if zero_volume:
+        volume[rng.integers(1, n, n // 30)] = 0.0
+    dates = pd.date_range("2020-01-01", periods=n, freq="D")
+    return [
+        {"date": dates[i], "close_price": close[i], "volume": volume[i]}
+        for i in range(n)
+    ]
+
+
+def assert_results_equivalent(actual: list[VolumeAnalysisResult], expected: list[VolumeAnalysisResult]):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected, strict=True):
+        for field in LABEL_FIELDS:
+            assert getattr(got, field) == getattr(want, field)
+        for field in FLOAT_FIELDS:
+            np.testing.assert_allclose(
+                getattr(got, field), getattr(want, field), rtol=1e-9, atol=1e-12
+            )
@@ -0,0 +1,311 @@
+"""
+Tests for the pooled, rate-limited, retrying Alpha Vantage client.
+
+Test Structure:
+- TestTokenBucket: Burst capacity and refill waits
+- TestAlphaVantageClient: Retries, throttle notes and metrics against httpx.MockTransport
+- TestSingleFlight: Coalescing and freshness of fetch_btc_columns
+- TestUpstreamHealthEndpoint: /health/upstream response tests
+
+Usage:
+    pytest tests/test_alpha_vantage_client.py
+"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from api.core.config import get_settings
+from api.core.ratelimit import TokenBucket
+from api.services.alpha_vantage import AlphaVantageError, AlphaVantageService
+
+THROTTLE_NOTE = {
+    "Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."
+}
+
+
+class FakeTime:
+    """Clock and sleep that advance together without waiting"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket:
+    """Test TokenBucket pacing"""
+
+    async def test_burst_then_refill(self):
+        """Test that capacity calls pass at once and later ones wait one token interval"""
+        fake = FakeTime()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=fake.clock, sleep=fake.sleep)
+
+        waits = [await bucket.acquire() for _ in range(4)]
+
+        assert waits == [0.0, 0.0, pytest.approx(0.5), pytest.approx(0.5)]
+        assert fake.now == pytest.approx(1.0)
+
+    async def test_idle_time_refills_up_to_capacity(self):
+        """Test that tokens do not accumulate beyond capacity"""
+        fake = FakeTime()
+        bucket = TokenBucket(rate=1.0, capacity=1, clock=fake.clock, sleep=fake.sleep)
+        await bucket.acquire()
+        fake.now += 100
+
+        assert await bucket.acquire() == 0.0
+        assert await bucket.acquire() == pytest.approx(1.0)
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+
+
+class TestAlphaVantageClient:
+    """Test AlphaVantageService against scripted upstream responses"""
+
+    @pytest.fixture
+    def settings(self):
+        return get_settings().model_copy(update={
+            "alpha_vantage_requests_per_minute": 60_000,
+            "alpha_vantage_burst": 10,
+            "alpha_vantage_max_retries": 2,
+            "alpha_vantage_backoff_base": 0.001
+        })
+
+    @pytest.fixture
+    async def upstream(self, settings, sample_btc_data):
+        """Service whose requests are answered from a list of scripted responses"""
+        script = []
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            outcome = script.pop(0) if script else sample_btc_data
+            if isinstance(outcome, Exception):
+                raise outcome
+            if isinstance(outcome, int):
+                return httpx.Response(outcome, json={})
+            return httpx.Response(200, json=outcome)
+
+        service = AlphaVantageService(settings, transport=httpx.MockTransport(handler))
+        yield service, script, requests
+        await service.aclose()
+
+    async def test_shared_client_and_query(self, upstream, sample_btc_data):
+        """Test that calls reuse one client and send the daily series query"""
+        service, _script, requests = upstream
+        client = service.client
+
+        first = await service.fetch_btc_daily_data()
+        await service.fetch_btc_daily_data()
+
+        assert first == sample_btc_data
+        assert service.client is client
+        assert requests[0].url.params["function"] == "DIGITAL_CURRENCY_DAILY"
+        assert service.metrics.calls == 2
+        assert service.metrics.attempts == 2
+        await service.aclose()
+        assert client.is_closed
+        assert service.client is not client
+
+    async def test_retries_server_errors(self, upstream, sample_btc_data):
+        """Test that 5xx responses are retried until data arrives"""
+        service, script, _requests = upstream
+        script.extend([503, 500])
+
+        assert await service.fetch_btc_daily_data() == sample_btc_data
+        assert service.metrics.attempts == 3
+        assert service.metrics.retries == 2
+        assert service.metrics.server_errors == 2
+        assert service.metrics.failures == 0
+
+    async def test_retries_throttle_notes_and_transport_errors(self, upstream, sample_btc_data):
+        """Test that HTTP 200 throttle notes, 429s and connection errors are retried"""
+        service, script, _requests = upstream
+        script.extend([THROTTLE_NOTE, httpx.ConnectError("refused")])
+
+        assert await service.fetch_btc_daily_data() == sample_btc_data
+        assert service.metrics.throttled == 1
+        assert service.metrics.transport_errors == 1
+
+    async def test_gives_up_after_max_retries(self, upstream):
+        """Test that persistent throttling raises after max_retries retries"""
+        service, script, _requests = upstream
+        script.extend([THROTTLE_NOTE, 429, THROTTLE_NOTE])
+
+        with pytest.raises(AlphaVantageError, match="call frequency"):
+            await service.fetch_btc_daily_data()
+        assert service.metrics.attempts == 3
+        assert service.metrics.throttled == 3
+        assert service.metrics.failures == 1
+
+    async def test_client_errors_are_not_retried(self, upstream):
+        """Test that other 4xx responses fail immediately"""
+        service, script, _requests = upstream
+        script.append(401)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.fetch_btc_daily_data()
+        assert service.metrics.attempts == 1
+
+    async def test_unrelated_information_is_returned(self, upstream):
+        """Test that non-throttle messages reach the parser instead of being retried"""
+        service, script, _requests = upstream
+        script.append({"Information": "The demo API key is for demo purposes only."})
+
+        payload = await service.fetch_btc_daily_data()
+
+        assert "Information" in payload
+        assert service.metrics.attempts == 1
+
+    async def test_rate_limited_calls_are_spaced(self, settings, sample_btc_data):
+        """Test that calls beyond the burst wait for the limiter"""
+        settings = settings.model_copy(update={"alpha_vantage_requests_per_minute": 1200, "alpha_vantage_burst": 1})
+        service = AlphaVantageService(
+            settings, transport=httpx.MockTransport(lambda _request: httpx.Response(200, json=sample_btc_data))
+        )
+
+        for _ in range(3):
+            await service.fetch_btc_daily_data()
+
+        assert service.metrics.rate_limit_wait_seconds == pytest.approx(0.1, abs=0.02)
+        assert service.metrics.snapshot()["avg_call_seconds"] > 0
+        await service.aclose()
+
+
+class TestSingleFlight:
+    """Test that concurrent and repeated fetches share upstream calls"""
+
+    @pytest.fixture
+    def gated_upstream(self, sample_btc_data):
+        """Upstream that answers only once release is set; counts requests"""
+        state = {"requests": 0, "status": 200, "release": asyncio.Event()}
+
+        async def handler(_request):
+            state["requests"] += 1
+            await state["release"].wait()
+            return httpx.Response(state["status"], json=sample_btc_data)
+
+        def make(fresh_seconds=60.0):
+            settings = get_settings().model_copy(update={
+                "alpha_vantage_requests_per_minute": 60_000,
+                "alpha_vantage_burst": 10,
+                "alpha_vantage_max_retries": 0,
+                "alpha_vantage_fresh_seconds": fresh_seconds
+            })
+            return AlphaVantageService(settings, transport=httpx.MockTransport(handler))
+
+        return state, make
+
+    async def test_concurrent_fetches_share_one_call(self, gated_upstream):
+        """Test one upstream call and one parsed result for a burst of fetches"""
+        state, make = gated_upstream
+        service = make()
+
+        fetches = [asyncio.ensure_future(service.fetch_btc_columns()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        state["release"].set()
+        results = await asyncio.gather(*fetches)
+
+        assert state["requests"] == 1
+        assert all(result is results[0] for result in results)
+        assert service.metrics.fetch_requests == 5
+        assert service.metrics.coalesced == 4
+        assert service.metrics.calls == 1
+        await service.aclose()
+
+    async def test_cancelled_caller_does_not_cancel_others(self, gated_upstream):
+        """Test that the shared fetch survives the caller that started it"""
+        state, make = gated_upstream
+        service = make()
+
+        first = asyncio.ensure_future(service.fetch_btc_columns())
+        second = asyncio.ensure_future(service.fetch_btc_columns())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        state["release"].set()
+
+        assert len((await second).date) == 2
+        assert state["requests"] == 1
+        await service.aclose()
+
+    async def test_fresh_result_is_reused(self, gated_upstream):
+        """Test that repeated fetches within the window skip upstream"""
+        state, make = gated_upstream
+        state["release"].set()
+        service, uncached = make(), make(fresh_seconds=0)
+
+        await service.fetch_btc_columns()
+        await service.fetch_btc_columns()
+        await uncached.fetch_btc_columns()
+        await uncached.fetch_btc_columns()
+
+        assert state["requests"] == 3
+        assert service.metrics.fresh_hits == 1
+        assert uncached.metrics.fresh_hits == 0
+        await service.aclose()
+        await uncached.aclose()
+
+    async def test_failures_are_shared_but_not_reused(self, gated_upstream):
+        """Test that waiters see the error and the next fetch calls upstream again"""
+        state, make = gated_upstream
+        state["status"] = 500
+        service = make()
+
+        fetches = [asyncio.ensure_future(service.fetch_btc_columns()) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        state["release"].set()
+        errors = await asyncio.gather(*fetches, return_exceptions=True)
+        state["status"] = 200
+        columns = await service.fetch_btc_columns()
+
+        assert all(isinstance(error, httpx.HTTPStatusError) for error in errors)
+        assert len(columns.date) == 2
+        assert state["requests"] == 2
+        await service.aclose()
+
+    def test_fetch_data_endpoint_reuses_fresh_fetch(self, api_client, gated_upstream, monkeypatch):
+        """Test that back-to-back /btc/fetch-data calls make one upstream call"""
+        from api.services import pipelines
+
+        state, make = gated_upstream
+        state["release"].set()
+        service = make()
+        monkeypatch.setattr(pipelines, "get_alpha_vantage_service", lambda: service)
+
+        first = api_client.post("/btc/fetch-data").json()
+        second = api_client.post("/btc/fetch-data").json()
+
+        assert state["requests"] == 1
+        assert first["records_added"] == 2
+        assert second["records_added"] == 0
+        assert second["records_skipped"] == 2
+        assert service.metrics.fresh_hits == 1
+
+    def test_since_filters_by_day(self, sample_btc_data):
+        """Test that since() keeps days strictly after the given day"""
+        columns = AlphaVantageService.__new__(AlphaVantageService).parse_btc_columns(sample_btc_data)
+
+        assert len(columns.since(None).date) == 2
+        assert len(columns.since(datetime(2025, 5, 25, 18, 0)).date) == 1
+        assert len(columns.since(datetime(2025, 5, 26)).date) == 0
+
+
+class TestUpstreamHealthEndpoint:
+    """Test /health/upstream"""
+
+    def test_reports_limits_and_metrics(self, api_client):
+        """Test limiter settings and metric fields"""
+        body = api_client.get("/health/upstream").json()
+
+        assert body["requests_per_minute"] == get_settings().alpha_vantage_requests_per_minute
+        assert {"calls", "retries", "throttled", "rate_limit_wait_seconds", "avg_call_seconds"} <= set(body["metrics"])
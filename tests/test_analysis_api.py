@@ -6,12 +6,18 @@ Test Structure:
 - TestVolumeCorrelationAlgorithm: Core algorithm logic tests
 - TestAnalysisDataProcessing: Data processing and calculations tests
 - TestAnalysisRecommendations: Recommendation generation tests
+- TestParameterSweepEndpoint: /analysis/sweep tests
+- TestRunVolumeAnalysisStorage: Stored analysis row tests
+- TestIncrementalVolumeAnalysisRun: Watermark-based incremental run tests
+- TestAnalysisSummaryEndpoint: SQL-aggregated /analysis/summary tests
+- TestTrendAnalysisEndpoint: LAG()-based /analysis/trends tests
+- TestVolumeCorrelationPagination: Cursor paging of /analysis/volume-price-correlation
 
 Usage:
     pytest tests/test_analysis_api.py
 """
 
-
+import pytest
 
 
 class TestVolumeAnalysisEndpoints:
@@ -108,3 +114,409 @@ class TestAnalysisRecommendations:
         """Test volume-price divergence detection"""
         # TODO: Implement test for divergence logic
         pass
+
+
+class TestParameterSweepEndpoint:
+    """Test the /analysis/sweep batched parameter grid endpoint"""
+
+    def test_sweep_returns_every_parameter_set(self, api_client, seed_btc_history):
+        """Test grid coverage and summary fields"""
+        seed_btc_history(120)
+
+        response = api_client.get(
+            "/analysis/sweep",
+            params={"lookback_min": 7, "lookback_max": 10, "min_periods_min": 3, "min_periods_max": 5}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total_records"] == 120
+        assert body["parameter_sets"] == 12
+        first = body["results"][0]
+        assert (first["lookback_period"], first["min_periods"]) == (7, 3)
+        assert first["records_analyzed"] == 117
+        assert sum(first["trend_distribution"].values()) == pytest.approx(100, abs=0.1)
+
+    def test_sweep_averages_skip_zero_volume_windows(self, api_client, seed_btc_history, db_session_factory):
+        """Test that NaN strength scores from a zero-volume bar do not break the response"""
+        from api.models.btc_models import BTCData
+
+        rows = seed_btc_history(60)
+        with db_session_factory() as db:
+            db.query(BTCData).filter(BTCData.date == rows[30]["date"].to_pydatetime()).update({"volume": 0.0})
+            db.commit()
+
+        response = api_client.get(
+            "/analysis/sweep",
+            params={"lookback_min": 7, "lookback_max": 8, "min_periods_min": 3, "min_periods_max": 3}
+        )
+
+        assert response.status_code == 200
+        for result in response.json()["results"]:
+            assert 0.0 <= result["average_strength_score"] <= 1.0
+
+    def test_sweep_rejects_inverted_range(self, api_client, seed_btc_history):
+        """Test range validation"""
+        seed_btc_history(30)
+
+        response = api_client.get("/analysis/sweep", params={"lookback_min": 20, "lookback_max": 10})
+
+        assert response.status_code == 400
+
+    def test_sweep_insufficient_data(self, api_client):
+        """Test empty database handling"""
+        response = api_client.get("/analysis/sweep")
+
+        assert response.status_code == 400
+
+
+class TestRunVolumeAnalysisStorage:
+    """Test results written by /analysis/run-volume-analysis"""
+
+    def test_results_stored_under_their_own_dates(self, api_client, seed_btc_history, db_session_factory):
+        """Test that stored rows carry the date of the bar they analyze"""
+        from api.models.btc_models import VolumeAnalysis
+        from calculation.volume_analyzer import VolumeAnalyzer
+
+        rows = seed_btc_history(60)
+        expected = VolumeAnalyzer(14, 7).analyze_volume_price_correlation(rows)
+
+        response = api_client.post("/analysis/run-volume-analysis")
+
+        assert response.status_code == 200
+        assert response.json()["records_added"] == len(expected)
+        with db_session_factory() as db:
+            stored = db.query(VolumeAnalysis).order_by(VolumeAnalysis.date.asc()).all()
+        assert [row.date for row in stored] == [record["date"] for record in expected.to_records()]
+        assert stored[-1].trend_direction == expected[-1].trend_direction
+
+
+class TestIncrementalVolumeAnalysisRun:
+    """Test that repeated runs only analyze bars past the stored watermark"""
+
+    @staticmethod
+    def stored_rows(db_session_factory, lookback_period=14, min_periods=7):
+        from api.models.btc_models import VolumeAnalysis
+
+        with db_session_factory() as db:
+            return db.query(VolumeAnalysis).filter(
+                VolumeAnalysis.lookback_period == lookback_period,
+                VolumeAnalysis.min_periods == min_periods
+            ).order_by(VolumeAnalysis.date.asc()).all()
+
+    @pytest.mark.parametrize("lookback_period,min_periods", [(14, 7), (7, 7), (20, 15)])
+    def test_incremental_matches_full_run(self, api_client, seed_btc_history, db_session_factory,
+                                          lookback_period, min_periods):
+        """Test that analyzing new bars in steps stores what one full run stores"""
+        from calculation.volume_analyzer import VolumeAnalyzer
+
+        params = {"lookback_period": lookback_period, "min_periods": min_periods}
+        seed_btc_history(75, stop=60)
+        assert api_client.post("/analysis/run-volume-analysis", params=params).status_code == 200
+        rows = seed_btc_history(75, start=60)
+
+        response = api_client.post("/analysis/run-volume-analysis", params=params)
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["records_added"] == 15
+        assert body["bars_skipped"] == 60 - lookback_period
+        expected = VolumeAnalyzer(lookback_period, min_periods).analyze_volume_price_correlation(rows)
+        stored = self.stored_rows(db_session_factory, lookback_period, min_periods)
+        assert [row.date for row in stored] == [record["date"] for record in expected.to_records()]
+        for row, record in zip(stored, expected.to_records(), strict=True):
+            assert row.strength_score == pytest.approx(record["strength_score"], rel=1e-9, abs=1e-12)
+            assert row.volume_follows_price == record["volume_follows_price"]
+            assert row.trend_direction == record["trend_direction"]
+
+    def test_up_to_date_run_adds_nothing(self, api_client, seed_btc_history, db_session_factory):
+        """Test that a run without new bars is a no-op"""
+        seed_btc_history(40)
+        api_client.post("/analysis/run-volume-analysis")
+        stored = len(self.stored_rows(db_session_factory))
+
+        response = api_client.post("/analysis/run-volume-analysis")
+
+        assert response.status_code == 200
+        assert response.json()["records_added"] == 0
+        assert response.json()["bars_skipped"] == 40
+        assert len(self.stored_rows(db_session_factory)) == stored
+
+    def test_full_rebuild_replaces_parameter_set(self, api_client, seed_btc_history, db_session_factory):
+        """Test that full=true recomputes only the requested parameter set"""
+        seed_btc_history(40)
+        api_client.post("/analysis/run-volume-analysis")
+        api_client.post("/analysis/run-volume-analysis", params={"lookback_period": 10, "min_periods": 5})
+        other = len(self.stored_rows(db_session_factory, 10, 5))
+
+        response = api_client.post("/analysis/run-volume-analysis", params={"full": True})
+
+        assert response.status_code == 200
+        assert response.json()["watermark"] is None
+        assert response.json()["records_added"] == len(self.stored_rows(db_session_factory))
+        assert len(self.stored_rows(db_session_factory, 10, 5)) == other
+
+    def test_full_rebuild_drops_stale_rows(self, api_client, seed_btc_history, db_session_factory):
+        """Test that full=true removes stored rows whose bars no longer produce a result"""
+        from api.models.btc_models import BTCData
+
+        seed_btc_history(40)
+        api_client.post("/analysis/run-volume-analysis")
+        stale = self.stored_rows(db_session_factory)[-1].date
+        with db_session_factory() as db:
+            db.query(BTCData).filter(BTCData.date == stale).delete()
+            db.commit()
+
+        response = api_client.post("/analysis/run-volume-analysis", params={"full": True})
+
+        assert response.status_code == 200
+        dates = [row.date for row in self.stored_rows(db_session_factory)]
+        assert stale not in dates
+        assert response.json()["records_added"] == len(dates)
+
+
+class TestAnalysisSummaryEndpoint:
+    """Test /analysis/summary aggregates against a row-by-row computation"""
+
+    @pytest.fixture
+    def recent_analyses(self, db_session_factory):
+        """Store analysis rows for the last 60 days under two parameter sets"""
+        from datetime import datetime, timedelta
+
+        import numpy as np
+
+        from api.models.btc_models import VolumeAnalysis
+
+        rng = np.random.default_rng(51)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        rows = [
+            VolumeAnalysis(
+                date=today - timedelta(days=day),
+                price_change_pct=float(rng.normal(0, 0.02)),
+                volume_change_pct=float(rng.normal(0, 0.2)),
+                volume_follows_price=str(rng.choice(["positive", "negative", "divergent"])),
+                strength_score=float(rng.uniform()),
+                trend_direction=str(rng.choice(["up", "down", "sideways"])),
+                lookback_period=lookback_period,
+                min_periods=7
+            )
+            for day in range(60)
+            for lookback_period in (14, 21)
+        ]
+        with db_session_factory() as db:
+            db.add_all(rows)
+            db.commit()
+            return [
+                (row.date, row.volume_follows_price, row.trend_direction, row.strength_score, row.lookback_period)
+                for row in rows
+            ]
+
+    @pytest.mark.parametrize("lookback_period", [14, 21])
+    @pytest.mark.parametrize("days_back", [1, 10, 30, 365])
+    def test_summary_matches_row_counts(self, api_client, recent_analyses, days_back, lookback_period):
+        """Test percentages and averages against counts over the raw rows of one parameter set"""
+        from datetime import datetime, timedelta
+
+        cutoff = datetime.now() - timedelta(days=days_back)
+        rows = [row for row in recent_analyses if row[0] >= cutoff and row[4] == lookback_period]
+        total = len(rows)
+
+        def pct(index, label):
+            return round(sum(row[index] == label for row in rows) / total * 100, 2)
+
+        response = api_client.get(
+            "/analysis/summary", params={"days_back": days_back, "lookback_period": lookback_period}
+        )
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["total_records"] == total
+        assert body["summary"] == {
+            "total_records": total,
+            "positive_correlations_pct": pct(1, "positive"),
+            "negative_correlations_pct": pct(1, "negative"),
+            "divergent_cases_pct": pct(1, "divergent"),
+            "average_strength_score": round(sum(row[3] for row in rows) / total, 3),
+            "trend_distribution": {
+                "up_pct": pct(2, "up"),
+                "down_pct": pct(2, "down"),
+                "sideways_pct": pct(2, "sideways")
+            }
+        }
+        assert body["latest_analysis"]["date"].startswith(max(row[0] for row in rows).date().isoformat())
+        assert body["recommendations"]
+
+    def test_summary_without_rows(self, api_client):
+        """Test 404 when nothing is in range"""
+        assert api_client.get("/analysis/summary").status_code == 404
+
+    def test_recommendations_from_aggregates(self):
+        """Test recommendations need only counts and the latest labels"""
+        from api.routers.analysis import _generate_recommendations
+
+        assert _generate_recommendations(70, 10, 20, 100, 0.8, "up", "positive") == [
+            "Strong volume-price correlation detected. Market shows healthy price discovery.",
+            "High confidence in volume patterns. Technical indicators likely reliable.",
+            "Bullish trend with volume confirmation. Consider long positions.",
+        ]
+        assert _generate_recommendations(30, 30, 40, 100, 0.5) == [
+            "Mixed signals detected. Maintain balanced risk management approach."
+        ]
+
+
+class TestTrendAnalysisEndpoint:
+    """Test /analysis/trends transitions against a pairwise walk"""
+
+    @pytest.fixture
+    def stored_trends(self, db_session_factory):
+        """Store one row per day for the last 200 days under 14/7 and 40/3; returns each set oldest first"""
+        from datetime import datetime, timedelta
+
+        import numpy as np
+
+        from api.models.btc_models import VolumeAnalysis
+
+        rng = np.random.default_rng(61)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        sets = {
+            params: [
+                {
+                    "date": today - timedelta(days=day),
+                    "price_change_pct": 0.0,
+                    "volume_change_pct": 0.0,
+                    "volume_follows_price": str(rng.choice(["positive", "negative", "divergent"])),
+                    "strength_score": float(rng.uniform()),
+                    "trend_direction": str(rng.choice(["up", "up", "down", "sideways"])),
+                    "lookback_period": params[0],
+                    "min_periods": params[1]
+                }
+                for day in range(200)
+            ]
+            for params in ((14, 7), (40, 3))
+        }
+        with db_session_factory() as db:
+            db.add_all(VolumeAnalysis(**row) for rows in sets.values() for row in rows)
+            db.commit()
+        return {params: rows[::-1] for params, rows in sets.items()}
+
+    @pytest.fixture
+    def daily_trends(self, stored_trends):
+        """Rows of the default 14/7 parameter set, oldest first"""
+        return stored_trends[(14, 7)]
+
+    @staticmethod
+    def expected_changes(rows, days_back):
+        from datetime import datetime, timedelta
+
+        cutoff = datetime.now() - timedelta(days=days_back)
+        rows = [row for row in rows if row["date"] >= cutoff]
+        return rows, [
+            {
+                "date": current["date"].isoformat(),
+                "from": previous["trend_direction"],
+                "to": current["trend_direction"],
+                "volume_relationship": current["volume_follows_price"],
+                "strength": pytest.approx(current["strength_score"])
+            }
+            for previous, current in zip(rows[:-1], rows[1:], strict=True)
+            if previous["trend_direction"] != current["trend_direction"]
+        ]
+
+    @pytest.mark.parametrize("days_back", [1, 30, 365])
+    def test_latest_changes(self, api_client, daily_trends, days_back):
+        """Test total count, last 10 changes and current state"""
+        rows, changes = self.expected_changes(daily_trends, days_back)
+
+        body = api_client.get("/analysis/trends", params={"days_back": days_back}).json()
+
+        assert body["total_trend_changes"] == len(changes)
+        assert body["trend_changes"] == changes[-10:]
+        assert body["current_trend"] == rows[-1]["trend_direction"]
+        assert body["current_volume_relationship"] == rows[-1]["volume_follows_price"]
+        assert body["next_since"] is None
+
+    def test_paging_with_since(self, api_client, daily_trends):
+        """Test that following next_since visits every change once"""
+        _, changes = self.expected_changes(daily_trends, 365)
+        params = {"days_back": 365, "limit": 7, "since": "2000-01-01T00:00:00"}
+
+        pages = []
+        while params["since"]:
+            body = api_client.get("/analysis/trends", params=params).json()
+            pages.append(body["trend_changes"])
+            params["since"] = body["next_since"]
+
+        assert [change for page in pages for change in page] == changes
+        assert all(len(page) == 7 for page in pages[:-1])
+
+    def test_parameter_sets_are_not_interleaved(self, api_client, stored_trends):
+        """Test that LAG() compares results of the requested parameter set only"""
+        rows, changes = self.expected_changes(stored_trends[(40, 3)], 365)
+
+        body = api_client.get(
+            "/analysis/trends", params={"days_back": 365, "limit": 1000, "lookback_period": 40, "min_periods": 3}
+        ).json()
+
+        assert body["total_trend_changes"] == len(changes)
+        assert body["trend_changes"] == changes
+        assert body["current_trend"] == rows[-1]["trend_direction"]
+
+    def test_no_rows(self, api_client):
+        """Test 404 when nothing is in range"""
+        assert api_client.get("/analysis/trends").status_code == 404
+
+
+class TestVolumeCorrelationPagination:
+    """Test keyset paging where parameter sets share dates"""
+
+    @pytest.fixture
+    def analysis_ids(self, db_session_factory):
+        """Store 20 days of results under two parameter sets; return each set's ids newest first"""
+        from datetime import datetime, timedelta
+
+        from api.models.btc_models import VolumeAnalysis
+
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        with db_session_factory() as db:
+            rows = [
+                VolumeAnalysis(
+                    date=today - timedelta(days=day), price_change_pct=0.0, volume_change_pct=0.0,
+                    volume_follows_price="positive", strength_score=0.5, trend_direction="up",
+                    lookback_period=lookback_period, min_periods=7
+                )
+                for day in range(20)
+                for lookback_period in (14, 21)
+            ]
+            db.add_all(rows)
+            db.commit()
+            return {
+                lookback_period: [
+                    row.id for row in sorted(rows, key=lambda row: row.date, reverse=True)
+                    if row.lookback_period == lookback_period
+                ]
+                for lookback_period in (14, 21)
+            }
+
+    @pytest.mark.parametrize("lookback_period", [14, 21])
+    def test_pages_cover_every_row_once(self, api_client, analysis_ids, lookback_period):
+        """Test that following X-Next-Cursor walks the parameter set's rows in order, each date once"""
+        query = {"limit": 7, "lookback_period": lookback_period}
+        seen, params, pages = [], query, 0
+        while True:
+            response = api_client.get("/analysis/volume-price-correlation", params=params)
+            seen += [row["id"] for row in response.json()]
+            pages += 1
+            if "X-Next-Cursor" not in response.headers:
+                break
+            assert 'rel="next"' in response.headers["Link"]
+            params = {**query, "cursor": response.headers["X-Next-Cursor"]}
+
+        assert seen == analysis_ids[lookback_period]
+        assert pages == 3
+
+    @pytest.mark.usefixtures("analysis_ids")
+    def test_invalid_cursor(self, api_client):
+        """Test 400 for a malformed cursor"""
+        response = api_client.get("/analysis/volume-price-correlation", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
@@ -0,0 +1,253 @@
+"""
+Tests for the offline CSV/Parquet backfill loader.
+
+Test Structure:
+- TestReaders: Chunked CSV and Parquet reading, column aliases, invalid rows and offsets
+- TestBackfill: Loading into SQLite, updates, checkpoints and resuming
+- TestBackfillCli: Command-line summary and analysis rebuild
+
+Usage:
+    pytest tests/test_backfill.py
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from api.core.database import Base
+from api.models.btc_models import BTCData, VolumeAnalysis
+from api.services.backfill import (
+    backfill,
+    main,
+    read_csv_chunks,
+    read_parquet_chunks,
+    resume_offset,
+)
+from tests.helpers import make_series
+
+FIRST_DAY = datetime(2024, 1, 1)
+
+
+def write_csv(path, n, header="date,open,high,low,close,volume", first_day=FIRST_DAY):
+    rows = make_series(n)
+    lines = [header] + [
+        f"{(first_day + timedelta(days=i)).isoformat()},1,1,1,{rows[i]['close_price']},{rows[i]['volume']}"
+        for i in range(n)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return rows
+
+
+@pytest.fixture
+def bars_csv(tmp_path):
+    path = tmp_path / "bars.csv"
+    write_csv(path, 25)
+    return path
+
+
+@pytest.fixture
+def stored_count(db_session_factory):
+    def count():
+        with db_session_factory() as db:
+            return db.scalar(select(func.count()).select_from(BTCData))
+
+    return count
+
+
+class TestReaders:
+    """Test chunked file readers"""
+
+    def test_csv_chunks_and_offsets(self, bars_csv):
+        """Test that chunks cover the file and a chunk offset resumes after it"""
+        chunks = list(read_csv_chunks(bars_csv, chunk_size=10))
+
+        assert [len(chunk.rows) for chunk in chunks] == [10, 10, 5]
+        assert chunks[-1].offset == bars_csv.stat().st_size
+        resumed = list(read_csv_chunks(bars_csv, chunk_size=10, offset=chunks[0].offset))
+        assert [row for chunk in resumed for row in chunk.rows] == [row for chunk in chunks[1:] for row in chunk.rows]
+        assert chunks[0].rows[0][0] == FIRST_DAY
+
+    def test_csv_aliases_epochs_and_invalid_rows(self, tmp_path):
+        """Test alternate headers, epoch and timezone-aware timestamps and unparsable rows"""
+        path = tmp_path / "minutes.csv"
+        path.write_text(
+            "Timestamp,Open,High,Low,Close,Volume_(BTC),Volume\n"
+            "1704067200,1,1,1,42000.5,0,3.5\n"
+            "2024-01-01T00:01:00+01:00,1,1,1,42001,0,1\n"
+            "not-a-date,1,1,1,42002,0,1\n"
+            "2024-01-01T00:03:00,1,1,1,nan,0,1\n"
+            "2024-01-01T00:04:00,1,1,1,42003\n"
+        )
+
+        [chunk] = read_csv_chunks(path, chunk_size=100)
+
+        assert chunk.rows == [
+            (datetime(2024, 1, 1), 42000.5, 3.5, 1.0, 1.0, 1.0),
+            (datetime(2023, 12, 31, 23, 1), 42001.0, 1.0, 1.0, 1.0, 1.0)
+        ]
+        assert chunk.invalid == 3
+
+    def test_missing_column_is_rejected(self, tmp_path):
+        path = tmp_path / "bad.csv"
+        path.write_text("date,close\n2024-01-01,1\n")
+
+        with pytest.raises(ValueError, match="No volume column"):
+            list(read_csv_chunks(path, chunk_size=10))
+
+    def test_parquet_chunks_skip_row_groups(self, tmp_path):
+        """Test that a row offset resumes mid row group and yields the same rows"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        rows = make_series(30)
+        table = pa.table({
+            "date": pa.array([FIRST_DAY + timedelta(days=i) for i in range(30)], pa.timestamp("us")),
+            "close": pa.array([float(row["close_price"]) for row in rows]),
+            "volume": pa.array([float(row["volume"]) for row in rows]),
+        })
+        path = tmp_path / "bars.parquet"
+        pq.write_table(table, path, row_group_size=8)
+
+        full = [row for chunk in read_parquet_chunks(path, chunk_size=5) for row in chunk.rows]
+        resumed = list(read_parquet_chunks(path, chunk_size=5, offset=19))
+
+        assert len(full) == 30
+        assert [row for chunk in resumed for row in chunk.rows] == full[19:]
+        assert resumed[-1].offset == 30
+
+    def test_parquet_null_dates_are_invalid(self, tmp_path):
+        """Test that null dates are counted as invalid and calendar dates are accepted"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        table = pa.table({
+            "date": pa.array([FIRST_DAY.date(), None, (FIRST_DAY + timedelta(days=2)).date()], pa.date32()),
+            "close": pa.array([42000.0, 42001.0, 42002.0]),
+            "volume": pa.array([1.0, 2.0, 3.0]),
+        })
+        path = tmp_path / "bars.parquet"
+        pq.write_table(table, path)
+
+        [chunk] = read_parquet_chunks(path, chunk_size=10)
+
+        assert [row[0] for row in chunk.rows] == [FIRST_DAY, FIRST_DAY + timedelta(days=2)]
+        assert chunk.invalid == 1
+
+
+class TestBackfill:
+    """Test loading files into the database"""
+
+    def test_loads_and_skips_existing(self, db_session_factory, bars_csv, stored_count):
+        """Test that a second load leaves stored bars untouched"""
+        with db_session_factory() as db:
+            first = backfill(db, bars_csv, chunk_size=10)
+            second = backfill(db, bars_csv, chunk_size=10)
+
+        assert (first.inserted, first.updated, first.unchanged, first.chunks) == (25, 0, 0, 3)
+        assert (second.inserted, second.updated, second.unchanged) == (0, 0, 25)
+        assert first.summary()["rows_per_second"] > 0
+        assert stored_count() == 25
+
+    def test_update_existing_overwrites_changed_bars(self, db_session_factory, bars_csv, tmp_path):
+        """Test that only bars whose values differ are updated"""
+        with db_session_factory() as db:
+            backfill(db, bars_csv)
+        changed = tmp_path / "changed.csv"
+        changed.write_text(
+            "date,close,volume\n"
+            f"{FIRST_DAY.isoformat()},1.0,2.0\n"
+            f"{(FIRST_DAY + timedelta(days=100)).isoformat()},3.0,4.0\n"
+            f"{(FIRST_DAY + timedelta(days=100)).isoformat()},5.0,6.0\n"
+        )
+
+        with db_session_factory() as db:
+            skipped = backfill(db, changed)
+            result = backfill(db, changed, update_existing=True)
+            stored = db.scalar(select(BTCData).where(BTCData.date == FIRST_DAY))
+            added = db.scalar(select(BTCData).where(BTCData.date == FIRST_DAY + timedelta(days=100)))
+
+        assert (skipped.inserted, skipped.updated) == (1, 0)
+        assert (result.inserted, result.updated, result.unchanged) == (0, 1, 2)
+        assert (stored.close_price, stored.volume) == (1.0, 2.0)
+        # The last row for a repeated date wins
+        assert (added.close_price, added.volume) == (5.0, 6.0)
+
+    def test_keeps_ohlc_and_refreshes_candles(self, db_session_factory, tmp_path):
+        """Test that open/high/low are stored and touched candles are built per chunk"""
+        from api.models.btc_models import BTCCandle
+
+        path = tmp_path / "ohlc.csv"
+        path.write_text(
+            "date,open,high,low,close,volume\n"
+            "2024-01-01,10,12,9,11,1\n"
+            "2024-01-02,11,15,10.5,14,2\n"
+            "2024-01-08,,,,13.5,4\n"
+        )
+
+        with db_session_factory() as db:
+            backfill(db, path, chunk_size=2, candle_intervals=["1w"])
+            bar = db.scalar(select(BTCData).where(BTCData.date == FIRST_DAY))
+            candles = db.scalars(select(BTCCandle).order_by(BTCCandle.date)).all()
+
+        assert (bar.open_price, bar.high_price, bar.low_price) == (10.0, 12.0, 9.0)
+        assert [(c.open_price, c.high_price, c.low_price, c.close_price, c.bar_count) for c in candles] == [
+            (10.0, 15.0, 9.0, 14.0, 2),
+            (13.5, 13.5, 13.5, 13.5, 1),
+        ]
+
+    def test_interrupted_load_resumes_from_checkpoint(self, db_session_factory, bars_csv, tmp_path, stored_count):
+        """Test that committed chunks are recorded and a resumed load finishes the file"""
+        checkpoint = tmp_path / "bars.csv.checkpoint"
+
+        def interrupt(progress):
+            if progress.chunks == 2:
+                raise KeyboardInterrupt
+
+        with db_session_factory() as db, pytest.raises(KeyboardInterrupt):
+            backfill(db, bars_csv, chunk_size=10, checkpoint=checkpoint, on_progress=interrupt)
+        offset = resume_offset(checkpoint, bars_csv)
+        assert stored_count() == 20
+
+        with db_session_factory() as db:
+            result = backfill(db, bars_csv, chunk_size=10, offset=offset, checkpoint=checkpoint)
+
+        assert (result.rows_read, result.inserted) == (5, 5)
+        assert stored_count() == 25
+        assert not checkpoint.exists()
+
+    def test_checkpoint_for_other_file_is_rejected(self, bars_csv, tmp_path):
+        checkpoint = tmp_path / "other.checkpoint"
+        checkpoint.write_text(json.dumps({"source": str(tmp_path / "other.csv"), "offset": 10}))
+
+        with pytest.raises(ValueError, match="belongs to"):
+            resume_offset(checkpoint, bars_csv)
+        assert resume_offset(tmp_path / "missing.checkpoint", bars_csv) == 0
+
+    def test_unsupported_format(self, db_session_factory, tmp_path):
+        with db_session_factory() as db, pytest.raises(ValueError, match="Unsupported file format"):
+            backfill(db, tmp_path / "bars.json")
+
+
+class TestBackfillCli:
+    """Test the command-line entry point"""
+
+    def test_prints_summary_and_rebuilds_analysis(self, tmp_path, capsys):
+        """Test a full CLI run against a fresh SQLite database"""
+        database_url = f"sqlite:///{tmp_path / 'cli.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        path = tmp_path / "bars.csv"
+        write_csv(path, 40)
+
+        assert main([str(path), "--database-url", database_url, "--chunk-size", "16", "--analyze"]) == 0
+
+        captured = capsys.readouterr()
+        summary = json.loads(captured.out)
+        assert summary["inserted"] == 40
+        assert summary["chunks"] == 3
+        assert summary["analysis"]["records_added"] > 0
+        assert "rows/s" in captured.err
+        with Session(engine) as db:
+            assert db.scalar(select(func.count()).select_from(VolumeAnalysis)) == summary["analysis"]["records_added"]
+        engine.dispose()
@@ -0,0 +1,81 @@
+"""
+Smoke tests for the analyzer benchmark suite.
+
+Test Structure:
+- TestSyntheticSeries: Deterministic data generator tests
+- TestBenchmarkRunner: Benchmark case and baseline comparison tests
+- TestSerializationBenchmark: ORM vs column-tuple serialization tests
+
+Usage:
+    pytest tests/test_benchmarks.py
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_volume_analyzer import case_key, compare_to_baseline, run_case
+from benchmarks.synthetic import SCENARIOS, generate_series
+
+
+class TestSyntheticSeries:
+    """Test deterministic synthetic price/volume series"""
+
+    @pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+    def test_series_is_deterministic(self, scenario):
+        """Test that the same seed reproduces the same bars"""
+        pd.testing.assert_frame_equal(generate_series(scenario, 500, seed=3), generate_series(scenario, 500, seed=3))
+
+    def test_gaps_contain_missing_and_zero_volume(self):
+        """Test that the gaps scenario exercises NaN and zero-volume handling"""
+        df = generate_series("gaps", 2_000)
+
+        assert df["close_price"].isna().any()
+        assert df["volume"].isna().any()
+        assert (df["volume"] == 0).any()
+
+    def test_unknown_scenario(self):
+        with pytest.raises(ValueError):
+            generate_series("sideways_forever", 10)
+
+
+class TestBenchmarkRunner:
+    """Test benchmark measurement and regression detection"""
+
+    def test_run_case_reports_metrics(self):
+        """Test throughput, memory and stage metrics for a small case"""
+        case = run_case("random_walk", 1_000, 14, repeat=1)
+
+        assert case["results"] == 993
+        assert case["bars_per_second"] > 0
+        assert case["peak_memory_mb"] > 0
+        assert set(case["stages"]) == {"dataframe_build", "pct_change", "windows", "classification"}
+
+    def test_compare_to_baseline(self):
+        """Test that throughput drops and memory growth beyond tolerance are reported"""
+        key = case_key("random_walk", 1_000, 14)
+        baseline = {"cases": {key: {"bars_per_second": 1_000_000, "peak_memory_mb": 10.0}}}
+
+        within = {key: {"bars_per_second": 800_000, "peak_memory_mb": 12.0}}
+        slower = {key: {"bars_per_second": 500_000, "peak_memory_mb": 20.0}}
+
+        assert compare_to_baseline(within, baseline, tolerance=0.3) == []
+        assert len(compare_to_baseline(slower, baseline, tolerance=0.3)) == 2
+        assert compare_to_baseline({"other": slower[key]}, baseline, tolerance=0.3) == []
+
+
+class TestSerializationBenchmark:
+    """Test that the list endpoint fast path matches response_model output"""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_paths_produce_identical_bytes(self, monkeypatch, use_orjson):
+        """Test byte-identical bodies with orjson and with the json fallback"""
+        from api.core import serialization
+        from benchmarks.bench_serialization import run_case
+
+        if not use_orjson:
+            monkeypatch.setattr(serialization, "_orjson_dumps", None)
+
+        case = run_case(200, repeat=1)
+
+        assert case["identical"] is True
+        assert case["speedup"] > 0
@@ -6,12 +6,18 @@ Test Structure:
 - TestBTCDataFetching: Alpha Vantage integration tests
 - TestBTCDataStorage: Database operations tests
 - TestBTCDataValidation: Data validation and error handling tests
+- TestBulkIngestion: Bulk /btc/fetch-data ingestion tests
+- TestAlphaVantageParsing: Columnar payload parsing tests
+- TestBTCStats: Single-query cached /btc/stats tests
+- TestHistoryPagination: Cursor paging of /btc/history
+- TestHistoryExport: Streaming NDJSON/CSV /btc/export tests
+- TestColumnarExport: Arrow IPC and Parquet /btc/export tests
 
 Usage:
     pytest tests/test_btc_api.py
 """
 
-
+import pytest
 
 
 class TestBTCEndpoints:
@@ -88,3 +94,369 @@ class TestBTCDataValidation:
         """Test data type validation for price and volume"""
         # TODO: Implement test for data type validation
         pass
+
+
+class TestBulkIngestion:
+    """Test bulk storage of fetched bars"""
+
+    @pytest.fixture
+    def stub_service(self, monkeypatch, sample_btc_data):
+        """Alpha Vantage service returning sample_btc_data without network access"""
+        from api.core.config import get_settings
+        from api.services import pipelines
+        from api.services.alpha_vantage import AlphaVantageService
+
+        class StubService(AlphaVantageService):
+            def __init__(self):
+                # Tests change raw_data between fetches, so nothing is reused
+                super().__init__(get_settings().model_copy(update={"alpha_vantage_fresh_seconds": 0}))
+                self.raw_data = sample_btc_data
+
+            async def fetch_btc_daily_data(self):
+                return self.raw_data
+
+        service = StubService()
+        monkeypatch.setattr(pipelines, "get_alpha_vantage_service", lambda: service)
+        return service
+
+    @pytest.mark.usefixtures("stub_service")
+    def test_fetch_reports_counts_and_timings(self, api_client):
+        """Test first fetch inserts everything and a repeat fetch inserts nothing"""
+        first = api_client.post("/btc/fetch-data").json()
+        second = api_client.post("/btc/fetch-data").json()
+
+        assert first["records_added"] == 2
+        assert second["records_added"] == 0
+        assert second["records_skipped"] == 2
+        assert set(first["timings"]) == {"fetch_seconds", "parse_seconds", "store_seconds"}
+
+    def test_update_existing_changed_bars(self, api_client, stub_service, db_session_factory):
+        """Test that changed bars are only updated when requested"""
+        from api.models.btc_models import BTCData
+
+        api_client.post("/btc/fetch-data")
+        stub_service.raw_data["Time Series (Digital Currency Daily)"]["2025-05-26"]["4. close"] = "110000.0"
+
+        skipped = api_client.post("/btc/fetch-data").json()
+        updated = api_client.post("/btc/fetch-data", params={"update_existing": True}).json()
+
+        assert skipped["records_updated"] == 0
+        assert skipped["records_skipped"] == 2
+        assert updated["records_updated"] == 1
+        assert updated["records_unchanged"] == 1
+        with db_session_factory() as db:
+            assert db.query(BTCData).order_by(BTCData.date.desc()).first().close_price == 110000.0
+
+    def test_ingest_in_batches(self, db_session_factory):
+        """Test that multi-row batches insert every new bar once"""
+        from api.models.btc_models import BTCData
+        from api.services.persistence import ingest_btc_data
+        from tests.helpers import make_series
+
+        rows = [
+            {"date": row["date"].to_pydatetime(), "close_price": row["close_price"], "volume": row["volume"]}
+            for row in make_series(95, seed=41)
+        ]
+        with db_session_factory() as db:
+            ingest_btc_data(db, rows[:40])
+            counts = ingest_btc_data(db, rows, batch_size=20)
+            db.commit()
+
+            assert counts == {"inserted": 55, "updated": 0, "unchanged": 40}
+            assert db.query(BTCData).count() == 95
+
+
+class TestAlphaVantageParsing:
+    """Test AlphaVantageService payload parsing"""
+
+    @pytest.fixture
+    def service(self):
+        from api.services.alpha_vantage import AlphaVantageService
+
+        return AlphaVantageService.__new__(AlphaVantageService)
+
+    def test_columns_sorted_ascending(self, service, sample_btc_data):
+        """Test dates, closes and volumes come out oldest first"""
+        import numpy as np
+
+        columns = service.parse_btc_columns(sample_btc_data)
+
+        assert columns.date.dtype == np.dtype("datetime64[ns]")
+        assert columns.date.tolist() == np.array(["2025-05-25", "2025-05-26"], dtype="datetime64[ns]").tolist()
+        assert columns.close_price.tolist() == [108000.0, 108992.36]
+        assert columns.volume.tolist() == [82.12345678, 75.94580137]
+
+    def test_unordered_payload(self, service, sample_btc_data):
+        """Test that payloads not listed newest first are still sorted"""
+        series = sample_btc_data["Time Series (Digital Currency Daily)"]
+        sample_btc_data["Time Series (Digital Currency Daily)"] = {
+            "2025-05-25": series["2025-05-25"],
+            "2025-05-20": series["2025-05-25"],
+            "2025-05-26": series["2025-05-26"],
+        }
+
+        rows = service.parse_btc_data(sample_btc_data)
+
+        assert [row["date"].day for row in rows] == [20, 25, 26]
+
+    def test_since_drops_stored_days(self, service, sample_btc_data):
+        """Test that days on or before since are dropped"""
+        from datetime import datetime
+
+        rows = service.parse_btc_data(sample_btc_data, since=datetime(2025, 5, 25))
+
+        assert [row["date"] for row in rows] == [datetime(2025, 5, 26)]
+
+    def test_matches_row_parser(self, service, sample_btc_data):
+        """Test row output in BTCData column format, including open/high/low"""
+        from datetime import datetime
+
+        rows = service.parse_btc_data(sample_btc_data)
+
+        assert rows[0] == {
+            "date": datetime(2025, 5, 25), "close_price": 108000.0, "volume": 82.12345678,
+            "open_price": 107794.01, "high_price": 108200.0, "low_price": 107500.0
+        }
+        assert all(type(row["close_price"]) is float for row in rows)
+
+    def test_missing_open_high_low(self, service, sample_btc_data):
+        """Test that entries with only close and volume parse with null open/high/low"""
+        from datetime import datetime
+
+        series = sample_btc_data["Time Series (Digital Currency Daily)"]
+        series["2025-05-25"] = {"4. close": "108000.00000000", "5. volume": "82.12345678"}
+        del series["2025-05-26"]["2. high"]
+
+        rows = service.parse_btc_data(sample_btc_data)
+
+        assert rows == [
+            {
+                "date": datetime(2025, 5, 25), "close_price": 108000.0, "volume": 82.12345678,
+                "open_price": None, "high_price": None, "low_price": None
+            },
+            {
+                "date": datetime(2025, 5, 26), "close_price": 108992.36, "volume": 75.94580137,
+                "open_price": 109048.41, "high_price": None, "low_price": 108706.04
+            },
+        ]
+
+    def test_missing_close_is_rejected(self, service, sample_btc_data):
+        """Test that close and volume stay required"""
+        del sample_btc_data["Time Series (Digital Currency Daily)"]["2025-05-26"]["4. close"]
+
+        with pytest.raises(KeyError):
+            service.parse_btc_columns(sample_btc_data)
+
+    def test_invalid_payload(self, service):
+        """Test that payloads without a time series are rejected"""
+        with pytest.raises(ValueError):
+            service.parse_btc_columns({"Note": "API call frequency exceeded"})
+
+
+class TestBTCStats:
+    """Test /btc/stats aggregation and caching"""
+
+    def test_stats_values(self, api_client, seed_btc_history):
+        """Test count, date range and latest price"""
+        rows = seed_btc_history(50)
+
+        body = api_client.get("/btc/stats").json()
+
+        assert body == {
+            "total_records": 50,
+            "latest_date": rows[-1]["date"].isoformat(),
+            "oldest_date": rows[0]["date"].isoformat(),
+            "latest_price": pytest.approx(rows[-1]["close_price"]),
+            "date_range_days": 49
+        }
+
+    def test_empty_table(self, api_client):
+        """Test the no-data response"""
+        assert api_client.get("/btc/stats").json() == {"message": "No data available", "total_records": 0}
+
+    def test_cached_until_ingest(self, api_client, seed_btc_history, monkeypatch, sample_btc_data):
+        """Test that stats are cached and refreshed after /btc/fetch-data"""
+        from api.services import pipelines
+        from api.services.alpha_vantage import AlphaVantageService
+
+        class StubService(AlphaVantageService):
+            async def fetch_btc_daily_data(self):
+                return sample_btc_data
+
+        monkeypatch.setattr(pipelines, "get_alpha_vantage_service", StubService)
+        seed_btc_history(30)
+        assert api_client.get("/btc/stats").json()["total_records"] == 30
+
+        seed_btc_history(40, start=30, seed=1)
+        cached = api_client.get("/btc/stats")
+        api_client.post("/btc/fetch-data")
+        refreshed = api_client.get("/btc/stats").json()
+
+        assert cached.headers["X-Cache"] == "HIT"
+        assert cached.json()["total_records"] == 30
+        assert refreshed["total_records"] == 42
+        assert refreshed["latest_date"] == "2025-05-26T00:00:00"
+
+    def test_approximate_count_falls_back_outside_postgresql(self, api_client, seed_btc_history):
+        """Test that SQLite reports an exact count"""
+        seed_btc_history(20)
+
+        body = api_client.get("/btc/stats", params={"approximate_count": True}).json()
+
+        assert body["total_records"] == 20
+        assert "approximate_count" not in body
+
+
+class TestHistoryPagination:
+    """Test keyset paging of /btc/history"""
+
+    def test_pages_cover_history_newest_first(self, api_client, seed_btc_history):
+        """Test that pages follow each other without gaps or overlap"""
+        rows = seed_btc_history(50)
+        first = api_client.get("/btc/history", params={"limit": 30, "days_back": 100_000})
+        second = api_client.get("/btc/history", params={
+            "limit": 30, "days_back": 100_000, "cursor": first.headers["X-Next-Cursor"]
+        })
+
+        dates = [row["date"] for row in first.json() + second.json()]
+        assert dates == [row["date"].isoformat() for row in reversed(rows)]
+        assert len(first.json()) == 30
+        assert "X-Next-Cursor" not in second.headers
+        assert "Link" not in second.headers
+
+    def test_new_bars_do_not_shift_pages(self, api_client, seed_btc_history):
+        """Test that rows inserted after the first page do not repeat on the next"""
+        rows = seed_btc_history(40, stop=30)
+        first = api_client.get("/btc/history", params={"limit": 10, "days_back": 100_000})
+        seed_btc_history(40, start=30)
+        second = api_client.get("/btc/history", params={
+            "limit": 10, "days_back": 100_000, "cursor": first.headers["X-Next-Cursor"]
+        })
+
+        assert [row["date"] for row in second.json()] == [row["date"].isoformat() for row in rows[19:9:-1]]
+
+    def test_invalid_cursor(self, api_client, seed_btc_history):
+        """Test 400 for a malformed cursor"""
+        seed_btc_history(10)
+
+        assert api_client.get("/btc/history", params={"cursor": "%%%"}).status_code == 400
+
+
+class TestHistoryExport:
+    """Test streaming /btc/export"""
+
+    def test_ndjson(self, api_client, seed_btc_history):
+        """Test one JSON object per bar, oldest first"""
+        import json
+
+        rows = seed_btc_history(25)
+
+        response = api_client.get("/btc/export")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [line["date"] for line in lines] == [row["date"].isoformat() for row in rows]
+        assert lines[0]["close_price"] == pytest.approx(rows[0]["close_price"])
+
+    def test_csv_with_range(self, api_client, seed_btc_history):
+        """Test CSV header and the inclusive start/end filter"""
+        import csv
+        import io
+
+        rows = seed_btc_history(25)
+
+        response = api_client.get("/btc/export", params={
+            "format": "csv", "start": rows[5]["date"].isoformat(), "end": rows[9]["date"].isoformat()
+        })
+
+        records = list(csv.DictReader(io.StringIO(response.text)))
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "btc_history.csv" in response.headers["content-disposition"]
+        assert [record["date"] for record in records] == [row["date"].isoformat() for row in rows[5:10]]
+        assert float(records[0]["volume"]) == pytest.approx(rows[5]["volume"])
+
+    def test_streams_in_chunks(self, db_session_factory, seed_btc_history):
+        """Test that rows are formatted one cursor chunk at a time"""
+        from api.services.export import stream_btc_history
+
+        seed_btc_history(25)
+
+        with db_session_factory() as db:
+            chunks = list(stream_btc_history(db, "ndjson", chunk_size=10))
+
+        assert [chunk.count(b"\n") for chunk in chunks] == [10, 10, 5]
+
+    def test_unknown_format(self, api_client):
+        """Test 422 for formats other than ndjson and csv"""
+        assert api_client.get("/btc/export", params={"format": "xml"}).status_code == 422
+
+
+class TestColumnarExport:
+    """Test Arrow IPC stream and Parquet bodies of /btc/export"""
+
+    @pytest.fixture
+    def pa(self):
+        return pytest.importorskip("pyarrow")
+
+    @pytest.fixture
+    def small_chunks(self, monkeypatch):
+        from api.core.config import get_settings
+
+        monkeypatch.setattr(get_settings(), "export_chunk_size", 16)
+
+    @pytest.mark.usefixtures("small_chunks")
+    def test_arrow_stream(self, api_client, seed_btc_history, pa):
+        """Test schema, values and one record batch per cursor chunk"""
+        rows = seed_btc_history(40)
+
+        response = api_client.get("/btc/export", params={"format": "arrow"})
+
+        reader = pa.ipc.open_stream(response.content)
+        batches = list(reader)
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        assert table.column_names == ["date", "close_price", "volume"]
+        assert [batch.num_rows for batch in batches] == [16, 16, 8]
+        assert table.column("date").to_pylist() == [row["date"].to_pydatetime() for row in rows]
+        assert table.column("volume").to_pylist() == pytest.approx([row["volume"] for row in rows])
+
+    @pytest.mark.usefixtures("small_chunks")
+    def test_parquet_joined_with_analysis(self, api_client, seed_btc_history, db_session_factory, pa):
+        """Test that analysis columns match stored results and are null before the first result"""
+        import io
+
+        import pyarrow.parquet as pq
+
+        from api.models.btc_models import VolumeAnalysis
+
+        seed_btc_history(60)
+        api_client.post("/analysis/run-volume-analysis", params={"lookback_period": 21})
+
+        response = api_client.get("/btc/export", params={
+            "format": "parquet", "with_analysis": True, "lookback_period": 21
+        })
+
+        parquet = pq.ParquetFile(io.BytesIO(response.content))
+        table = parquet.read()
+        with db_session_factory() as db:
+            stored = {
+                row.date: row for row in db.query(VolumeAnalysis).filter(VolumeAnalysis.lookback_period == 21)
+            }
+        assert parquet.metadata.num_row_groups == 4
+        assert table.num_rows == 60
+        assert pa.types.is_dictionary(table.schema.field("trend_direction").type)
+        for record in table.to_pylist():
+            analysis = stored.get(record["date"])
+            assert record["trend_direction"] == (analysis.trend_direction if analysis else None)
+            assert record["strength_score"] == (analysis.strength_score if analysis else None)
+        assert table.column("strength_score").null_count == 60 - len(stored)
+
+    def test_empty_range(self, api_client, seed_btc_history, pa):
+        """Test a valid, empty Arrow stream when no bars are in range"""
+        seed_btc_history(10)
+
+        response = api_client.get("/btc/export", params={"format": "arrow", "start": "2030-01-01T00:00:00"})
+
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == 0
+        assert table.column_names == ["date", "close_price", "volume"]
@@ -0,0 +1,292 @@
+"""
+Tests for OHLCV candle rollups.
+
+Test Structure:
+- TestBuckets: Bucket starts, ends and merged ranges per interval
+- TestAggregation: OHLCV aggregation of sorted bars
+- TestIncrementalRollups: Refreshing only touched buckets on ingest, and full rebuilds
+- TestCandlesEndpoint: /btc/candles response tests
+
+Usage:
+    pytest tests/test_candles.py
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from api.core.config import get_settings
+from api.core.database import Base
+from api.models.btc_models import BTCCandle, BTCData
+from api.services.candles import (
+    aggregate_candles,
+    bucket_ranges,
+    bucket_start,
+    main,
+    next_bucket,
+)
+from api.services.persistence import ingest_btc_data, rebuild_candles, refresh_candles
+from tests.helpers import make_series
+
+
+def ohlc_rows(n, seed=0, first_day=datetime(2024, 1, 1)):
+    """Daily bars with open/high/low around the close of make_series"""
+    return [
+        {
+            "date": first_day + timedelta(days=i),
+            "close_price": float(row["close_price"]),
+            "volume": float(row["volume"]),
+            "open_price": float(row["close_price"]) - 1.0,
+            "high_price": float(row["close_price"]) + 2.0,
+            "low_price": float(row["close_price"]) - 3.0,
+        }
+        for i, row in enumerate(make_series(n, seed=seed))
+    ]
+
+
+def resampled(rows, rule):
+    """Reference candles computed by pandas from raw bars"""
+    frame = pd.DataFrame(rows).set_index("date")
+    aggregated = frame.resample(rule, label="left", closed="left").agg({
+        "open_price": "first", "high_price": "max", "low_price": "min", "close_price": "last", "volume": "sum"
+    }).dropna()
+    return {
+        index.to_pydatetime(): (row.open_price, row.high_price, row.low_price, row.close_price, pytest.approx(row.volume))
+        for index, row in aggregated.iterrows()
+    }
+
+
+def stored_candles(db, interval):
+    return {
+        candle.date: (candle.open_price, candle.high_price, candle.low_price, candle.close_price, candle.volume)
+        for candle in db.scalars(select(BTCCandle).where(BTCCandle.interval == interval))
+    }
+
+
+class TestBuckets:
+    """Test interval bucket boundaries"""
+
+    @pytest.mark.parametrize(("interval", "moment", "start", "end"), [
+        ("1h", datetime(2024, 3, 5, 14, 37, 12), datetime(2024, 3, 5, 14), datetime(2024, 3, 5, 15)),
+        ("1d", datetime(2024, 3, 5, 14, 37), datetime(2024, 3, 5), datetime(2024, 3, 6)),
+        ("1w", datetime(2024, 3, 7, 9), datetime(2024, 3, 4), datetime(2024, 3, 11)),
+        ("1w", datetime(2024, 3, 4), datetime(2024, 3, 4), datetime(2024, 3, 11)),
+        ("1M", datetime(2024, 3, 31, 23, 59), datetime(2024, 3, 1), datetime(2024, 4, 1)),
+        ("1M", datetime(2023, 12, 15), datetime(2023, 12, 1), datetime(2024, 1, 1)),
+    ])
+    def test_bucket_boundaries(self, interval, moment, start, end):
+        assert bucket_start(interval, moment) == start
+        assert next_bucket(interval, start) == end
+
+    def test_adjacent_buckets_share_a_range(self):
+        """Test that touched buckets next to each other are read with one query"""
+        dates = [datetime(2024, 1, 3), datetime(2024, 1, 9), datetime(2024, 1, 10), datetime(2024, 2, 20)]
+
+        assert bucket_ranges("1w", dates) == [
+            (datetime(2024, 1, 1), datetime(2024, 1, 15)),
+            (datetime(2024, 2, 19), datetime(2024, 2, 26)),
+        ]
+
+    def test_unknown_interval(self):
+        with pytest.raises(ValueError, match="Unsupported candle interval"):
+            bucket_start("5m", datetime(2024, 1, 1))
+
+    def test_unknown_configured_interval(self):
+        """Test that a misspelled CANDLE_INTERVALS entry fails when settings load"""
+        from pydantic import ValidationError
+
+        from api.core.config import Settings
+
+        with pytest.raises(ValidationError, match="Unsupported candle intervals: 1W"):
+            Settings.model_validate({**get_settings().model_dump(), "candle_intervals": ["1w", "1W"]})
+
+
+class TestAggregation:
+    """Test aggregate_candles"""
+
+    def test_ohlcv_per_bucket(self):
+        bars = [
+            (datetime(2024, 1, 1), 10.0, 12.0, 9.0, 11.0, 1.0),
+            (datetime(2024, 1, 2), 11.0, 15.0, 10.5, 14.0, 2.0),
+            (datetime(2024, 1, 8), 14.0, 14.5, 13.0, 13.5, 4.0),
+        ]
+
+        candles = aggregate_candles("1w", bars)
+
+        assert [(c["date"], c["open_price"], c["high_price"], c["low_price"], c["close_price"]) for c in candles] == [
+            (datetime(2024, 1, 1), 10.0, 15.0, 9.0, 14.0),
+            (datetime(2024, 1, 8), 14.0, 14.5, 13.0, 13.5),
+        ]
+        assert [(c["volume"], c["bar_count"]) for c in candles] == [(3.0, 2), (4.0, 1)]
+
+    def test_bars_without_ohlc_use_close(self):
+        """Test that bars stored before OHLC was kept contribute their close"""
+        bars = [
+            (datetime(2024, 1, 1), None, None, None, 11.0, 1.0),
+            (datetime(2024, 1, 2), 11.0, 15.0, 10.5, 14.0, 2.0),
+        ]
+
+        [candle] = aggregate_candles("1M", bars)
+
+        assert (candle["open_price"], candle["high_price"], candle["low_price"]) == (11.0, 15.0, 10.5)
+
+
+class TestIncrementalRollups:
+    """Test candle maintenance on ingest"""
+
+    @pytest.mark.parametrize(("interval", "rule"), [("1w", "W-MON"), ("1M", "MS"), ("1d", "D")])
+    def test_ingest_matches_resampled_bars(self, db_session_factory, interval, rule):
+        """Test candles built across several ingests equal a resample of all bars"""
+        rows = ohlc_rows(120)
+        with db_session_factory() as db:
+            for start in range(0, 120, 25):
+                ingest_btc_data(db, rows[start:start + 25], candle_intervals=[interval])
+            db.commit()
+
+            assert stored_candles(db, interval) == resampled(rows, rule)
+
+    def test_only_touched_buckets_are_rewritten(self, db_session_factory):
+        """Test that new bars rewrite their own month and leave earlier months alone"""
+        rows = ohlc_rows(90)
+        with db_session_factory() as db:
+            ingest_btc_data(db, rows[:80], candle_intervals=["1M"])
+            db.commit()
+            db.execute(BTCCandle.__table__.update().values(updated_at=datetime(2000, 1, 1)))
+            db.commit()
+
+            ingest_btc_data(db, rows[80:], candle_intervals=["1M"])
+            db.commit()
+            touched = {
+                candle.date for candle in db.scalars(select(BTCCandle)) if candle.updated_at != datetime(2000, 1, 1)
+            }
+
+        assert touched == {datetime(2024, 3, 1)}
+
+    def test_updated_bars_refresh_their_bucket(self, db_session_factory):
+        """Test that a corrected bar is reflected in its candle"""
+        rows = ohlc_rows(30)
+        with db_session_factory() as db:
+            ingest_btc_data(db, rows, candle_intervals=["1w"])
+            corrected = {**rows[3], "high_price": 1_000_000.0}
+            ingest_btc_data(db, [corrected], candle_intervals=["1w"])
+            skipped_high = stored_candles(db, "1w")[datetime(2024, 1, 1)][1]
+            ingest_btc_data(db, [corrected], update_changed=True, candle_intervals=["1w"])
+            db.commit()
+
+            assert skipped_high < 1_000_000.0
+            assert stored_candles(db, "1w")[datetime(2024, 1, 1)][1] == 1_000_000.0
+
+    def test_rebuild_matches_incremental(self, db_session_factory):
+        """Test that a full rebuild reproduces incrementally maintained candles"""
+        rows = ohlc_rows(100)
+        with db_session_factory() as db:
+            ingest_btc_data(db, rows, candle_intervals=["1w"])
+            db.commit()
+            incremental = stored_candles(db, "1w")
+            db.execute(BTCCandle.__table__.update().values(high_price=0.0))
+
+            written = rebuild_candles(db, ["1w"])
+            db.commit()
+
+            assert written == {"1w": len(incremental)}
+            assert stored_candles(db, "1w") == incremental
+
+    def test_refresh_without_dates_writes_nothing(self, db_session_factory):
+        with db_session_factory() as db:
+            assert refresh_candles(db, [], ["1w"]) == 0
+
+    def test_rebuild_cli(self, tmp_path, capsys):
+        """Test python -m api.services.candles against a fresh database"""
+        database_url = f"sqlite:///{tmp_path / 'candles.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add_all(BTCData(**row) for row in ohlc_rows(40))
+            db.commit()
+
+        assert main(["--database-url", database_url, "--interval", "1M"]) == 0
+
+        assert json.loads(capsys.readouterr().out) == {"1M": 2}
+        engine.dispose()
+
+
+class TestCandlesEndpoint:
+    """Test /btc/candles"""
+
+    @pytest.fixture
+    def stub_service(self, monkeypatch):
+        """Alpha Vantage service serving 60 days ending today"""
+        from api.services import pipelines
+        from api.services.alpha_vantage import AlphaVantageService
+        from tests.test_scheduler import daily_payload
+
+        class StubService(AlphaVantageService):
+            def __init__(self):
+                super().__init__(get_settings().model_copy(update={"alpha_vantage_fresh_seconds": 0}))
+                self.raw_data = daily_payload(60)
+
+            async def fetch_btc_daily_data(self):
+                return self.raw_data
+
+        service = StubService()
+        monkeypatch.setattr(pipelines, "get_alpha_vantage_service", lambda: service)
+        return service
+
+    @pytest.mark.usefixtures("stub_service")
+    def test_fetch_maintains_candles(self, api_client):
+        """Test that fetched bars are served as weekly candles, newest first"""
+        api_client.post("/btc/fetch-data")
+
+        candles = api_client.get("/btc/candles", params={"interval": "1w"}).json()
+
+        assert sum(candle["bar_count"] for candle in candles) == 60
+        assert [candle["date"] for candle in candles] == sorted((candle["date"] for candle in candles), reverse=True)
+        assert set(candles[0]) == {
+            "date", "open_price", "high_price", "low_price", "close_price", "volume", "bar_count"
+        }
+        assert all(candle["low_price"] <= candle["close_price"] <= candle["high_price"] for candle in candles)
+
+    def test_new_bars_invalidate_cached_candles(self, api_client, stub_service):
+        """Test that a fetch adding bars changes the cached candle response"""
+        from tests.test_scheduler import daily_payload
+
+        stub_service.raw_data = daily_payload(30)
+        api_client.post("/btc/fetch-data")
+        before = api_client.get("/btc/candles", params={"interval": "1M"})
+        stub_service.raw_data = daily_payload(30)
+        series = stub_service.raw_data["Time Series (Digital Currency Daily)"]
+        today = max(series)
+        series[today]["2. high"] = "99999999.0"
+        api_client.post("/btc/fetch-data", params={"update_existing": True})
+        after = api_client.get("/btc/candles", params={"interval": "1M"})
+
+        assert after.headers["ETag"] != before.headers["ETag"]
+        assert after.json()[0]["high_price"] == 99999999.0
+
+    @pytest.mark.usefixtures("stub_service")
+    def test_start_and_end_filter_buckets(self, api_client):
+        """Test that start includes the bucket containing it"""
+        api_client.post("/btc/fetch-data")
+        candles = api_client.get("/btc/candles", params={"interval": "1w"}).json()
+        oldest_kept = datetime.fromisoformat(candles[-2]["date"])
+
+        filtered = api_client.get("/btc/candles", params={
+            "interval": "1w",
+            "start": (oldest_kept + timedelta(days=3)).isoformat(),
+            "end": candles[1]["date"]
+        }).json()
+
+        assert [candle["date"] for candle in filtered] == [candle["date"] for candle in candles[1:-1]]
+
+    def test_unsupported_interval(self, api_client):
+        response = api_client.get("/btc/candles", params={"interval": "1h"})
+
+        assert response.status_code == 400
+        assert "1w" in response.json()["detail"]
+
+    def test_no_candles(self, api_client):
+        assert api_client.get("/btc/candles", params={"interval": "1w"}).status_code == 404
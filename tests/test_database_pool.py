@@ -0,0 +1,111 @@
+"""
+Tests for connection pool configuration and metrics.
+
+Test Structure:
+- TestEngineOptions: Pool settings mapping per backend
+- TestInstrumentedPool: Checkout timing and timeout counting
+- TestDatabaseHealthEndpoint: /health/db response tests
+
+Usage:
+    pytest tests/test_database_pool.py
+"""
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from api.core.config import get_settings
+from api.core.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    engine_options,
+    pool_status,
+)
+
+
+class TestEngineOptions:
+    """Test engine_options for each backend"""
+
+    def test_postgresql_sync(self):
+        """Test pool knobs and the psycopg2 connect timeout"""
+        settings = get_settings().model_copy(update={"db_pool_size": 7, "db_max_overflow": 3})
+
+        options = engine_options("postgresql://user:pass@db:5432/quant", settings)
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["pool_pre_ping"] is True
+        assert options["connect_args"] == {"connect_timeout": settings.db_connect_timeout}
+
+    def test_postgresql_async(self):
+        """Test the async pool class and the asyncpg connect timeout"""
+        settings = get_settings()
+
+        options = engine_options("postgresql+asyncpg://user:pass@db:5432/quant", settings, is_async=True)
+
+        assert options["poolclass"] is InstrumentedAsyncAdaptedQueuePool
+        assert options["connect_args"] == {"timeout": settings.db_connect_timeout}
+
+    @pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:"])
+    def test_in_memory_sqlite_keeps_defaults(self, url):
+        """Test that in-memory SQLite is left to SQLAlchemy's single-connection pool"""
+        assert engine_options(url, get_settings()) == {}
+
+
+class TestInstrumentedPool:
+    """Test checkout metrics against a file-backed SQLite pool"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        settings = get_settings().model_copy(update={
+            "db_pool_size": 1, "db_max_overflow": 0, "db_pool_timeout": 0.05
+        })
+        url = f"sqlite:///{tmp_path / 'pool.db'}"
+        engine = create_engine(url, **engine_options(url, settings))
+        yield engine
+        engine.dispose()
+
+    def test_counts_checkouts_and_timeouts(self, engine):
+        """Test occupancy, waits and timeouts while the only connection is held"""
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            held = pool_status(engine.pool)
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        status = pool_status(engine.pool)
+        assert held["checked_out"] == 1
+        assert held["idle"] == 0
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+        assert status["checkouts"] == 1
+        assert status["timeouts"] == 1
+        assert status["max_wait_ms"] >= 50
+        assert status["peak_checked_out"] == 1
+
+    def test_recreated_pool_stays_instrumented(self, engine):
+        """Test that pool recreation (e.g. after dispose) keeps metrics"""
+        engine.dispose()
+
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert pool_status(engine.pool)["checkouts"] == 0
+
+
+class TestDatabaseHealthEndpoint:
+    """Test /health/db"""
+
+    def test_reports_both_pools(self, api_client, tmp_path, monkeypatch):
+        """Test ping result and pool sections"""
+        from api import main
+
+        url = f"sqlite:///{tmp_path / 'health.db'}"
+        monkeypatch.setattr(main, "engine", create_engine(url, **engine_options(url, get_settings())))
+
+        response = api_client.get("/health/db")
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["database"] == "reachable"
+        assert body["pools"]["sync"]["pool"] == "InstrumentedQueuePool"
+        assert body["pools"]["sync"]["checkouts"] == 1
+        assert body["pools"]["async"]["pool"] == "InstrumentedAsyncAdaptedQueuePool"
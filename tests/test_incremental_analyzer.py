@@ -0,0 +1,129 @@
+"""
+Tests for the streaming IncrementalVolumeAnalyzer.
+
+Test Structure:
+- TestIncrementalEquivalence: Streaming results vs batch VolumeAnalyzer
+- TestIncrementalState: State serialization and resume tests
+
+Usage:
+    pytest tests/test_incremental_analyzer.py
+"""
+
+import json
+import warnings
+from datetime import datetime
+
+import pytest
+
+from calculation.incremental_analyzer import IncrementalVolumeAnalyzer
+from calculation.volume_analyzer import VolumeAnalyzer
+from tests.helpers import assert_results_equivalent, make_series
+
+
+class TestIncrementalEquivalence:
+    """Test that streaming analysis matches the batch analyzer"""
+
+    @pytest.mark.parametrize("lookback_period,min_periods", [(14, 7), (7, 7), (7, 20), (50, 3), (3, 3)])
+    def test_matches_batch_analyzer(self, lookback_period, min_periods):
+        """Test bar-by-bar results against a full batch run"""
+        data = make_series(300, seed=11)
+        streaming = IncrementalVolumeAnalyzer(lookback_period, min_periods)
+
+        assert_results_equivalent(
+            streaming.extend(data),
+            VolumeAnalyzer(lookback_period, min_periods).analyze_volume_price_correlation(data)
+        )
+
+    @pytest.mark.parametrize("lookback_period,min_periods", [(14, 7), (7, 3)])
+    def test_flat_prices(self, lookback_period, min_periods):
+        """Test that windows after a flat stretch are treated as constant, as in the batch run"""
+        data = make_series(300, seed=0, flat_prices=True)
+
+        assert_results_equivalent(
+            IncrementalVolumeAnalyzer(lookback_period, min_periods).extend(data),
+            VolumeAnalyzer(lookback_period, min_periods).analyze_volume_price_correlation(data)
+        )
+
+    def test_nan_gaps_and_zero_volume(self):
+        """Test forward-fill and infinite change handling"""
+        data = make_series(250, seed=12, nan_gaps=True, zero_volume=True)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = VolumeAnalyzer(14, 7).analyze_volume_price_correlation(data)
+            actual = IncrementalVolumeAnalyzer(14, 7).extend(data)
+
+        assert_results_equivalent(actual, expected)
+
+    def test_append_returns_none_during_warmup(self):
+        """Test that no result is emitted before min_periods bars"""
+        data = make_series(8, seed=13)
+        streaming = IncrementalVolumeAnalyzer(14, 7)
+
+        results = [streaming.append(bar["date"], bar["close_price"], bar["volume"]) for bar in data]
+
+        assert results[:7] == [None] * 7
+        assert results[7] is not None
+
+    def test_rejects_out_of_order_bars(self):
+        """Test that bars must be appended in date order"""
+        streaming = IncrementalVolumeAnalyzer()
+        streaming.append(datetime(2025, 5, 26), 100.0, 10.0)
+
+        with pytest.raises(ValueError):
+            streaming.append(datetime(2025, 5, 25), 101.0, 11.0)
+
+
+class TestIncrementalState:
+    """Test state serialization and restore"""
+
+    def test_resume_from_serialized_state(self):
+        """Test that a restored analyzer continues exactly like an uninterrupted one"""
+        data = make_series(200, seed=14)
+        uninterrupted = IncrementalVolumeAnalyzer(14, 7)
+        expected = uninterrupted.extend(data)
+
+        first = IncrementalVolumeAnalyzer(14, 7)
+        head = first.extend(data[:123])
+        restored = IncrementalVolumeAnalyzer.from_state(json.loads(json.dumps(first.to_state())))
+        tail = restored.extend(data[123:])
+
+        assert_results_equivalent(head + tail, expected)
+        assert restored.bars_seen == len(data)
+        assert restored.last_date == uninterrupted.last_date
+
+    def test_state_is_strict_json_with_non_finite_values(self):
+        """Test that NaN and infinite changes survive a strict JSON round trip"""
+        data = make_series(60, seed=16, zero_volume=True)
+        data[39]["volume"] = 0.0
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = IncrementalVolumeAnalyzer(14, 7).extend(data)
+
+            first = IncrementalVolumeAnalyzer(14, 7)
+            head = first.extend(data[:41])
+            state = json.loads(json.dumps(first.to_state(), allow_nan=False))
+            restored = IncrementalVolumeAnalyzer.from_state(state)
+            tail = restored.extend(data[41:])
+
+        assert state["volume_change"][-1] == "inf"
+        assert IncrementalVolumeAnalyzer().to_state()["last_close"] is None
+        assert_results_equivalent(head + tail, expected)
+
+    def test_state_is_bounded_by_lookback(self):
+        """Test that serialized window state holds at most lookback_period bars"""
+        streaming = IncrementalVolumeAnalyzer(10, 5)
+        streaming.extend(make_series(500, seed=15))
+
+        state = streaming.to_state()
+
+        assert len(state["close"]) == 10
+        assert state["bars_seen"] == 500
+
+    def test_rejects_unknown_state_version(self):
+        """Test restore validation"""
+        state = IncrementalVolumeAnalyzer().to_state()
+        state["version"] = 999
+
+        with pytest.raises(ValueError):
+            IncrementalVolumeAnalyzer.from_state(state)
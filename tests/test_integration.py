@@ -6,12 +6,20 @@ Test Structure:
 - TestAPIIntegration: Cross-endpoint integration tests
 - TestDatabaseIntegration: Database integration tests
 - TestExternalServiceIntegration: Alpha Vantage integration tests
+- TestEventLoopConcurrency: Reads served while analysis runs
 
 Usage:
     pytest tests/test_integration.py
 """
 
+import asyncio
+import threading
 
+import httpx
+
+from api.main import app
+from api.services import pipelines
+from calculation.volume_analyzer import VolumeAnalyzer
 
 
 class TestFullWorkflow:
@@ -92,3 +100,38 @@ class TestExternalServiceIntegration:
         """Test handling of network failures"""
         # TODO: Implement network failure tests
         pass
+
+
+class TestEventLoopConcurrency:
+    """Test that CPU-bound analysis does not block the event loop"""
+
+    async def test_reads_flow_while_analysis_runs(self, seed_btc_history, monkeypatch):
+        """Test /health and /btc/stats respond while an analysis is held in the CPU executor"""
+        seed_btc_history(60)
+        started = threading.Event()
+        release = threading.Event()
+
+        class BlockingAnalyzer(VolumeAnalyzer):
+            def analyze_volume_price_correlation(self, data, workers=1, chunk_size=None):
+                started.set()
+                # Blocks whichever thread runs the analysis until the test releases it
+                release.wait(10)
+                return super().analyze_volume_price_correlation(data, workers, chunk_size)
+
+        monkeypatch.setattr(pipelines, "get_volume_analyzer", BlockingAnalyzer)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            run = asyncio.create_task(client.post("/analysis/run-volume-analysis"))
+            assert await asyncio.to_thread(started.wait, 5)
+
+            health = await asyncio.wait_for(client.get("/health"), timeout=2)
+            stats = await asyncio.wait_for(client.get("/btc/stats"), timeout=2)
+            assert not run.done()
+
+            release.set()
+            response = await asyncio.wait_for(run, timeout=10)
+
+        assert health.status_code == 200
+        assert stats.json()["total_records"] == 60
+        assert response.status_code == 200
+        assert response.json()["records_added"] > 0
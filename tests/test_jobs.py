@@ -0,0 +1,180 @@
+"""
+Tests for background jobs and the /jobs endpoints.
+
+Test Structure:
+- TestBackgroundJobEndpoints: Submission, polling, deduplication and limits over HTTP
+- TestJobManager: Job bookkeeping tests
+
+Usage:
+    pytest tests/test_jobs.py
+"""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from api.main import app
+from api.services import pipelines
+from api.services.jobs import JobManager, get_job_manager
+from calculation.volume_analyzer import VolumeAnalyzer
+
+
+@pytest.fixture
+async def job_manager(db_session_factory):  # noqa: ARG001 - app overrides must be installed first
+    """Fresh job manager per test; max_cpu_jobs=1 and room for two unfinished jobs"""
+    manager = JobManager(max_pending=2, max_cpu_jobs=1, history_size=10)
+    app.dependency_overrides[get_job_manager] = lambda: manager
+    yield manager
+    await manager.shutdown()
+
+
+@pytest.fixture
+def blocking_analysis(monkeypatch):
+    """Hold every analysis in the CPU executor until release is set"""
+    release = threading.Event()
+
+    class BlockingAnalyzer(VolumeAnalyzer):
+        def analyze_volume_price_correlation(self, data, workers=1, chunk_size=None):
+            release.wait(10)
+            return super().analyze_volume_price_correlation(data, workers, chunk_size)
+
+    monkeypatch.setattr(pipelines, "get_volume_analyzer", BlockingAnalyzer)
+    yield release
+    release.set()
+
+
+async def wait_for_job(client, job_id, statuses=("succeeded", "failed"), timeout=10.0):
+    """Poll /jobs/{id} until the job reaches one of statuses"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        body = (await client.get(f"/jobs/{job_id}")).json()
+        if body["status"] in statuses or asyncio.get_running_loop().time() > deadline:
+            return body
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.usefixtures("job_manager")
+class TestBackgroundJobEndpoints:
+    """Test background=true submission and /jobs/{id} polling"""
+
+    async def test_background_analysis_matches_inline_run(self, seed_btc_history):
+        """Test that a job returns immediately and ends with the inline result"""
+        seed_btc_history(60)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            submitted = await client.post("/analysis/run-volume-analysis", params={"background": True})
+            job = await wait_for_job(client, submitted.json()["job_id"])
+            inline = await client.post("/analysis/run-volume-analysis", params={"full": True})
+
+        assert submitted.status_code == 202
+        assert submitted.json()["status_url"] == f"/jobs/{job['job_id']}"
+        assert job["status"] == "succeeded"
+        assert job["kind"] == "volume_analysis"
+        assert job["result"]["records_added"] == inline.json()["records_added"]
+        assert set(job["timings"]) == {"loading_seconds", "analyzing_seconds", "storing_seconds"}
+        assert job["stage"] is None
+
+    async def test_identical_jobs_are_deduplicated(self, seed_btc_history, blocking_analysis):
+        """Test that resubmitting an in-flight job returns the same job"""
+        seed_btc_history(60)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            first = (await client.post("/analysis/run-volume-analysis", params={"background": True})).json()
+            second = (await client.post("/analysis/run-volume-analysis", params={"background": True})).json()
+            blocking_analysis.set()
+            await wait_for_job(client, first["job_id"])
+            third = (await client.post("/analysis/run-volume-analysis", params={"background": True})).json()
+
+        assert second["job_id"] == first["job_id"]
+        assert second["deduplicated"] is True
+        assert third["job_id"] != first["job_id"]
+
+    async def test_cpu_heavy_jobs_are_capped(self, seed_btc_history, blocking_analysis):
+        """Test that a second CPU-heavy job waits for the first one's slot"""
+        seed_btc_history(60)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            first = (await client.post("/analysis/run-volume-analysis", params={"background": True})).json()
+            second = (await client.post(
+                "/analysis/run-volume-analysis", params={"background": True, "lookback_period": 21}
+            )).json()
+            running = await wait_for_job(client, first["job_id"], statuses=("running",))
+            await asyncio.sleep(0.05)
+            waiting = (await client.get(f"/jobs/{second['job_id']}")).json()
+            blocking_analysis.set()
+            finished = await wait_for_job(client, second["job_id"])
+
+        assert running["status"] == "running"
+        assert waiting["status"] == "queued"
+        assert finished["status"] == "succeeded"
+
+    @pytest.mark.usefixtures("blocking_analysis")
+    async def test_full_queue_rejects_new_jobs(self, seed_btc_history):
+        """Test 503 once max_pending jobs are unfinished"""
+        seed_btc_history(60)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            for lookback_period in (14, 21):
+                await client.post(
+                    "/analysis/run-volume-analysis",
+                    params={"background": True, "lookback_period": lookback_period}
+                )
+            rejected = await client.post(
+                "/analysis/run-volume-analysis", params={"background": True, "lookback_period": 28}
+            )
+
+        assert rejected.status_code == 503
+
+    async def test_failed_job_reports_error(self):
+        """Test that pipeline errors end the job as failed"""
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            submitted = (await client.post("/analysis/run-volume-analysis", params={"background": True})).json()
+            job = await wait_for_job(client, submitted["job_id"])
+
+        assert job["status"] == "failed"
+        assert job["error"] == "Insufficient data. Need at least 7 records"
+
+    def test_unknown_job(self, api_client):
+        """Test 404 for unknown job ids"""
+        assert api_client.get("/jobs/unknown").status_code == 404
+
+
+class TestJobManager:
+    """Test JobManager bookkeeping"""
+
+    async def test_history_keeps_unfinished_jobs(self):
+        """Test that trimming only forgets finished jobs"""
+        manager = JobManager(max_pending=10, max_cpu_jobs=1, history_size=2)
+        release = asyncio.Event()
+
+        async def quick(_on_stage):
+            return 1
+
+        async def slow(_on_stage):
+            await release.wait()
+
+        pending, _ = manager.submit("slow", {}, slow)
+        finished = [manager.submit("quick", {"n": n}, quick)[0] for n in range(3)]
+        await asyncio.sleep(0)
+        manager.submit("quick", {"n": 3}, quick)
+
+        assert manager.get(pending.id) is pending
+        assert manager.get(finished[0].id) is None
+        release.set()
+        await manager.shutdown()
+
+    async def test_shutdown_cancels_running_jobs(self):
+        """Test that shutdown cancels unfinished jobs"""
+        manager = JobManager(max_pending=10, max_cpu_jobs=1, history_size=10)
+
+        async def forever(_on_stage):
+            await asyncio.Event().wait()
+
+        job, _ = manager.submit("forever", {}, forever)
+        await asyncio.sleep(0)
+        await manager.shutdown()
+
+        assert job.status == "cancelled"
+        assert job.finished_at is not None
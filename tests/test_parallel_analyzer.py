@@ -0,0 +1,82 @@
+"""
+Tests for chunk-parallel volume analysis.
+
+Test Structure:
+- TestChunkBounds: Chunk boundary alignment tests
+- TestParallelEquivalence: Parallel output vs serial run, bit for bit
+
+Usage:
+    pytest tests/test_parallel_analyzer.py
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from calculation.parallel import DEFAULT_MIN_CHUNK_SIZE, chunk_bounds
+from calculation.volume_analyzer import VolumeAnalysisColumns, VolumeAnalyzer
+from tests.helpers import make_series
+
+COLUMN_FIELDS = list(VolumeAnalysisColumns.__dataclass_fields__)
+
+
+def assert_columns_identical(actual, expected):
+    assert len(actual) == len(expected)
+    for field in COLUMN_FIELDS:
+        np.testing.assert_array_equal(getattr(actual, field), getattr(expected, field), err_msg=field)
+
+
+class TestChunkBounds:
+    """Test chunk partitioning"""
+
+    @pytest.mark.parametrize("length,lookback_period,chunk_size", [(1000, 14, 100), (997, 7, 7), (50, 50, 1)])
+    def test_chunks_cover_range_on_lookback_multiples(self, length, lookback_period, chunk_size):
+        """Test that chunks tile [0, length) and start on multiples of lookback_period"""
+        bounds = chunk_bounds(length, lookback_period, 4, chunk_size)
+
+        assert bounds[0][0] == 0
+        assert bounds[-1][1] == length
+        assert all(stop == next_start for (_, stop), (next_start, _) in zip(bounds[:-1], bounds[1:], strict=True))
+        assert all(start % lookback_period == 0 for start, _ in bounds)
+
+    def test_small_series_stays_in_one_chunk(self):
+        """Test that the default chunk size does not split short series"""
+        assert chunk_bounds(DEFAULT_MIN_CHUNK_SIZE // 2, 14, 8) == [(0, DEFAULT_MIN_CHUNK_SIZE // 2)]
+
+
+class TestParallelEquivalence:
+    """Test that parallel analysis reproduces the serial run exactly"""
+
+    @pytest.mark.parametrize("lookback_period,min_periods", [(14, 7), (7, 20), (50, 3)])
+    def test_matches_serial_run(self, lookback_period, min_periods):
+        """Test stitched chunk output against a single-process run"""
+        data = make_series(1200, seed=21)
+        analyzer = VolumeAnalyzer(lookback_period, min_periods)
+
+        assert_columns_identical(
+            analyzer.analyze_volume_price_correlation(data, workers=2, chunk_size=150),
+            analyzer.analyze_volume_price_correlation(data)
+        )
+
+    def test_nan_gaps_and_zero_volume(self):
+        """Test non-finite changes spanning chunk boundaries"""
+        data = make_series(900, seed=22, nan_gaps=True, zero_volume=True)
+        analyzer = VolumeAnalyzer(14, 7)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            assert_columns_identical(
+                analyzer.analyze_volume_price_correlation(data, workers=3, chunk_size=100),
+                analyzer.analyze_volume_price_correlation(data)
+            )
+
+    def test_single_chunk_runs_in_process(self):
+        """Test that a series fitting one chunk skips the process pool"""
+        data = make_series(100, seed=23)
+        analyzer = VolumeAnalyzer(14, 7)
+
+        assert_columns_identical(
+            analyzer.analyze_volume_price_correlation(data, workers=4),
+            analyzer.analyze_volume_price_correlation(data)
+        )
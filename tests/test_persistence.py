@@ -0,0 +1,81 @@
+"""
+Tests for bulk persistence of analysis results.
+
+Test Structure:
+- TestVolumeAnalysisUpsert: Skip vs overwrite upsert semantics and batching
+- TestUpsertStatements: Dialect-specific SQL generation
+
+Usage:
+    pytest tests/test_persistence.py
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from api.models.btc_models import VolumeAnalysis
+from api.services.persistence import _upsert_statement, upsert_volume_analysis
+from calculation.volume_analyzer import VolumeAnalyzer
+from tests.helpers import make_series
+
+
+@pytest.fixture
+def analysis_columns():
+    return VolumeAnalyzer(14, 7).analyze_volume_price_correlation(make_series(80, seed=31))
+
+
+class TestVolumeAnalysisUpsert:
+    """Test upsert_volume_analysis against SQLite"""
+
+    def test_inserts_all_rows_in_batches(self, db_session_factory, analysis_columns):
+        """Test that batching writes every row exactly once"""
+        with db_session_factory() as db:
+            written = upsert_volume_analysis(db, analysis_columns, 14, 7, batch_size=10)
+            db.commit()
+            assert written == len(analysis_columns)
+            assert db.query(VolumeAnalysis).count() == len(analysis_columns)
+
+    def test_skip_leaves_existing_rows(self, db_session_factory, analysis_columns):
+        """Test that conflicting rows are ignored without overwrite"""
+        with db_session_factory() as db:
+            upsert_volume_analysis(db, analysis_columns[:20], 14, 7)
+            db.query(VolumeAnalysis).update({VolumeAnalysis.strength_score: -1.0})
+            written = upsert_volume_analysis(db, analysis_columns, 14, 7)
+            db.commit()
+
+            assert written == len(analysis_columns) - 20
+            assert db.query(VolumeAnalysis).filter(VolumeAnalysis.strength_score == -1.0).count() == 20
+
+    def test_overwrite_corrects_existing_rows(self, db_session_factory, analysis_columns):
+        """Test that overwrite updates conflicting rows in place"""
+        with db_session_factory() as db:
+            upsert_volume_analysis(db, analysis_columns, 14, 7)
+            db.query(VolumeAnalysis).update({VolumeAnalysis.strength_score: -1.0})
+            upsert_volume_analysis(db, analysis_columns, 14, 7, overwrite=True)
+            db.commit()
+
+            stored = db.query(VolumeAnalysis).order_by(VolumeAnalysis.date.asc()).all()
+            assert len(stored) == len(analysis_columns)
+            assert [row.strength_score for row in stored] == analysis_columns.strength_score.tolist()
+
+    def test_parameter_sets_do_not_conflict(self, db_session_factory, analysis_columns):
+        """Test that the same dates under other parameters are separate rows"""
+        with db_session_factory() as db:
+            upsert_volume_analysis(db, analysis_columns, 14, 7)
+            written = upsert_volume_analysis(db, analysis_columns, 10, 5)
+            db.commit()
+
+            assert written == len(analysis_columns)
+            assert db.query(VolumeAnalysis).count() == 2 * len(analysis_columns)
+
+
+class TestUpsertStatements:
+    """Test generated ON CONFLICT clauses"""
+
+    @pytest.mark.parametrize("overwrite,clause", [(False, "DO NOTHING"), (True, "DO UPDATE SET")])
+    def test_postgresql_on_conflict(self, overwrite, clause):
+        """Test the PostgreSQL statement targets the analysis key"""
+        statement = _upsert_statement(postgresql.insert(VolumeAnalysis).values([{"date": None}]), overwrite)
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        assert "ON CONFLICT (date, lookback_period, min_periods)" in sql
+        assert clause in sql
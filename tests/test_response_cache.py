@@ -0,0 +1,245 @@
+"""
+Tests for the response cache, ETags and write invalidation.
+
+Test Structure:
+- TestMemoryCache: LRU eviction, expiry and data versions
+- TestRedisCache: Same behaviour against fakeredis
+- TestCachedEndpoints: X-Cache, ETag/304 and invalidation over HTTP
+
+Usage:
+    pytest tests/test_response_cache.py
+"""
+
+import pytest
+
+from api.main import app
+from api.services import pipelines
+from api.services.cache import (
+    MemoryCache,
+    RedisCache,
+    ResponseCache,
+    get_response_cache,
+)
+
+
+@pytest.fixture
+def recent_history(db_session_factory):
+    """Insert rows[start:stop] of an n-day BTC history whose last day is today"""
+    from datetime import datetime, timedelta
+
+    from api.models.btc_models import BTCData
+    from tests.helpers import make_series
+
+    def seed(n=60, start=0, stop=None):
+        first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=n - 1)
+        rows = make_series(n)
+        with db_session_factory() as db:
+            db.add_all(
+                BTCData(
+                    date=first_day + timedelta(days=day),
+                    close_price=float(rows[day]["close_price"]),
+                    volume=float(rows[day]["volume"])
+                )
+                for day in range(n)[start:stop]
+            )
+            db.commit()
+
+    return seed
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryCache:
+    """Test the in-process backend"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reads refresh recency and the oldest entry is evicted"""
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", b"1", ttl=60)
+        cache.set("b", b"2", ttl=60)
+        cache.get("a")
+        cache.set("c", b"3", ttl=60)
+
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"3"
+
+    def test_entries_expire(self):
+        """Test that entries are gone after their TTL"""
+        clock = FakeClock()
+        cache = MemoryCache(max_entries=10, clock=clock)
+        cache.set("a", b"1", ttl=5)
+
+        clock.now = 4.9
+        assert cache.get("a") == b"1"
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_versions(self):
+        """Test that unknown versions start at 0 and bump increments"""
+        cache = MemoryCache(max_entries=1)
+        cache.bump("btc")
+        cache.bump("btc")
+        cache.set("x", b"", ttl=60)
+        cache.set("y", b"", ttl=60)
+
+        assert cache.versions(["analysis", "btc"]) == [0, 2]
+
+
+class TestRedisCache:
+    """Test the Redis backend against fakeredis"""
+
+    @pytest.fixture
+    def server(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return fakeredis.FakeServer()
+
+    @pytest.fixture
+    def backend(self, server):
+        import fakeredis
+
+        return RedisCache(fakeredis.FakeRedis(server=server), prefix="test:")
+
+    def test_get_set_and_versions(self, backend):
+        """Test round trips, TTL and version counters"""
+        backend.set("a", b"etag\nbody", ttl=30)
+        backend.bump("analysis")
+
+        assert backend.get("a") == b"etag\nbody"
+        assert backend.get("missing") is None
+        assert 0 < backend.client.pttl("test:a") <= 30_000
+        assert backend.versions(["analysis", "btc"]) == [1, 0]
+
+    def test_errors_degrade_to_misses(self, server, backend):
+        """Test that an unreachable Redis does not fail requests"""
+        from redis.exceptions import ConnectionError
+
+        server.connected = False
+
+        assert backend.get("a") is None
+        backend.set("a", b"1", ttl=30)
+        assert backend.bump("btc") == -1
+        with pytest.raises(ConnectionError):
+            backend.versions(["btc"])
+
+    def test_serves_endpoints(self, backend, api_client, recent_history):
+        """Test that a Redis-backed cache serves hits across cache instances"""
+        recent_history(60)
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache(backend, ttl=60)
+
+        first = api_client.get("/btc/latest")
+        second = api_client.get("/btc/latest")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.json() == first.json()
+
+
+class TestCachedEndpoints:
+    """Test caching and revalidation of the read endpoints"""
+
+    @pytest.mark.parametrize("path", [
+        "/btc/history",
+        "/btc/latest",
+        "/analysis/volume-price-correlation",
+        "/analysis/summary",
+        "/analysis/trends",
+    ])
+    def test_hit_and_not_modified(self, api_client, recent_history, path):
+        """Test MISS then HIT with the same body, and 304 for a matching ETag"""
+        recent_history(60)
+        api_client.post("/analysis/run-volume-analysis")
+
+        miss = api_client.get(path)
+        hit = api_client.get(path)
+        revalidated = api_client.get(path, headers={"If-None-Match": miss.headers["ETag"]})
+
+        assert miss.status_code == 200
+        assert miss.headers["X-Cache"] == "MISS"
+        assert hit.headers["X-Cache"] == "HIT"
+        assert hit.content == miss.content
+        assert hit.headers["ETag"] == miss.headers["ETag"]
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+    def test_response_schema_unchanged(self, api_client, recent_history):
+        """Test that cached responses keep the response_model fields"""
+        recent_history(60)
+
+        body = api_client.get("/btc/latest").json()
+
+        assert set(body) == {
+            "id", "date", "close_price", "volume", "open_price", "high_price", "low_price", "created_at", "updated_at"
+        }
+
+    def test_stale_etag_gets_full_response(self, api_client, recent_history):
+        """Test that a non-matching If-None-Match returns the body"""
+        recent_history(60)
+
+        response = api_client.get("/btc/latest", headers={"If-None-Match": '"stale", W/"other"'})
+
+        assert response.status_code == 200
+
+    def test_errors_are_not_cached(self, api_client, recent_history):
+        """Test that a 404 is recomputed once data arrives"""
+        assert api_client.get("/btc/latest").status_code == 404
+
+        recent_history(60)
+
+        assert api_client.get("/btc/latest").status_code == 200
+
+    def test_ingest_invalidates_btc_responses(self, api_client, monkeypatch, sample_btc_data):
+        """Test that /btc/fetch-data bumps the BTC data version"""
+        from api.services.alpha_vantage import AlphaVantageService
+
+        class StubService(AlphaVantageService):
+            async def fetch_btc_daily_data(self):
+                return sample_btc_data
+
+        monkeypatch.setattr(pipelines, "get_alpha_vantage_service", StubService)
+        series = sample_btc_data["Time Series (Digital Currency Daily)"]
+        latest_day = series.pop("2025-05-26")
+        api_client.post("/btc/fetch-data")
+        before = api_client.get("/btc/latest")
+
+        series["2025-05-26"] = latest_day
+        api_client.post("/btc/fetch-data")
+        after = api_client.get("/btc/latest", headers={"If-None-Match": before.headers["ETag"]})
+
+        assert after.status_code == 200
+        assert after.headers["X-Cache"] == "MISS"
+        assert after.json()["close_price"] == 108992.36
+
+    def test_analysis_run_invalidates_only_analysis_responses(self, api_client, recent_history):
+        """Test that /analysis/run-volume-analysis bumps only the analysis version"""
+        recent_history(75, stop=60)
+        api_client.post("/analysis/run-volume-analysis")
+        before = api_client.get("/analysis/volume-price-correlation", params={"limit": 100, "days_back": 365})
+        api_client.get("/btc/latest")
+
+        recent_history(75, start=60)
+        api_client.post("/analysis/run-volume-analysis")
+        after = api_client.get("/analysis/volume-price-correlation", params={"limit": 100, "days_back": 365})
+
+        assert after.headers["X-Cache"] == "MISS"
+        assert len(after.json()) == len(before.json()) + 15
+        assert api_client.get("/btc/latest").headers["X-Cache"] == "HIT"
+
+    def test_disabled_backend_still_sends_etags(self, api_client, recent_history):
+        """Test response_cache_backend=none: no caching, 304s still work"""
+        recent_history(60)
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache(None, ttl=60)
+
+        first = api_client.get("/btc/latest")
+        second = api_client.get("/btc/latest", headers={"If-None-Match": first.headers["ETag"]})
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "MISS"
+        assert second.status_code == 304
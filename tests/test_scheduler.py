@@ -0,0 +1,224 @@
+"""
+Tests for scheduled incremental ingestion.
+
+Test Structure:
+- TestIngestionRun: Compact/full selection, analysis chaining, overlap and failure handling
+- TestSchedulerLoop: Jittered loop start, repeat and stop
+- TestSchedulerHealthEndpoint: /health/scheduler response tests
+
+Usage:
+    pytest tests/test_scheduler.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from api.core.config import get_settings
+from api.core.database import get_async_session_factory
+from api.main import app
+from api.models.btc_models import BTCData, VolumeAnalysis
+from api.services.alpha_vantage import AlphaVantageService
+from api.services.scheduler import IngestionScheduler
+from tests.helpers import make_series
+
+
+def daily_payload(n):
+    """Alpha Vantage daily series of n days ending today"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = make_series(n)
+    return {
+        "Meta Data": {"2. Digital Currency Code": "BTC"},
+        "Time Series (Digital Currency Daily)": {
+            (today - timedelta(days=n - 1 - day)).strftime("%Y-%m-%d"): {
+                "1. open": str(rows[day]["close_price"]),
+                "2. high": str(rows[day]["close_price"]),
+                "3. low": str(rows[day]["close_price"]),
+                "4. close": str(rows[day]["close_price"]),
+                "5. volume": str(rows[day]["volume"]),
+            }
+            for day in range(n)
+        },
+    }
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route pipeline fetches to a MockTransport serving state["payload"]; counts requests"""
+    from api.services import pipelines
+
+    state = {"requests": 0, "payload": daily_payload(60), "status": 200, "release": None}
+
+    async def handler(_request):
+        state["requests"] += 1
+        if state["release"] is not None:
+            await state["release"].wait()
+        return httpx.Response(state["status"], json=state["payload"])
+
+    settings = get_settings().model_copy(update={
+        "alpha_vantage_requests_per_minute": 60_000,
+        "alpha_vantage_burst": 10,
+        "alpha_vantage_max_retries": 0,
+        "alpha_vantage_fresh_seconds": 0
+    })
+    service = AlphaVantageService(settings, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(pipelines, "get_alpha_vantage_service", lambda: service)
+    return state
+
+
+@pytest.fixture
+def scheduler(db_session_factory):  # noqa: ARG001 - installs the async session override
+    """Scheduler bound to the isolated test database"""
+    return IngestionScheduler(
+        app.dependency_overrides[get_async_session_factory](),
+        interval=3600,
+        jitter=0,
+        full_fetch_gap_days=30,
+        analysis_params=(5, 3)
+    )
+
+
+def seed_recent(db_session_factory, n, end_days_ago):
+    """Insert n daily bars ending end_days_ago days before today"""
+    last_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=end_days_ago)
+    rows = make_series(n)
+    with db_session_factory() as db:
+        db.add_all(
+            BTCData(
+                date=last_day - timedelta(days=n - 1 - day),
+                close_price=float(rows[day]["close_price"]),
+                volume=float(rows[day]["volume"])
+            )
+            for day in range(n)
+        )
+        db.commit()
+
+
+class TestIngestionRun:
+    """Test single scheduled runs"""
+
+    @pytest.mark.usefixtures("upstream")
+    async def test_empty_table_takes_full_path(self, scheduler, db_session_factory):
+        """Test that the first run loads the full history and analyzes it"""
+        run = await scheduler.run_once()
+
+        assert run["status"] == "succeeded"
+        assert run["mode"] == "full"
+        assert run["gap_days"] is None
+        assert run["fetch"]["records_added"] == 60
+        assert run["analysis"]["records_added"] > 0
+        with db_session_factory() as db:
+            assert db.scalar(select(func.count()).select_from(BTCData)) == 60
+
+    @pytest.mark.usefixtures("upstream")
+    async def test_small_gap_takes_compact_path(self, scheduler, db_session_factory):
+        """Test that a few missing days are ingested incrementally and chained into analysis"""
+        seed_recent(db_session_factory, 57, end_days_ago=3)
+
+        run = await scheduler.run_once()
+
+        assert run["mode"] == "compact"
+        assert run["gap_days"] == 3
+        assert run["fetch"]["records_added"] == 3
+        assert run["fetch"]["records_skipped"] == 57
+        assert run["analysis"]["records_added"] > 0
+        with db_session_factory() as db:
+            latest_analysis = db.scalar(select(func.max(VolumeAnalysis.date)))
+            latest_bar = db.scalar(select(func.max(BTCData.date)))
+        assert latest_analysis == latest_bar
+
+    async def test_large_gap_takes_full_path(self, scheduler, upstream, db_session_factory):
+        """Test that a gap beyond full_fetch_gap_days reconciles the whole history"""
+        seed_recent(db_session_factory, 10, end_days_ago=40)
+        upstream["payload"] = daily_payload(60)
+
+        run = await scheduler.run_once()
+
+        assert run["mode"] == "full"
+        assert run["gap_days"] == 40
+        assert run["fetch"]["records_added"] == 50
+        assert run["fetch"]["records_updated"] + run["fetch"]["records_unchanged"] == 10
+
+    @pytest.mark.usefixtures("upstream")
+    async def test_no_new_bars_skips_analysis(self, scheduler, db_session_factory):
+        """Test that an up-to-date table does not trigger analysis"""
+        seed_recent(db_session_factory, 60, end_days_ago=0)
+
+        run = await scheduler.run_once()
+
+        assert run["status"] == "succeeded"
+        assert run["fetch"]["records_added"] == 0
+        assert run["analysis"] is None
+
+    async def test_overlapping_run_is_skipped(self, scheduler, upstream):
+        """Test that a run started while another is in progress returns at once"""
+        upstream["release"] = asyncio.Event()
+        first = asyncio.ensure_future(scheduler.run_once())
+        await asyncio.sleep(0.01)
+
+        skipped = await scheduler.run_once()
+        upstream["release"].set()
+        await first
+
+        assert skipped["status"] == "skipped"
+        assert upstream["requests"] == 1
+        assert scheduler.runs == 1
+        assert scheduler.overlaps_skipped == 1
+        assert scheduler.status()["last_run"]["status"] == "succeeded"
+
+    async def test_failure_is_recorded(self, scheduler, upstream):
+        """Test that upstream errors end the run as failed without raising"""
+        upstream["status"] = 500
+
+        run = await scheduler.run_once()
+
+        assert run["status"] == "failed"
+        assert "500" in run["error"]
+        assert scheduler.failures == 1
+        assert scheduler.status()["last_run"] is run
+
+
+class TestSchedulerLoop:
+    """Test the background loop"""
+
+    @pytest.mark.usefixtures("db_session_factory", "upstream")
+    async def test_runs_repeat_until_stopped(self):
+        """Test that the loop waits jitter first, then interval plus jitter"""
+        delays = []
+
+        async def sleep(seconds):
+            delays.append(seconds)
+            await asyncio.sleep(0)
+
+        scheduler = IngestionScheduler(
+            app.dependency_overrides[get_async_session_factory](),
+            interval=100,
+            jitter=5,
+            full_fetch_gap_days=30,
+            sleep=sleep
+        )
+        scheduler.start()
+        while scheduler.runs < 3:
+            await asyncio.sleep(0.01)
+        assert scheduler.status()["running"] is True
+        await scheduler.stop()
+
+        assert 0 <= delays[0] <= 5
+        assert all(100 <= delay <= 105 for delay in delays[1:])
+        assert scheduler.status()["running"] is False
+        assert scheduler.status()["next_run_at"] is None
+
+
+class TestSchedulerHealthEndpoint:
+    """Test /health/scheduler"""
+
+    def test_reports_disabled_scheduler(self, api_client):
+        """Test the status of the default (disabled) scheduler"""
+        body = api_client.get("/health/scheduler").json()
+
+        assert body["enabled"] is False
+        assert body["running"] is False
+        assert {"next_run_at", "runs", "failures", "overlaps_skipped", "last_run"} <= set(body)
@@ -6,11 +6,28 @@ Test Structure:
 - TestAnalysisResultDataClass: Data structure tests
 - TestStatisticalCalculations: Mathematical computation tests
 - TestCachingAndPerformance: Performance optimization tests
+- TestVectorizedEngineEquivalence: Vectorized engine vs per-window reference
+- TestParameterSweep: Batched parameter-grid analysis tests
+- TestVolumeAnalysisColumns: Columnar result container tests
 
 Usage:
     pytest tests/test_volume_analyzer.py
 """
 
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculation.volume_analyzer import (
+    VolumeAnalysisColumns,
+    VolumeAnalysisResult,
+    VolumeAnalyzer,
+    _windowed_sum,
+    sweep_volume_analysis,
+)
+from tests.helpers import assert_results_equivalent, make_series
 
 
 class TestVolumeAnalyzer:
@@ -102,3 +119,186 @@ class TestCachingAndPerformance:
         """Test memory usage efficiency"""
         # TODO: Implement test for memory optimization
         pass
+
+
+class TestVectorizedEngineEquivalence:
+    """Test the vectorized engine against the per-window reference implementation"""
+
+    PARAMETERS = [(14, 7), (7, 7), (7, 20), (50, 3), (20, 20), (3, 3), (4, 3)]
+
+    @pytest.mark.parametrize("lookback_period,min_periods", PARAMETERS)
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_random_walk(self, lookback_period, min_periods, seed):
+        """Test equivalence on clean random-walk data"""
+        data = make_series(150, seed=seed)
+        analyzer = VolumeAnalyzer(lookback_period, min_periods)
+
+        assert_results_equivalent(
+            analyzer.analyze_volume_price_correlation(data),
+            analyzer.analyze_volume_price_correlation_reference(data)
+        )
+
+    @pytest.mark.parametrize("lookback_period,min_periods", PARAMETERS)
+    def test_nan_gaps_and_zero_volume(self, lookback_period, min_periods):
+        """Test equivalence with missing values and infinite volume changes"""
+        data = make_series(200, seed=3, nan_gaps=True, zero_volume=True)
+        analyzer = VolumeAnalyzer(lookback_period, min_periods)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            vectorized = analyzer.analyze_volume_price_correlation(data)
+            reference = analyzer.analyze_volume_price_correlation_reference(data)
+
+        assert_results_equivalent(vectorized, reference)
+
+    def test_constant_price_windows(self):
+        """Test that zero-variance windows yield zero correlation like np.corrcoef"""
+        data = make_series(120, seed=4, flat_prices=True)
+        analyzer = VolumeAnalyzer(7, 5)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            vectorized = analyzer.analyze_volume_price_correlation(data)
+            reference = analyzer.analyze_volume_price_correlation_reference(data)
+
+        assert_results_equivalent(vectorized, reference)
+        assert any(result.correlation == 0.0 for result in vectorized)
+
+    def test_unsorted_input(self):
+        """Test that input order does not matter"""
+        data = make_series(80, seed=5)
+        analyzer = VolumeAnalyzer()
+
+        assert_results_equivalent(
+            analyzer.analyze_volume_price_correlation(data[::-1]),
+            analyzer.analyze_volume_price_correlation_reference(data)
+        )
+
+    @pytest.mark.parametrize("length", [0, 6, 7, 8, 15])
+    def test_short_series(self, length):
+        """Test equivalence around the minimum data requirement"""
+        data = make_series(length, seed=6)
+        analyzer = VolumeAnalyzer(14, 7)
+
+        assert_results_equivalent(
+            analyzer.analyze_volume_price_correlation(data),
+            analyzer.analyze_volume_price_correlation_reference(data)
+        )
+
+    def test_dataframe_input(self):
+        """Test that a DataFrame input matches the equivalent record list"""
+        data = make_series(90, seed=12)
+        analyzer = VolumeAnalyzer()
+        frame = pd.DataFrame(data)
+
+        assert_results_equivalent(
+            list(analyzer.analyze_volume_price_correlation(frame)),
+            analyzer.analyze_volume_price_correlation_reference(data)
+        )
+        assert list(frame.columns) == ["date", "close_price", "volume"]
+
+    @pytest.mark.parametrize("window", [1, 2, 5, 14])
+    def test_windowed_sum(self, window):
+        """Test block prefix/suffix window sums against direct slicing"""
+        values = np.random.default_rng(7).normal(size=53)
+        expected = [values[max(0, i - window + 1):i + 1].sum() for i in range(len(values))]
+
+        np.testing.assert_allclose(_windowed_sum(values, window), expected, rtol=1e-12)
+
+
+class TestParameterSweep:
+    """Test batched analysis over a (lookback_period, min_periods) grid"""
+
+    def test_sweep_matches_individual_runs(self):
+        """Test every grid cell against a standalone analyzer run"""
+        data = make_series(200, seed=8, zero_volume=True)
+        lookbacks, minimums = [7, 10, 14, 30], [3, 7, 12, 20]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            sweep = sweep_volume_analysis(data, lookbacks, minimums)
+
+            assert set(sweep) == {(lb, mp) for lb in lookbacks for mp in minimums}
+            for (lookback_period, min_periods), columns in sweep.items():
+                expected = VolumeAnalyzer(lookback_period, min_periods).analyze_volume_price_correlation(data)
+                np.testing.assert_array_equal(columns.date, expected.date)
+                assert_results_equivalent(list(columns), list(expected))
+
+    def test_sweep_dates_align_with_rows(self):
+        """Test that each result row carries the date of the bar it describes"""
+        data = make_series(40, seed=9)
+
+        columns = sweep_volume_analysis(data, [14], [7])[(14, 7)]
+
+        assert columns.date[0] == np.datetime64(data[7]["date"])
+        assert columns.date[-1] == np.datetime64(data[-1]["date"])
+
+    def test_sweep_empty_input(self):
+        """Test that empty input yields empty columns for every pair"""
+        sweep = sweep_volume_analysis([], [7, 8], [3])
+
+        assert set(sweep) == {(7, 3), (8, 3)}
+        assert len(sweep[(7, 3)]) == 0
+
+
+class TestVolumeAnalysisColumns:
+    """Test the columnar VolumeAnalysisColumns result container"""
+
+    @pytest.fixture
+    def columns(self):
+        return VolumeAnalyzer(14, 7).analyze_volume_price_correlation(make_series(60, seed=10))
+
+    def test_row_access_and_iteration(self, columns):
+        """Test int indexing and iteration yield identical result rows"""
+        rows = list(columns)
+
+        assert len(rows) == len(columns) == 53
+        assert isinstance(columns[0], VolumeAnalysisResult)
+        assert columns[0] == rows[0]
+        assert columns[-1] == rows[-1]
+
+    def test_slicing_returns_views(self, columns):
+        """Test that slices share memory with the parent columns"""
+        tail = columns[10:20]
+
+        assert isinstance(tail, VolumeAnalysisColumns)
+        assert len(tail) == 10
+        assert np.shares_memory(tail.correlation, columns.correlation)
+        assert tail[0] == columns[10]
+
+    def test_to_dataframe_is_zero_copy(self, columns):
+        """Test DataFrame conversion keeps numeric buffers and decodes categories"""
+        df = columns.to_dataframe()
+
+        assert np.shares_memory(df["correlation"].to_numpy(), columns.correlation)
+        assert df.index.name == "date"
+        assert df["trend_direction"].iloc[0] == columns[0].trend_direction
+        assert df["volume_follows_price"].iloc[-1] == columns[-1].volume_follows_price
+
+    def test_to_arrow(self, columns):
+        """Test Arrow conversion with dictionary-encoded categories"""
+        pytest.importorskip("pyarrow")
+
+        table = columns.to_arrow()
+
+        assert table.num_rows == len(columns)
+        assert table.column("volume_follows_price").to_pylist()[0] == columns[0].volume_follows_price
+        assert table.column("strength_score").to_pylist() == columns.strength_score.tolist()
+
+    def test_to_records(self, columns):
+        """Test plain-Python records used by the storage path"""
+        records = columns.to_records()
+
+        assert len(records) == len(columns)
+        assert records[0]["date"] == columns.date[0].astype("datetime64[us]").item()
+        assert records[0]["trend_direction"] == columns[0].trend_direction
+        assert isinstance(records[0]["strength_score"], float)
+
+    def test_empty(self):
+        """Test empty container for short input"""
+        columns = VolumeAnalyzer(14, 7).analyze_volume_price_correlation(make_series(3))
+
+        assert len(columns) == 0
+        assert not columns
+        assert list(columns) == []
+        assert len(columns.to_dataframe()) == 0